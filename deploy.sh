@@ -118,13 +118,15 @@ else
     echo -e "${GREEN}✓ .env file already exists${NC}"
 fi
 
-# Initialize database if needed
+# Initialize the database, or bring an existing one up to the current schema
 if [ ! -f "omnihome.db" ]; then
     echo -e "${YELLOW}Initializing database...${NC}"
-    python3 -c "from app.core.database import init_db; import asyncio; asyncio.run(init_db())"
+    python3 scripts/init_db.py
     echo -e "${GREEN}✓ Database initialized${NC}"
 else
-    echo -e "${GREEN}✓ Database already exists${NC}"
+    echo -e "${YELLOW}Migrating database...${NC}"
+    python3 scripts/migrate.py
+    echo -e "${GREEN}✓ Database schema up to date${NC}"
 fi
 
 echo ""
@@ -233,6 +235,7 @@ Type=simple
 User=$USER
 WorkingDirectory=$DEPLOY_DIR/server
 Environment="PATH=$DEPLOY_DIR/server/venv/bin"
+ExecStartPre=$DEPLOY_DIR/server/venv/bin/python scripts/migrate.py
 ExecStart=$DEPLOY_DIR/server/venv/bin/python main.py
 Restart=always
 RestartSec=10
@@ -105,12 +105,17 @@ cd "$SERVER_DIR"
 if [ -d "venv" ]; then
     echo -e "${GREEN}Using virtual environment...${NC}"
     source venv/bin/activate
-    python3 main.py > ../server.log 2>&1 &
 else
     echo -e "${YELLOW}Warning: No virtual environment found, using system python${NC}"
-    python3 main.py > ../server.log 2>&1 &
 fi
 
+# The server refuses to start on an outdated schema
+if ! python3 scripts/migrate.py > ../server.log 2>&1; then
+    echo -e "${RED}Error: database migration failed, see server.log${NC}"
+    exit 1
+fi
+python3 main.py >> ../server.log 2>&1 &
+
 SERVER_PID=$!
 echo $SERVER_PID > "$SERVER_PID_FILE"
 echo -e "${GREEN}Server started (PID: $SERVER_PID)${NC}"
@@ -4,11 +4,13 @@ Activity Log Routes
 
 from fastapi import APIRouter, Depends, Query, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, tuple_
 from datetime import datetime
 import uuid
 
 from app.core.database import get_db
+from app.core.activity_counts import count_activity_logs, estimate_activity_logs
+from app.core.pagination import decode_cursor, encode_cursor
 from app.models import ActivityLog
 from app.schemas import ActivityLogList, ActivityLogResponse, ActivityLogFilters
 
@@ -19,12 +21,24 @@ router = APIRouter()
 async def get_activity_logs(
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: str = Query(None, description="nextCursor of the previous page"),
     log_type: str = Query(None),
     start_date: datetime = Query(None),
     end_date: datetime = Query(None),
+    count: str = Query(
+        "auto", pattern="^(auto|estimate|exact)$",
+        description="auto: total from the maintained counters when no date filter is set; "
+                    "estimate: always, estimated for date filters; exact: full count"
+    ),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get activity logs with optional filters."""
+    """
+    Get activity logs with optional filters, newest first.
+
+    Pages are keyed on (timestamp, id): pass the previous page's nextCursor
+    as cursor instead of an offset, so each page costs the same however deep
+    it is. Offsets still work for older clients.
+    """
     # Build query
     query = select(ActivityLog)
     
@@ -37,14 +51,41 @@ async def get_activity_logs(
         query = query.where(ActivityLog.timestamp <= end_date)
     
     # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
+    total = None
+    total_type = None
+    if count == "exact":
+        total = (await db.execute(select(func.count()).select_from(query.subquery()))).scalar()
+        total_type = "exact"
+    elif not (start_date or end_date):
+        total = await count_activity_logs(db, log_type)
+        total_type = "exact"
+    elif count == "estimate":
+        total = await estimate_activity_logs(db, log_type, start_date, end_date)
+        total_type = "estimate"
     
     # Apply pagination and ordering
-    query = query.order_by(ActivityLog.timestamp.desc()).limit(limit).offset(offset)
+    if cursor:
+        if offset:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={"code": "INVALID_CURSOR", "message": "cursor and offset cannot be combined"}
+            )
+        try:
+            after_timestamp, after_id = decode_cursor(cursor, 2)
+            after_timestamp = datetime.fromisoformat(after_timestamp)
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={"code": "INVALID_CURSOR", "message": "Malformed cursor"}
+            )
+        query = query.where(tuple_(ActivityLog.timestamp, ActivityLog.id) < tuple_(after_timestamp, after_id))
+    
+    # One extra row tells whether there is another page
+    query = query.order_by(ActivityLog.timestamp.desc(), ActivityLog.id.desc()).limit(limit + 1).offset(offset)
     result = await db.execute(query)
     logs = result.scalars().all()
+    has_more = len(logs) > limit
+    logs = logs[:limit]
     
     return ActivityLogList(
         logs=[
@@ -60,9 +101,11 @@ async def get_activity_logs(
         ],
         pagination={
             "total": total,
+            "totalType": total_type,
             "limit": limit,
             "offset": offset,
-            "hasMore": offset + limit < total
+            "hasMore": has_more,
+            "nextCursor": encode_cursor(logs[-1].timestamp, logs[-1].id) if has_more else None
         }
     )
 
@@ -6,13 +6,13 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from datetime import datetime, timedelta
-import uuid
 
 from app.core.database import get_db
 from app.core.security import (
     verify_password, create_access_token, create_refresh_token, hash_token
 )
 from app.core.config import settings
+from app.core.ids import new_id
 from app.models import User, Session, Biometric
 from app.schemas import (
     UserLoginPIN, UserLoginBiometric, Token, TokenRefresh, TokenResponse,
@@ -51,7 +51,7 @@ async def login_with_pin(
     
     # Create session
     session = Session(
-        id=str(uuid.uuid4()),
+        id=new_id(),
         user_id=user.id,
         token_hash=hash_token(access_token),
         refresh_token_hash=hash_token(refresh_token),
@@ -109,7 +109,7 @@ async def login_with_biometric(
     
     # Create session
     session = Session(
-        id=str(uuid.uuid4()),
+        id=new_id(),
         user_id=user.id,
         token_hash=hash_token(access_token),
         refresh_token_hash=hash_token(refresh_token),
@@ -9,6 +9,10 @@ from datetime import datetime
 import uuid
 
 from app.core.database import get_db
+from app.core.events import record_event
+from app.core.ids import new_id
+from app.core.single_flight import single_flight
+from app.core.versions import conditional
 from app.models import Camera, CameraRecording, CameraSnapshot
 from app.schemas import (
     CameraList, CameraStream, CameraSnapshot as CameraSnapshotSchema,
@@ -18,7 +22,8 @@ from app.schemas import (
 router = APIRouter()
 
 
-@router.get("", response_model=CameraList)
+@router.get("", response_model=CameraList, dependencies=[Depends(conditional("cameras"))])
+@single_flight.route("cameras", resource="cameras")
 async def get_cameras(db: AsyncSession = Depends(get_db)):
     """Get list of all cameras."""
     result = await db.execute(select(Camera))
@@ -78,7 +83,7 @@ async def take_snapshot(
         )
     
     snapshot = CameraSnapshot(
-        id=str(uuid.uuid4()),
+        id=new_id(),
         camera_id=camera_id,
         snapshot_id=f"snap_{uuid.uuid4().hex}",
         image_url=f"http://localhost:8080/snapshots/snap_{uuid.uuid4().hex}.jpg",
@@ -115,7 +120,7 @@ async def start_recording(
     camera.is_recording = True
     
     recording = CameraRecording(
-        id=str(uuid.uuid4()),
+        id=new_id(),
         camera_id=camera_id,
         recording_id=f"rec_{uuid.uuid4().hex}",
         video_url=f"http://localhost:8080/recordings/rec_{uuid.uuid4().hex}.mp4",
@@ -124,6 +129,11 @@ async def start_recording(
         triggered_by="manual"
     )
     db.add(recording)
+    record_event(db, "camera.status.changed", {
+        "cameraId": camera_id,
+        "isRecording": True,
+        "recordingId": recording.recording_id
+    })
     await db.commit()
     
     return SuccessResponse(
@@ -166,6 +176,12 @@ async def stop_recording(
         recording.completed_at = datetime.utcnow()
         recording.duration = int((datetime.utcnow() - recording.started_at).total_seconds())
     
+    record_event(db, "camera.status.changed", {
+        "cameraId": camera_id,
+        "isRecording": False,
+        "recordingId": recording.recording_id if recording else None
+    })
+    
     await db.commit()
     
     return CameraRecordingStop(
@@ -2,31 +2,50 @@
 Climate Control Routes
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from datetime import datetime
-import uuid
 
-from app.core.database import get_db
+from app.core.database import AsyncSessionLocal, get_db
+from app.core.write_buffer import write_buffer
+from app.core.events import record_event
+from app.core.rollups import climate_series
+from app.core.ids import new_id
+from app.core.state_cache import state_cache
+from app.core.single_flight import single_flight
+from app.core.versions import conditional
 from app.models import ClimateSettings, ClimateHistory, ActivityLog
 from app.schemas import (
     ClimateStatus, TemperatureRequest, FanSpeedRequest, ModeRequest,
-    ClimateApplyRequest, SuccessResponse
+    ClimateApplyRequest, ClimateHistorySeries, SuccessResponse
 )
 
 router = APIRouter()
 
 
-@router.get("/status", response_model=ClimateStatus)
+def _record_climate_changed(db: AsyncSession, climate: ClimateSettings) -> None:
+    """Record a climate.status.changed event for the current settings."""
+    record_event(db, "climate.status.changed", {
+        "targetTemperature": climate.target_temperature,
+        "currentTemperature": climate.current_temperature,
+        "humidity": climate.humidity,
+        "mode": climate.mode,
+        "fanSpeed": climate.fan_speed,
+        "active": climate.active,
+        "lastUpdatedAt": climate.last_updated_at
+    })
+
+
+@router.get("/status", response_model=ClimateStatus, dependencies=[Depends(conditional("climate"))])
+@single_flight.route("climate.status", resource="climate")
 async def get_climate_status(db: AsyncSession = Depends(get_db)):
     """Get climate control status."""
-    result = await db.execute(select(ClimateSettings).limit(1))
-    climate = result.scalar_one_or_none()
+    climate = await state_cache.get(db, ClimateSettings)
     
     if not climate:
         climate = ClimateSettings(
-            id=str(uuid.uuid4()),
+            id=new_id(),
             target_temperature=22,
             current_temperature=21,
             humidity=45,
@@ -35,8 +54,10 @@ async def get_climate_status(db: AsyncSession = Depends(get_db)):
             power_usage=1.2,
             active=True
         )
-        db.add(climate)
-        await db.commit()
+        # Read on the reader pool; only a first request writes
+        async with AsyncSessionLocal() as write_db:
+            write_db.add(climate)
+            await write_db.commit()
     
     return ClimateStatus(
         current_temperature=float(climate.current_temperature) if climate.current_temperature else None,
@@ -50,6 +71,23 @@ async def get_climate_status(db: AsyncSession = Depends(get_db)):
     )
 
 
+@router.get("/history", response_model=ClimateHistorySeries)
+async def get_climate_history(
+    start: datetime = Query(None, description="Range start (default: 24 hours before end)"),
+    end: datetime = Query(None, description="Range end (default: now)"),
+    resolution: int = Query(None, ge=60, description="Seconds per point"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get temperature and humidity history from the coarsest rollup that fits the resolution."""
+    try:
+        return await climate_series(db, start, end, resolution)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"code": "INVALID_RANGE", "message": str(e)}
+        )
+
+
 @router.post("/temperature", response_model=SuccessResponse)
 async def set_temperature(
     request: TemperatureRequest,
@@ -62,17 +100,18 @@ async def set_temperature(
     previous_temp = climate.target_temperature if climate else 22
     climate.target_temperature = request.temperature
     climate.last_updated_at = datetime.utcnow()
+    _record_climate_changed(db, climate)
     
     # Log history
     history = ClimateHistory(
-        id=str(uuid.uuid4()),
+        id=new_id(),
         temperature=request.temperature,
         humidity=climate.humidity if climate else 45,
         mode=climate.mode if climate else "cool",
         fan_speed=climate.fan_speed if climate else "med",
         power_usage=climate.power_usage if climate else 1.2
     )
-    db.add(history)
+    write_buffer.add(db, history)
     
     await db.commit()
     
@@ -96,6 +135,7 @@ async def set_fan_speed(
     
     climate.fan_speed = request.fan_speed
     climate.last_updated_at = datetime.utcnow()
+    _record_climate_changed(db, climate)
     
     await db.commit()
     
@@ -119,6 +159,7 @@ async def set_climate_mode(
     previous_mode = climate.mode if climate else "cool"
     climate.mode = request.mode
     climate.last_updated_at = datetime.utcnow()
+    _record_climate_changed(db, climate)
     
     await db.commit()
     
@@ -144,17 +185,18 @@ async def apply_climate_settings(
     climate.fan_speed = request.fan_speed
     climate.mode = request.mode
     climate.last_updated_at = datetime.utcnow()
+    _record_climate_changed(db, climate)
     
     # Log history
     history = ClimateHistory(
-        id=str(uuid.uuid4()),
+        id=new_id(),
         temperature=request.temperature,
         humidity=climate.humidity if climate else 45,
         mode=request.mode,
         fan_speed=request.fan_speed,
         power_usage=climate.power_usage if climate else 1.2
     )
-    db.add(history)
+    write_buffer.add(db, history)
     
     await db.commit()
     
@@ -2,36 +2,43 @@
 Garden & Utilities Routes
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from datetime import datetime
-import uuid
 
-from app.core.database import get_db
+from app.core.database import AsyncSessionLocal, get_db
+from app.core.events import record_event
+from app.core.rollups import watering_series
+from app.core.ids import new_id
+from app.core.state_cache import state_cache
+from app.core.single_flight import single_flight
+from app.core.versions import conditional
 from app.models import GardenZone, WaterTank, WateringSchedule, ActivityLog
 from app.schemas import (
     GardenStatus, ZoneToggleRequest, AllZonesRequest, WateringScheduleRequest,
-    WaterTankStatus, WaterTankRefillResponse, SuccessResponse
+    WaterTankStatus, WaterTankRefillResponse, WateringHistorySeries, SuccessResponse
 )
 
 router = APIRouter()
 
 
-@router.get("/status", response_model=GardenStatus)
+def _today() -> str:
+    """ETag suffix for the status body, whose next watering date changes daily."""
+    return datetime.utcnow().strftime("-%Y%m%d")
+
+
+@router.get("/status", response_model=GardenStatus, dependencies=[Depends(conditional("garden", _today))])
+@single_flight.route("garden.status", resource="garden")
 async def get_garden_status(db: AsyncSession = Depends(get_db)):
     """Get garden status."""
     # Get zones
     result = await db.execute(select(GardenZone))
     zones = result.scalars().all()
     
-    # Get water tank
-    result = await db.execute(select(WaterTank).limit(1))
-    tank = result.scalar_one_or_none()
-    
-    # Get watering schedule
-    result = await db.execute(select(WateringSchedule).limit(1))
-    schedule = result.scalar_one_or_none()
+    # Get water tank and watering schedule
+    tank = await state_cache.get(db, WaterTank)
+    schedule = await state_cache.get(db, WateringSchedule)
     
     return GardenStatus(
         zones=[
@@ -75,7 +82,7 @@ async def toggle_zone(
     
     if not zone:
         zone = GardenZone(
-            id=str(uuid.uuid4()),
+            id=new_id(),
             zone_id=zone_id,
             name=f"Zone {zone_id}",
             active=request.active
@@ -86,6 +93,12 @@ async def toggle_zone(
         if request.active:
             zone.last_watered_at = datetime.utcnow()
     
+    record_event(db, "garden.zone.changed", {
+        "zoneId": zone_id,
+        "active": request.active,
+        "lastWateredAt": zone.last_watered_at
+    })
+    
     await db.commit()
     
     return SuccessResponse(
@@ -112,6 +125,11 @@ async def set_all_zones(
         if request.active:
             zone.last_watered_at = datetime.utcnow()
         active_zones.append(zone.zone_id)
+        record_event(db, "garden.zone.changed", {
+            "zoneId": zone.zone_id,
+            "active": request.active,
+            "lastWateredAt": zone.last_watered_at
+        })
     
     await db.commit()
     
@@ -138,13 +156,21 @@ async def set_watering_schedule(
         schedule.zones = request.zones
     else:
         schedule = WateringSchedule(
-            id=str(uuid.uuid4()),
+            id=new_id(),
             time=request.time,
             duration=request.duration,
             zones=request.zones
         )
         db.add(schedule)
     
+    record_event(db, "garden.status.changed", {
+        "schedule": {
+            "time": request.time,
+            "duration": request.duration,
+            "zones": request.zones
+        }
+    })
+    
     await db.commit()
     
     return SuccessResponse(
@@ -158,22 +184,41 @@ async def set_watering_schedule(
     )
 
 
+@router.get("/watering/history", response_model=WateringHistorySeries)
+async def get_watering_history(
+    start: datetime = Query(None, description="Range start (default: 24 hours before end)"),
+    end: datetime = Query(None, description="Range end (default: now)"),
+    resolution: int = Query(None, ge=60, description="Seconds per point"),
+    zone_id: int = Query(None, description="Only this zone"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get watering history from the coarsest rollup that fits the resolution."""
+    try:
+        return await watering_series(db, start, end, resolution, zone_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"code": "INVALID_RANGE", "message": str(e)}
+        )
+
+
 @router.get("/water-tank", response_model=WaterTankStatus)
 async def get_water_tank_status(db: AsyncSession = Depends(get_db)):
     """Get water tank status."""
-    result = await db.execute(select(WaterTank).limit(1))
-    tank = result.scalar_one_or_none()
+    tank = await state_cache.get(db, WaterTank)
     
     if not tank:
         tank = WaterTank(
-            id=str(uuid.uuid4()),
+            id=new_id(),
             level=75,
             capacity=1000,
             available=750,
             usage_today=125
         )
-        db.add(tank)
-        await db.commit()
+        # Read on the reader pool; only a first request writes
+        async with AsyncSessionLocal() as write_db:
+            write_db.add(tank)
+            await write_db.commit()
     
     return WaterTankStatus(
         level=tank.level,
@@ -196,6 +241,14 @@ async def refill_water_tank(db: AsyncSession = Depends(get_db)):
         tank.available = tank.capacity
         tank.last_refilled_at = datetime.utcnow()
         tank.low_level_alert = False
+        record_event(db, "garden.status.changed", {
+            "waterTank": {
+                "level": tank.level,
+                "capacity": tank.capacity,
+                "available": tank.available,
+                "lastRefilledAt": tank.last_refilled_at
+            }
+        })
     
     await db.commit()
     
@@ -2,22 +2,41 @@
 Lighting Control Routes
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import case, func, select
+from collections import defaultdict
 from datetime import datetime
-import uuid
 
 from app.core.database import get_db
+from app.core.write_buffer import write_buffer
+from app.core.events import record_event, record_activity
+from app.core.rollups import lighting_series
+from app.core.ids import new_id
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.single_flight import single_flight
+from app.core.versions import conditional
 from app.models import Room, Light, LightingHistory, ActivityLog
 from app.schemas import (
-    LightingStatus, MasterLightRequest, LightControlRequest, LightResponse, SuccessResponse
+    LightingStatus, RoomLights, MasterLightRequest, LightControlRequest, LightResponse,
+    LightingHistorySeries, SuccessResponse
 )
 
 router = APIRouter()
 
 
-@router.get("/status", response_model=LightingStatus)
+def _light_data(light: Light) -> dict:
+    return {
+        "id": light.light_id,
+        "name": light.name,
+        "on": light.on,
+        "brightness": light.brightness,
+        "color": light.color
+    }
+
+
+@router.get("/status", response_model=LightingStatus, dependencies=[Depends(conditional("lighting"))])
+@single_flight.route("lighting.status", resource="lighting")
 async def get_lighting_status(db: AsyncSession = Depends(get_db)):
     """Get lighting status."""
     # Get rooms
@@ -31,24 +50,14 @@ async def get_lighting_status(db: AsyncSession = Depends(get_db)):
     active_lights = [l for l in lights if l.on]
     total_power = sum(l.power_usage or 0 for l in active_lights)
     
-    # Group lights by room
-    rooms_data = []
-    for room in rooms:
-        room_lights = [l for l in lights if l.room_id == room.id]
-        rooms_data.append({
-            "id": room.id,
-            "name": room.name,
-            "lights": [
-                {
-                    "id": l.light_id,
-                    "name": l.name,
-                    "on": l.on,
-                    "brightness": l.brightness,
-                    "color": l.color
-                }
-                for l in room_lights
-            ]
-        })
+    # Group lights by room in one pass
+    lights_by_room = defaultdict(list)
+    for light in lights:
+        lights_by_room[light.room_id].append(_light_data(light))
+    rooms_data = [
+        {"id": room.id, "name": room.name, "lights": lights_by_room.get(room.id, [])}
+        for room in rooms
+    ]
     
     return LightingStatus(
         master_on=len(active_lights) > 0,
@@ -59,6 +68,95 @@ async def get_lighting_status(db: AsyncSession = Depends(get_db)):
     )
 
 
+@router.get("/rooms/{room_id}", response_model=RoomLights, dependencies=[Depends(conditional("lighting"))])
+@single_flight.route("lighting.room", resource="lighting")
+async def get_room_lights(
+    room_id: str,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str = Query(None, description="nextCursor of the previous page"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get one room's lights, in id order.
+
+    Pages are keyed on the light's row id within the room, read from the
+    (room_id, id) index: pass the previous page's nextCursor as cursor.
+    The counts and power usage cover the whole room.
+    """
+    after_id = None
+    if cursor:
+        try:
+            after_id, = decode_cursor(cursor, 1)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={"code": "INVALID_CURSOR", "message": "Malformed cursor"}
+            )
+    
+    # Room and its totals
+    result = await db.execute(
+        select(
+            Room.id,
+            Room.name,
+            func.count(Light.id).label("total"),
+            func.coalesce(func.sum(case((Light.on, 1), else_=0)), 0).label("active"),
+            func.coalesce(func.sum(case((Light.on, Light.power_usage), else_=0)), 0).label("power")
+        )
+        .outerjoin(Light, Light.room_id == Room.id)
+        .where(Room.id == room_id)
+        .group_by(Room.id)
+    )
+    room = result.first()
+    
+    if not room:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"code": "NOT_FOUND", "message": "Room not found"}
+        )
+    
+    # One extra row tells whether there is another page
+    query = select(Light).where(Light.room_id == room_id)
+    if after_id is not None:
+        query = query.where(Light.id > after_id)
+    result = await db.execute(query.order_by(Light.id).limit(limit + 1))
+    lights = result.scalars().all()
+    has_more = len(lights) > limit
+    lights = lights[:limit]
+    
+    return RoomLights(
+        id=room.id,
+        name=room.name,
+        active_lights=room.active,
+        total_lights=room.total,
+        power_usage=float(room.power),
+        lights=[_light_data(light) for light in lights],
+        pagination={
+            "total": room.total,
+            "limit": limit,
+            "hasMore": has_more,
+            "nextCursor": encode_cursor(lights[-1].id) if has_more else None
+        }
+    )
+
+
+@router.get("/history", response_model=LightingHistorySeries)
+async def get_lighting_history(
+    start: datetime = Query(None, description="Range start (default: 24 hours before end)"),
+    end: datetime = Query(None, description="Range end (default: now)"),
+    resolution: int = Query(None, ge=60, description="Seconds per point"),
+    light_id: str = Query(None, description="Only this light"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get light on-time, energy and toggle history from the coarsest rollup that fits the resolution."""
+    try:
+        return await lighting_series(db, start, end, resolution, light_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"code": "INVALID_RANGE", "message": str(e)}
+        )
+
+
 @router.post("/master", response_model=SuccessResponse)
 async def toggle_master_light(
     request: MasterLightRequest,
@@ -75,29 +173,35 @@ async def toggle_master_light(
     # Log history
     for light in lights:
         history = LightingHistory(
-            id=str(uuid.uuid4()),
+            id=new_id(),
             light_id=light.light_id,
             on=request.on,
             brightness=light.brightness,
             power_usage=light.power_usage
         )
-        db.add(history)
+        write_buffer.add(db, history)
     
     # Log activity
     log = ActivityLog(
-        id=str(uuid.uuid4()),
+        id=new_id(),
         timestamp=datetime.utcnow(),
         event=f"All lights {'On' if request.on else 'Off'}",
         log_type="info",
         category="lighting",
         details={"masterOn": request.on}
     )
-    db.add(log)
-    
-    await db.commit()
+    write_buffer.add(db, log)
+    record_activity(db, log)
     
     active_lights = len(lights) if request.on else 0
     total_power = sum(l.power_usage or 0 for l in lights) if request.on else 0
+    record_event(db, "lighting.status.changed", {
+        "masterOn": request.on,
+        "activeLights": active_lights,
+        "powerUsage": total_power
+    })
+    
+    await db.commit()
     
     return SuccessResponse(
         data={
@@ -139,13 +243,19 @@ async def control_light(
     
     # Log history
     history = LightingHistory(
-        id=str(uuid.uuid4()),
+        id=new_id(),
         light_id=light_id,
         on=request.on,
         brightness=request.brightness,
         power_usage=light.power_usage
     )
-    db.add(history)
+    write_buffer.add(db, history)
+    record_event(db, "lighting.status.changed", {
+        "lightId": light_id,
+        "on": request.on,
+        "brightness": request.brightness,
+        "color": request.color
+    })
     
     await db.commit()
     
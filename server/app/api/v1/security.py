@@ -4,11 +4,16 @@ Security Routes
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import literal, null, select, union_all
 from datetime import datetime
-import uuid
 
 from app.core.database import get_db
+from app.core.write_buffer import write_buffer
+from app.core.events import record_event, record_activity
+from app.core.ids import new_id
+from app.core.state_cache import state_cache
+from app.core.single_flight import single_flight
+from app.core.versions import conditional
 from app.models import SecuritySystem, SecuritySensor, Door, SecurityAlert, ActivityLog
 from app.schemas import (
     SecurityStatus, SecurityArmRequest, PanicAlertRequest, GarageControlRequest,
@@ -17,21 +22,33 @@ from app.schemas import (
 
 router = APIRouter()
 
+# Doors then motion sensors, each in table order, as one statement. The
+# door branch comes first so that it types the shared locked and last_at
+# columns.
+_DEVICES = union_all(
+    select(
+        literal("door").label("kind"), Door.id, Door.name, null().label("status"),
+        Door.locked.label("locked"), Door.last_activity_at.label("last_at")
+    ),
+    select(
+        literal("sensor"), SecuritySensor.id, SecuritySensor.name, SecuritySensor.status,
+        null(), SecuritySensor.last_triggered_at
+    )
+)
+
 
-@router.get("/status", response_model=SecurityStatus)
+@router.get("/status", response_model=SecurityStatus, dependencies=[Depends(conditional("security"))])
+@single_flight.route("security.status", resource="security")
 async def get_security_status(db: AsyncSession = Depends(get_db)):
     """Get security system status."""
     # Get security system
-    result = await db.execute(select(SecuritySystem).limit(1))
-    security = result.scalar_one_or_none()
-    
-    # Get sensors
-    result = await db.execute(select(SecuritySensor))
-    sensors = result.scalars().all()
+    security = await state_cache.get(db, SecuritySystem)
     
-    # Get doors
-    result = await db.execute(select(Door))
-    doors = result.scalars().all()
+    # Get doors and sensors in one round trip
+    result = await db.execute(_DEVICES)
+    doors, sensors = [], []
+    for row in result:
+        (doors if row.kind == "door" else sensors).append(row)
     
     return SecurityStatus(
         armed=security.armed if security else False,
@@ -41,22 +58,22 @@ async def get_security_status(db: AsyncSession = Depends(get_db)):
         sensors={
             "frontDoor": {
                 "locked": doors[0].locked if len(doors) > 0 else True,
-                "lastActivity": doors[0].last_activity_at if len(doors) > 0 else None
+                "lastActivity": doors[0].last_at if len(doors) > 0 else None
             } if len(doors) > 0 else {"locked": True, "lastActivity": None},
             "backDoor": {
                 "locked": doors[1].locked if len(doors) > 1 else True,
-                "lastActivity": doors[1].last_activity_at if len(doors) > 1 else None
+                "lastActivity": doors[1].last_at if len(doors) > 1 else None
             } if len(doors) > 1 else {"locked": True, "lastActivity": None},
             "garageDoor": {
                 "state": "closed",
-                "lastActivity": doors[2].last_activity_at if len(doors) > 2 else None
+                "lastActivity": doors[2].last_at if len(doors) > 2 else None
             } if len(doors) > 2 else {"state": "closed", "lastActivity": None},
             "motionDetectors": [
                 {
                     "id": sensor.id,
                     "name": sensor.name,
                     "status": sensor.status,
-                    "lastTriggered": sensor.last_triggered_at
+                    "lastTriggered": sensor.last_at
                 }
                 for sensor in sensors
             ]
@@ -82,7 +99,7 @@ async def arm_security(
             security.last_disarmed_at = datetime.utcnow()
     else:
         security = SecuritySystem(
-            id=str(uuid.uuid4()),
+            id=new_id(),
             armed=request.armed,
             mode=request.mode,
             last_armed_at=datetime.utcnow() if request.armed else None,
@@ -92,14 +109,21 @@ async def arm_security(
     
     # Log activity
     log = ActivityLog(
-        id=str(uuid.uuid4()),
+        id=new_id(),
         timestamp=datetime.utcnow(),
         event=f"System {'Armed' if request.armed else 'Disarmed'}",
         log_type="success",
         category="security",
         details={"mode": request.mode}
     )
-    db.add(log)
+    write_buffer.add(db, log)
+    record_activity(db, log)
+    record_event(db, "security.status.changed", {
+        "armed": security.armed,
+        "mode": security.mode,
+        "lastArmedAt": security.last_armed_at,
+        "lastDisarmedAt": security.last_disarmed_at
+    })
     
     await db.commit()
     
@@ -119,7 +143,7 @@ async def trigger_panic(
 ):
     """Trigger panic alert."""
     alert = SecurityAlert(
-        id=str(uuid.uuid4()),
+        id=new_id(),
         alert_type="panic",
         severity="critical",
         location=request.location,
@@ -130,14 +154,23 @@ async def trigger_panic(
     
     # Log activity
     log = ActivityLog(
-        id=str(uuid.uuid4()),
+        id=new_id(),
         timestamp=datetime.utcnow(),
         event="Panic Alert Triggered",
         log_type="error",
         category="security",
         details={"location": request.location, "type": request.alert_type}
     )
-    db.add(log)
+    write_buffer.add(db, log)
+    record_activity(db, log)
+    record_event(db, "security.alarm.triggered", {
+        "alertId": alert.id,
+        "alertType": alert.alert_type,
+        "severity": alert.severity,
+        "location": request.location,
+        "type": request.alert_type,
+        "triggeredAt": log.timestamp
+    })
     
     await db.commit()
     
@@ -178,14 +211,20 @@ async def control_garage(
     
     # Log activity
     log = ActivityLog(
-        id=str(uuid.uuid4()),
+        id=new_id(),
         timestamp=datetime.utcnow(),
         event=f"Garage Door {'Closed' if request.action == 'close' else 'Opened'}",
         log_type="info",
         category="security",
         details={"doorId": "garage"}
     )
-    db.add(log)
+    write_buffer.add(db, log)
+    record_activity(db, log)
+    record_event(db, "security.status.changed", {
+        "doorId": "garage",
+        "state": "opening" if request.action == "open" else "closed",
+        "lastActivity": door.last_activity_at if door else None
+    })
     
     await db.commit()
     
@@ -218,14 +257,20 @@ async def control_door(
     
     # Log activity
     log = ActivityLog(
-        id=str(uuid.uuid4()),
+        id=new_id(),
         timestamp=datetime.utcnow(),
         event=f"{door.name} {'Locked' if request.action == 'lock' else 'Unlocked'}",
         log_type="info",
         category="security",
         details={"doorId": door_id}
     )
-    db.add(log)
+    write_buffer.add(db, log)
+    record_activity(db, log)
+    record_event(db, "security.status.changed", {
+        "doorId": door_id,
+        "locked": door.locked,
+        "lastActivity": door.last_activity_at
+    })
     
     await db.commit()
     
@@ -6,10 +6,11 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from datetime import datetime
-import uuid
 
 from app.core.database import get_db
+from app.core.write_buffer import write_buffer
 from app.core.security import verify_password, get_password_hash
+from app.core.ids import new_id
 from app.models import User, Biometric, ActivityLog
 from app.schemas import (
     UserResponse, UserUpdate, UserChangePIN, UserRegisterBiometric, SuccessResponse
@@ -107,14 +108,14 @@ async def change_pin(
     
     # Log activity
     log = ActivityLog(
-        id=str(uuid.uuid4()),
+        id=new_id(),
         timestamp=datetime.utcnow(),
         event="PIN Changed",
         log_type="info",
         category="user",
         details={"userId": user.id}
     )
-    db.add(log)
+    write_buffer.add(db, log)
     
     await db.commit()
     
@@ -151,7 +152,7 @@ async def register_biometric(
         existing.updated_at = datetime.utcnow()
     else:
         biometric = Biometric(
-            id=str(uuid.uuid4()),
+            id=new_id(),
             user_id=user.id,
             biometric_type=request.biometric_type,
             biometric_data=request.biometric_data,
@@ -161,14 +162,14 @@ async def register_biometric(
     
     # Log activity
     log = ActivityLog(
-        id=str(uuid.uuid4()),
+        id=new_id(),
         timestamp=datetime.utcnow(),
         event=f"Biometric Registered ({request.biometric_type})",
         log_type="info",
         category="user",
         details={"userId": user.id, "type": request.biometric_type}
     )
-    db.add(log)
+    write_buffer.add(db, log)
     
     await db.commit()
     
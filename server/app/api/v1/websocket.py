@@ -3,47 +3,333 @@ WebSocket Routes for Real-time Updates
 """
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, Depends
-from typing import Set, Dict, Any
+from typing import Set, Dict, Any, Callable, Deque, List, Optional, Tuple, Union
+from collections import deque
+from datetime import date, datetime
+from decimal import Decimal
+import asyncio
 import json
 import logging
+import time
+import uuid
 
+from app.core.broadcast import BroadcastBackend, create_backend
+from app.core.channels import ChannelTrie, is_pattern
+from app.core.coalescing import Coalescer
+from app.core.config import settings
+from app.core.events import DomainEvent, event_bus
+from app.core.logs import RateLimitedLog
+from app.core.metrics import register_collector
+from app.core.protocols import (
+    OutgoingFrame, decode_binary, hello_message, is_binary, negotiate, transport_deflate
+)
+from app.core.replay import EventLog
 from app.core.security import decode_token
 
 logger = logging.getLogger(__name__)
 
+# Per-connection log sites, rate limited so that reconnect storms cannot flood the log
+_connection_log = RateLimitedLog(logger, settings.LOG_HOT_PATH_RATE)
+_subscription_log = RateLimitedLog(logger, settings.LOG_HOT_PATH_RATE)
+_slow_consumer_log = RateLimitedLog(logger, settings.LOG_HOT_PATH_RATE)
+
 router = APIRouter()
 
+# Slow-consumer policies applied when a connection's outbound queue is full
+POLICY_DROP_OLDEST = "drop_oldest"
+POLICY_DROP_CONNECTION = "drop_connection"
+POLICY_COALESCE = "coalesce"
+SLOW_CONSUMER_POLICIES = (POLICY_DROP_OLDEST, POLICY_DROP_CONNECTION, POLICY_COALESCE)
+
+# A message either as a dict or already JSON-encoded to text/bytes
+Payload = Union[Dict[str, Any], str, bytes]
+
+
+def _json_default(value: Any) -> Any:
+    """Encode values the json module does not handle natively."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_payload(payload: Payload) -> str:
+    """
+    Encode a payload to a JSON text frame.
+    
+    Args:
+        payload: Dict to encode, or an already encoded JSON str/bytes
+        
+    Returns:
+        str: JSON text ready to be sent as a WebSocket text frame
+    """
+    if isinstance(payload, str):
+        return payload
+    if isinstance(payload, (bytes, bytearray)):
+        return payload.decode("utf-8")
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=_json_default)
+
+
+def encode_event(event: str, data: Payload) -> str:
+    """
+    Encode an event envelope, splicing in pre-encoded data without re-parsing it.
+    
+    Args:
+        event: Event name
+        data: Event data as a dict or pre-encoded JSON
+        
+    Returns:
+        str: Encoded {"event": ..., "data": ...} frame
+    """
+    return f'{{"event":{json.dumps(event)},"data":{encode_payload(data)}}}'
+
+
+class OutboundQueue:
+    """
+    Bounded per-connection send queue drained by the connection's writer task.
+    
+    Channel frames carry a per-channel seq, so evicting one leaves a gap the
+    client cannot see until it reconnects. With a resync encoder, the
+    channels that lost a frame are reported in one resync message sent
+    ahead of the next queued frame; it is not counted against maxsize.
+    """
+    
+    def __init__(
+        self,
+        maxsize: int,
+        policy: str,
+        resync: Optional[Callable[[List[str]], OutgoingFrame]] = None
+    ):
+        self.maxsize = maxsize
+        self.policy = policy
+        self._resync = resync
+        # Queued items: (channel, encoded frame); channel is None for direct replies
+        self._items: Deque[Tuple[Optional[str], OutgoingFrame]] = deque()
+        # Channels that lost a frame since the last resync went out
+        self._gaps: Set[str] = set()
+        self._ready = asyncio.Event()
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    def put(self, channel: Optional[str], frame: OutgoingFrame) -> int:
+        """
+        Enqueue an encoded frame without blocking.
+        
+        Args:
+            channel: Channel the frame was published on
+            frame: Encoded frame to send
+            
+        Returns:
+            int: Number of messages dropped to make room, or -1 if the
+            connection should be dropped instead
+        """
+        dropped = 0
+        if len(self._items) >= self.maxsize:
+            if self.policy == POLICY_DROP_CONNECTION:
+                return -1
+            
+            if self.policy == POLICY_COALESCE and channel is not None:
+                # Last value wins: replace the pending message for this channel in place
+                for index, (queued_channel, _) in enumerate(self._items):
+                    if queued_channel == channel:
+                        self._items[index] = (channel, frame)
+                        self._evicted(channel)
+                        return 1
+            
+            evicted_channel, _ = self._items.popleft()
+            self._evicted(evicted_channel)
+            dropped = 1
+        
+        self._items.append((channel, frame))
+        self._ready.set()
+        return dropped
+    
+    def _evicted(self, channel: Optional[str]) -> None:
+        if channel is not None and self._resync is not None:
+            self._gaps.add(channel)
+    
+    async def get(self) -> Tuple[Optional[str], OutgoingFrame]:
+        """Wait for and remove the next queued frame, or the pending resync."""
+        while not self._items and not self._gaps:
+            self._ready.clear()
+            await self._ready.wait()
+        if self._gaps:
+            channels = sorted(self._gaps)
+            self._gaps.clear()
+            return None, self._resync(channels)
+        return self._items.popleft()
+
 
 class ConnectionManager:
     """Manages WebSocket connections and subscriptions."""
     
-    def __init__(self):
-        # Store active connections: {connection_id: {"websocket": websocket, "user_id": user_id, "subscriptions": set}}
+    def __init__(
+        self,
+        queue_size: int = settings.WS_SEND_QUEUE_SIZE,
+        slow_consumer_policy: str = settings.WS_SLOW_CONSUMER_POLICY,
+        backend: Optional[BroadcastBackend] = None,
+        heartbeat_interval: float = settings.WS_HEARTBEAT_INTERVAL,
+        heartbeat_max_missed: int = settings.WS_HEARTBEAT_MAX_MISSED
+    ):
+        if slow_consumer_policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow consumer policy: {slow_consumer_policy}")
+        
+        # Carries published frames to every worker; defaults to this process only
+        self.backend = backend or create_backend("memory", settings.WS_BROADCAST_SOCKET)
+        self.backend.set_handler(self.deliver)
+        # Sequence numbers and recent frames per channel, for resuming clients
+        self.event_log = EventLog(settings.WS_REPLAY_BUFFER_SIZE)
+        # Throttles high-frequency channels before they are published
+        self.coalescer = Coalescer(
+            self._publish,
+            default_window_ms=settings.WS_COALESCE_WINDOW_MS,
+            channel_windows_ms=settings.WS_COALESCE_CHANNEL_WINDOWS_MS,
+            entity_keys=settings.WS_COALESCE_ENTITY_KEYS,
+            max_rate=settings.WS_MAX_EVENTS_PER_SECOND,
+            bypass_channels=settings.WS_COALESCE_BYPASS_CHANNELS
+        )
+        self.queue_size = queue_size
+        self.slow_consumer_policy = slow_consumer_policy
+        # Store active connections: {connection_id: {"websocket": websocket, "user_id": user_id, "subscriptions": set,
+        #                                            "outbox": OutboundQueue, "writer": asyncio.Task}}
         self.active_connections: Dict[str, Dict[str, Any]] = {}
         # Store subscriptions by channel: {channel: set(connection_ids)}
         self.channel_subscriptions: Dict[str, Set[str]] = {}
+        # Wildcard subscriptions such as "security.*" or "*.status.changed"
+        self.pattern_subscriptions = ChannelTrie()
+        # Messages discarded for slow consumers, by policy
+        self.dropped_messages: Dict[str, int] = {policy: 0 for policy in SLOW_CONSUMER_POLICIES}
+        self.dropped_connections = 0
+        # Heartbeat: ping every interval, reap connections that miss too many pongs
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_max_missed = heartbeat_max_missed
+        self.reaped_connections = 0
+        self._heartbeat_task: Optional[asyncio.Task] = None
     
-    async def connect(self, websocket: WebSocket, connection_id: str, user_id: str) -> None:
-        """Accept a new WebSocket connection."""
-        await websocket.accept()
+    async def start(self) -> None:
+        """Start the broadcast backend and the heartbeat task."""
+        await self.backend.start()
+        if self.heartbeat_interval > 0:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat())
+    
+    async def stop(self) -> None:
+        """Stop the heartbeat, publish pending coalesced events and stop the broadcast backend."""
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat_task = None
+        await self.coalescer.flush()
+        await self.backend.stop()
+    
+    async def connect(
+        self,
+        websocket: WebSocket,
+        connection_id: str,
+        user_id: str,
+        subprotocol: Optional[str] = None
+    ) -> None:
+        """Accept a new WebSocket connection using the negotiated subprotocol."""
+        await websocket.accept(subprotocol=subprotocol)
+        outbox = OutboundQueue(self.queue_size, self.slow_consumer_policy, resync=self._resync_frame)
+        binary = is_binary(subprotocol)
+        # Deflating in the app as well would compress binary frames twice
+        deflate = not transport_deflate(getattr(websocket, "scope", {}).get("headers", []))
         self.active_connections[connection_id] = {
             "websocket": websocket,
             "user_id": user_id,
-            "subscriptions": set()
+            "subscriptions": set(),
+            "outbox": outbox,
+            "writer": asyncio.create_task(self._writer(connection_id, websocket, outbox, binary, deflate)),
+            "binary": binary,
+            "last_seen": time.monotonic(),
+            "missed_pongs": 0
         }
-        logger.info(f"WebSocket connection established: {connection_id} for user {user_id}")
+        if binary:
+            self.send_personal(connection_id, hello_message(deflate))
+        _connection_log.info("WebSocket connection established: %s for user %s (%s)", connection_id, user_id, subprotocol or "json")
+    
+    def _resync_frame(self, channels: List[str]) -> OutgoingFrame:
+        """Encode a resync for channels whose frames a connection lost."""
+        return OutgoingFrame(encode_payload({
+            "event": "resync",
+            "channels": channels,
+            "epoch": self.event_log.epoch
+        }))
     
     def disconnect(self, connection_id: str) -> None:
         """Remove a WebSocket connection."""
         if connection_id in self.active_connections:
+            connection = self.active_connections[connection_id]
+            
             # Remove from all channel subscriptions
-            subscriptions = self.active_connections[connection_id]["subscriptions"]
+            subscriptions = connection["subscriptions"]
             for channel in subscriptions:
-                if channel in self.channel_subscriptions:
-                    self.channel_subscriptions[channel].discard(connection_id)
+                self._remove_subscription(connection_id, channel)
+            
+            # Stop the writer unless it is the one tearing the connection down
+            writer = connection["writer"]
+            if writer is not asyncio.current_task():
+                writer.cancel()
             
             del self.active_connections[connection_id]
-            logger.info(f"WebSocket connection closed: {connection_id}")
+            # Throttle state for channels nobody here listens to any more
+            self.coalescer.discard(
+                channel for channel in self.coalescer.channels() if not self.subscribers(channel)
+            )
+            _connection_log.info("WebSocket connection closed: %s", connection_id)
+    
+    async def _writer(
+        self, connection_id: str, websocket: WebSocket, outbox: OutboundQueue, binary: bool, deflate: bool
+    ) -> None:
+        """Drain a connection's outbound queue onto its socket."""
+        try:
+            while True:
+                _, frame = await outbox.get()
+                if binary:
+                    await websocket.send_bytes(frame.binary(deflate))
+                else:
+                    await websocket.send_text(frame.text)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error sending message to {connection_id}: {e}")
+            self.disconnect(connection_id)
+    
+    def _enqueue(self, connection_id: str, channel: Optional[str], frame: OutgoingFrame) -> bool:
+        """Queue a frame for one connection, applying the slow-consumer policy."""
+        outbox = self.active_connections[connection_id]["outbox"]
+        dropped = outbox.put(channel, frame)
+        
+        if dropped < 0:
+            # Everything still queued is discarded along with the new message
+            self.dropped_messages[POLICY_DROP_CONNECTION] += len(outbox) + 1
+            return False
+        if dropped:
+            self.dropped_messages[outbox.policy] += dropped
+        return True
+    
+    def _drop_slow_connection(self, connection_id: str) -> None:
+        """Disconnect a consumer that cannot keep up."""
+        websocket = self.active_connections[connection_id]["websocket"]
+        self.disconnect(connection_id)
+        self.dropped_connections += 1
+        _slow_consumer_log.warning("Dropping slow WebSocket consumer: %s", connection_id)
+        asyncio.create_task(self._close_quietly(websocket, code=1013, reason="Slow consumer"))
+    
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket, code: int, reason: str) -> None:
+        """Close a socket, ignoring errors from an already broken connection."""
+        try:
+            await websocket.close(code=code, reason=reason)
+        except Exception:
+            pass
     
     def subscribe(self, connection_id: str, channels: list) -> None:
         """Subscribe a connection to specific channels."""
@@ -51,15 +337,18 @@ class ConnectionManager:
             return
         
         for channel in channels:
-            # Add to channel subscriptions
-            if channel not in self.channel_subscriptions:
-                self.channel_subscriptions[channel] = set()
-            self.channel_subscriptions[channel].add(connection_id)
+            # Add to channel or pattern subscriptions
+            if is_pattern(channel):
+                self.pattern_subscriptions.add(channel, connection_id)
+            else:
+                if channel not in self.channel_subscriptions:
+                    self.channel_subscriptions[channel] = set()
+                self.channel_subscriptions[channel].add(connection_id)
             
             # Add to connection's subscriptions
             self.active_connections[connection_id]["subscriptions"].add(channel)
         
-        logger.info(f"Connection {connection_id} subscribed to channels: {channels}")
+        _subscription_log.info("Connection %s subscribed to channels: %s", connection_id, channels)
     
     def unsubscribe(self, connection_id: str, channels: list) -> None:
         """Unsubscribe a connection from specific channels."""
@@ -67,38 +356,184 @@ class ConnectionManager:
             return
         
         for channel in channels:
-            # Remove from channel subscriptions
-            if channel in self.channel_subscriptions:
-                self.channel_subscriptions[channel].discard(connection_id)
+            # Remove from channel or pattern subscriptions
+            self._remove_subscription(connection_id, channel)
             
             # Remove from connection's subscriptions
             self.active_connections[connection_id]["subscriptions"].discard(channel)
         
-        logger.info(f"Connection {connection_id} unsubscribed from channels: {channels}")
+        _subscription_log.info("Connection %s unsubscribed from channels: %s", connection_id, channels)
+    
+    def _remove_subscription(self, connection_id: str, channel: str) -> None:
+        """Remove one channel or pattern subscription from the indexes."""
+        if is_pattern(channel):
+            self.pattern_subscriptions.remove(channel, connection_id)
+        elif channel in self.channel_subscriptions:
+            self.channel_subscriptions[channel].discard(connection_id)
+            if not self.channel_subscriptions[channel]:
+                del self.channel_subscriptions[channel]
+    
+    def subscribers(self, channel: str) -> Set[str]:
+        """Get the connections subscribed to a channel, directly or by pattern."""
+        exact = self.channel_subscriptions.get(channel)
+        if not len(self.pattern_subscriptions):
+            return exact or set()
+        
+        matched = self.pattern_subscriptions.match(channel)
+        if exact:
+            matched |= exact
+        return matched
+    
+    def touch(self, connection_id: str) -> None:
+        """Record inbound traffic from a connection; any message counts as a pong."""
+        connection = self.active_connections.get(connection_id)
+        if connection is not None:
+            connection["last_seen"] = time.monotonic()
+            connection["missed_pongs"] = 0
+    
+    async def _heartbeat(self) -> None:
+        """Ping every connection each interval and reap those that stopped answering."""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                self.check_heartbeats()
+            except Exception as e:
+                logger.error(f"WebSocket heartbeat error: {e}")
+    
+    def check_heartbeats(self) -> None:
+        """Run one heartbeat round."""
+        ping = OutgoingFrame(encode_payload({"event": "ping", "ts": time.time()}))
+        for connection_id, connection in list(self.active_connections.items()):
+            if connection["missed_pongs"] >= self.heartbeat_max_missed:
+                self._reap(connection_id)
+                continue
+            
+            connection["missed_pongs"] += 1
+            if not self._enqueue(connection_id, None, ping):
+                self._drop_slow_connection(connection_id)
+    
+    def _reap(self, connection_id: str) -> None:
+        """Disconnect a connection that missed too many pongs."""
+        websocket = self.active_connections[connection_id]["websocket"]
+        self.disconnect(connection_id)
+        self.reaped_connections += 1
+        _connection_log.info("Reaped unresponsive WebSocket connection: %s", connection_id)
+        asyncio.create_task(self._close_quietly(websocket, code=1001, reason="Heartbeat timeout"))
+    
+    def send_personal(self, connection_id: str, message: Payload) -> None:
+        """Queue a direct reply to a single connection."""
+        if connection_id not in self.active_connections:
+            return
+        
+        if not self._enqueue(connection_id, None, OutgoingFrame(encode_payload(message))):
+            self._drop_slow_connection(connection_id)
+    
+    async def broadcast(self, channel: str, message: Payload, entity: Optional[Any] = None) -> None:
+        """
+        Broadcast a message to all connections subscribed to a channel.
+        
+        High-frequency channels are coalesced per channel (or per entity)
+        with last-value-wins semantics; critical channels bypass this.
+        """
+        await self.coalescer.submit(channel, message, entity)
+    
+    async def _publish(self, channel: str, message: Payload) -> None:
+        """
+        Encode a message once and publish it through the broadcast backend,
+        which hands the same frame to every worker's deliver().
+        """
+        await self.backend.publish(channel, encode_payload(message))
     
-    async def broadcast(self, channel: str, message: Dict[str, Any]) -> None:
-        """Broadcast a message to all connections subscribed to a channel."""
-        if channel not in self.channel_subscriptions:
+    def deliver(self, channel: str, frame: str) -> None:
+        """
+        Queue an encoded frame for every local subscriber of a channel.
+        
+        Every frame is stamped with the channel's next sequence number and kept
+        in the replay buffer, even without local subscribers, so reconnecting
+        clients can catch up. Frames are only queued here; each connection's
+        writer task performs the actual send, so a slow subscriber never
+        delays the others.
+        """
+        _, stamped = self.event_log.append(channel, frame)
+        
+        subscribers = self.subscribers(channel)
+        if not subscribers:
             return
         
-        disconnected_connections = []
+        # Shared by every subscriber; binary connections reuse one binary encoding
+        outgoing = OutgoingFrame(stamped)
+        slow_connections = []
         
-        for connection_id in self.channel_subscriptions[channel]:
+        for connection_id in subscribers:
             if connection_id in self.active_connections:
-                try:
-                    websocket = self.active_connections[connection_id]["websocket"]
-                    await websocket.send_json(message)
-                except Exception as e:
-                    logger.error(f"Error sending message to {connection_id}: {e}")
-                    disconnected_connections.append(connection_id)
-        
-        # Clean up disconnected connections
-        for connection_id in disconnected_connections:
-            self.disconnect(connection_id)
+                if not self._enqueue(connection_id, channel, outgoing):
+                    slow_connections.append(connection_id)
+        
+        # Drop consumers that exceeded their queue under the drop_connection policy
+        for connection_id in slow_connections:
+            self._drop_slow_connection(connection_id)
+    
+    def resume(self, connection_id: str, last_seqs: Dict[str, int], epoch: Optional[str]) -> List[str]:
+        """
+        Replay the frames a reconnecting client missed.
+        
+        Only channels the connection is subscribed to, directly or by
+        pattern, are replayed; the others are ignored.
+        
+        Args:
+            connection_id: Connection to replay to
+            last_seqs: Last sequence number the client saw, by channel
+            epoch: Epoch the client's sequence numbers belong to
+            
+        Returns:
+            List[str]: Channels that cannot be replayed and need a full resync
+        """
+        if connection_id not in self.active_connections:
+            return []
+        
+        resync = []
+        for channel, last_seq in last_seqs.items():
+            if not isinstance(channel, str) or connection_id not in self.subscribers(channel):
+                continue
+            
+            frames = None
+            if epoch == self.event_log.epoch and isinstance(last_seq, int):
+                frames = self.event_log.since(channel, last_seq)
+            
+            # Replaying more than the queue holds would just be dropped again
+            if frames is None or len(frames) > self.queue_size:
+                resync.append(channel)
+                continue
+            
+            for frame in frames:
+                if not self._enqueue(connection_id, channel, OutgoingFrame(frame)):
+                    self._drop_slow_connection(connection_id)
+                    return resync
+        
+        return resync
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get connection, heartbeat and slow-consumer counters."""
+        idle_after = time.monotonic() - self.heartbeat_interval
+        return {
+            "connections": len(self.active_connections),
+            "idle_connections": sum(1 for c in self.active_connections.values() if c["last_seen"] < idle_after),
+            "reaped_connections": self.reaped_connections,
+            "pattern_subscriptions": len(self.pattern_subscriptions),
+            "queued_messages": sum(len(c["outbox"]) for c in self.active_connections.values()),
+            "slow_consumer_policy": self.slow_consumer_policy,
+            "dropped_messages": dict(self.dropped_messages),
+            "dropped_connections": self.dropped_connections,
+            "broadcast": self.backend.stats(),
+            "coalescing": self.coalescer.stats()
+        }
 
 
 # Global connection manager instance
-manager = ConnectionManager()
+manager = ConnectionManager(
+    backend=create_backend(settings.WS_BROADCAST_BACKEND, settings.WS_BROADCAST_SOCKET)
+)
+register_collector("websocket", manager.stats)
 
 
 @router.websocket("/ws")
@@ -121,16 +556,42 @@ async def websocket_endpoint(
     - lighting.status.changed: Lighting status changed
     - activity.log.new: New activity log entry
     - camera.motion.detected: Motion detected on camera
+    - camera.status.changed: Camera recording started or stopped
+    - garden.status.changed: Water tank or watering schedule changed
     
     Client → Server:
     - subscribe: Subscribe to specific events
     - unsubscribe: Unsubscribe from events
+    - pong: Reply to a server ping
+    - ping: Ask the server for a pong
+    
+    The server sends {"event": "ping", "ts": ...} every WS_HEARTBEAT_INTERVAL seconds.
+    Connections that stay silent for WS_HEARTBEAT_MAX_MISSED pings are closed.
     
     Subscribe Example:
     {
       "event": "subscribe",
       "channels": ["security.status.changed", "climate.status.changed"]
     }
+    
+    Resume Example (reconnecting client replays missed events):
+    {
+      "event": "subscribe",
+      "channels": ["security.*"],
+      "epoch": "3f9a1c2b7d4e",
+      "last_seq": {"security.status.changed": 41}
+    }
+    
+    Every event carries "seq" (per channel) and "epoch". Missed events are replayed
+    in order; channels whose gap is no longer buffered get a "resync" event and
+    the client should refetch their status endpoints.
+    
+    Channels may use "*" wildcards: "security.*" matches every security event and
+    "*.status.changed" matches the status events of every domain.
+    
+    Binary protocol: offer the "omnihome.msgpack" subprotocol to receive MessagePack
+    frames with interned event ids (announced in an initial "hello" message) instead
+    of JSON text. Plain JSON remains the default.
     """
     # Verify token
     try:
@@ -150,31 +611,61 @@ async def websocket_endpoint(
     # Generate connection ID
     connection_id = f"{user_id}_{id(websocket)}"
     
-    # Accept connection
-    await manager.connect(websocket, connection_id, user_id)
+    # Accept connection, preferring a binary subprotocol when the client offers one
+    subprotocol = negotiate(websocket.scope.get("subprotocols", []))
+    await manager.connect(websocket, connection_id, user_id, subprotocol)
     
     try:
         while True:
-            # Receive message from client
-            data = await websocket.receive_text()
-            message = json.loads(data)
+            # Receive message from client (JSON text, or binary frames on omnihome.msgpack)
+            received = await websocket.receive()
+            if received["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(received.get("code", 1000))
+            if received.get("text") is not None:
+                message = json.loads(received["text"])
+            else:
+                message = decode_binary(received["bytes"])
+            manager.touch(connection_id)
             
             event = message.get("event")
             channels = message.get("channels", [])
             
-            if event == "subscribe":
+            if event == "pong":
+                # Heartbeat reply; touch() already recorded it
+                pass
+            
+            elif event == "ping":
+                manager.send_personal(connection_id, {"event": "pong", "ts": message.get("ts")})
+            
+            elif event == "subscribe":
                 # Subscribe to channels
                 manager.subscribe(connection_id, channels)
-                await websocket.send_json({
+                manager.send_personal(connection_id, {
                     "event": "subscribed",
                     "channels": channels,
+                    "epoch": manager.event_log.epoch,
+                    "seq": {
+                        channel: manager.event_log.current(channel)
+                        for channel in channels if not is_pattern(channel)
+                    },
                     "status": "success"
                 })
+                
+                # Replay what a reconnecting client missed
+                last_seq = message.get("last_seq")
+                if isinstance(last_seq, dict) and last_seq:
+                    resync = manager.resume(connection_id, last_seq, message.get("epoch"))
+                    if resync:
+                        manager.send_personal(connection_id, {
+                            "event": "resync",
+                            "channels": resync,
+                            "epoch": manager.event_log.epoch
+                        })
             
             elif event == "unsubscribe":
                 # Unsubscribe from channels
                 manager.unsubscribe(connection_id, channels)
-                await websocket.send_json({
+                manager.send_personal(connection_id, {
                     "event": "unsubscribed",
                     "channels": channels,
                     "status": "success"
@@ -182,7 +673,7 @@ async def websocket_endpoint(
             
             else:
                 # Unknown event
-                await websocket.send_json({
+                manager.send_personal(connection_id, {
                     "event": "error",
                     "message": f"Unknown event: {event}",
                     "status": "error"
@@ -195,59 +686,54 @@ async def websocket_endpoint(
         manager.disconnect(connection_id)
 
 
-# Helper functions for broadcasting events (can be called from other modules)
+# Helper functions for broadcasting events (can be called from other modules).
+# `data` may be a dict or an already JSON-encoded str/bytes payload.
+
+async def _broadcast_event(event: str, data: Payload) -> None:
+    """Encode an event and broadcast it on the channel of the same name."""
+    entity = manager.coalescer.entity_of(event, data)
+    await manager.broadcast(event, encode_event(event, data), entity=entity)
+
+
+async def publish_domain_events(events: List[DomainEvent]) -> None:
+    """Broadcast the domain events of one committed transaction."""
+    for domain_event in events:
+        await _broadcast_event(domain_event.channel, domain_event.data)
+
+
+event_bus.subscribe(publish_domain_events)
+
 
-async def broadcast_security_status_changed(data: Dict[str, Any]) -> None:
+async def broadcast_security_status_changed(data: Payload) -> None:
     """Broadcast security status change event."""
-    await manager.broadcast("security.status.changed", {
-        "event": "security.status.changed",
-        "data": data
-    })
+    await _broadcast_event("security.status.changed", data)
 
 
-async def broadcast_security_alarm_triggered(data: Dict[str, Any]) -> None:
+async def broadcast_security_alarm_triggered(data: Payload) -> None:
     """Broadcast security alarm triggered event."""
-    await manager.broadcast("security.alarm.triggered", {
-        "event": "security.alarm.triggered",
-        "data": data
-    })
+    await _broadcast_event("security.alarm.triggered", data)
 
 
-async def broadcast_climate_status_changed(data: Dict[str, Any]) -> None:
+async def broadcast_climate_status_changed(data: Payload) -> None:
     """Broadcast climate status change event."""
-    await manager.broadcast("climate.status.changed", {
-        "event": "climate.status.changed",
-        "data": data
-    })
+    await _broadcast_event("climate.status.changed", data)
 
 
-async def broadcast_garden_zone_changed(data: Dict[str, Any]) -> None:
+async def broadcast_garden_zone_changed(data: Payload) -> None:
     """Broadcast garden zone status change event."""
-    await manager.broadcast("garden.zone.changed", {
-        "event": "garden.zone.changed",
-        "data": data
-    })
+    await _broadcast_event("garden.zone.changed", data)
 
 
-async def broadcast_lighting_status_changed(data: Dict[str, Any]) -> None:
+async def broadcast_lighting_status_changed(data: Payload) -> None:
     """Broadcast lighting status change event."""
-    await manager.broadcast("lighting.status.changed", {
-        "event": "lighting.status.changed",
-        "data": data
-    })
+    await _broadcast_event("lighting.status.changed", data)
 
 
-async def broadcast_activity_log_new(data: Dict[str, Any]) -> None:
+async def broadcast_activity_log_new(data: Payload) -> None:
     """Broadcast new activity log event."""
-    await manager.broadcast("activity.log.new", {
-        "event": "activity.log.new",
-        "data": data
-    })
+    await _broadcast_event("activity.log.new", data)
 
 
-async def broadcast_camera_motion_detected(data: Dict[str, Any]) -> None:
+async def broadcast_camera_motion_detected(data: Payload) -> None:
     """Broadcast camera motion detected event."""
-    await manager.broadcast("camera.motion.detected", {
-        "event": "camera.motion.detected",
-        "data": data
-    })
+    await _broadcast_event("camera.motion.detected", data)
@@ -0,0 +1,151 @@
+"""
+Maintained row counts for the activity log
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from collections import Counter
+from datetime import datetime, timezone
+
+from sqlalchemy import Executable, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.core.retention import retention
+from app.core.write_buffer import Row, write_buffer
+from app.models import ActivityLog, ActivityLogCount
+
+_TABLE = ActivityLog.__tablename__
+
+
+def _add(counts: Dict[str, int]) -> Tuple[Executable, List[Dict[str, Any]]]:
+    """Get the statement adding signed deltas to the per-type counters."""
+    table = ActivityLogCount.__table__
+    stmt = sqlite_insert(table)
+    return (
+        stmt.on_conflict_do_update(
+            index_elements=["log_type"],
+            set_={"count": table.c.count + stmt.excluded.count}
+        ),
+        [{"log_type": log_type, "count": count} for log_type, count in counts.items()]
+    )
+
+
+def activity_count_statements(rows: List[Row]) -> List[Tuple[Executable, List[Dict[str, Any]]]]:
+    """
+    Count activity log rows in the transaction that writes them.
+
+    Args:
+        rows: Rows about to be committed
+
+    Returns:
+        list: Counter update, if any of the rows are activity log rows
+    """
+    counts = Counter(values["log_type"] for table, values in rows if table.name == _TABLE)
+    return [_add(counts)] if counts else []
+
+
+async def subtract_activity_counts(conn: AsyncConnection, table: str, rowids: List[int]) -> None:
+    """
+    Uncount activity log rows about to be pruned.
+
+    Args:
+        conn: Connection in the pruning transaction
+        table: Table the rows are removed from
+        rowids: Rowids of the removed rows
+    """
+    if table != _TABLE:
+        return
+    result = await conn.exec_driver_sql(
+        f'SELECT log_type FROM "{_TABLE}" WHERE rowid IN ({",".join("?" * len(rowids))})', tuple(rowids)
+    )
+    counts = {log_type: -count for log_type, count in Counter(row[0] for row in result).items()}
+    if counts:
+        await conn.execute(*_add(counts))
+
+
+write_buffer.add_statements(activity_count_statements)
+retention.add_listener(subtract_activity_counts)
+
+
+async def seed_activity_counts(conn: AsyncConnection) -> None:
+    """
+    Count the existing activity log once, if the counters are empty.
+
+    For databases created before the counters existed.
+
+    Args:
+        conn: Connection in the transaction to seed the counters in
+    """
+    if (await conn.execute(select(ActivityLogCount.log_type).limit(1))).first() is not None:
+        return
+    await conn.execute(
+        ActivityLogCount.__table__.insert().from_select(
+            ["log_type", "count"],
+            select(ActivityLog.log_type, func.count()).group_by(ActivityLog.log_type)
+        )
+    )
+
+
+async def count_activity_logs(db: AsyncSession, log_type: Optional[str] = None) -> int:
+    """
+    Get the number of activity log rows from the counters.
+
+    Args:
+        db: Database session
+        log_type: Only rows of this type (default: all rows)
+
+    Returns:
+        int: Row count
+    """
+    query = select(func.coalesce(func.sum(ActivityLogCount.count), 0))
+    if log_type:
+        query = query.where(ActivityLogCount.log_type == log_type)
+    return (await db.execute(query)).scalar()
+
+
+def _naive_utc(ts: datetime) -> datetime:
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+async def estimate_activity_logs(
+    db: AsyncSession,
+    log_type: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> int:
+    """
+    Estimate the number of activity log rows in a time range.
+
+    Scales the counted rows by the share of the log's time span that the
+    range covers, assuming rows are spread evenly over time. Costs two index
+    lookups for the oldest and newest timestamps.
+
+    Args:
+        db: Database session
+        log_type: Only rows of this type (default: all rows)
+        start: Range start (default: oldest row)
+        end: Range end (default: newest row)
+
+    Returns:
+        int: Estimated row count
+    """
+    total = await count_activity_logs(db, log_type)
+    if not total or (start is None and end is None):
+        return total
+
+    # Separate queries: SQLite only answers a lone min() or max() from the index
+    oldest = (await db.execute(select(func.min(ActivityLog.timestamp)))).scalar()
+    newest = (await db.execute(select(func.max(ActivityLog.timestamp)))).scalar()
+    if oldest is None or newest is None:
+        return 0
+    oldest, newest = _naive_utc(oldest), _naive_utc(newest)
+    low = max(_naive_utc(start), oldest) if start else oldest
+    high = min(_naive_utc(end), newest) if end else newest
+    if high < low:
+        return 0
+    span = (newest - oldest).total_seconds()
+    if span <= 0:
+        return total
+    return round(total * (high - low).total_seconds() / span)
@@ -0,0 +1,326 @@
+"""
+Broadcast backends for WebSocket fan-out across worker processes
+"""
+
+from typing import Callable, Optional, Set
+import asyncio
+import fcntl
+import logging
+import os
+import struct
+
+from app.core.config import settings
+from app.core.logs import RateLimitedLog
+
+logger = logging.getLogger(__name__)
+
+# Logged on every publish while the relay is down
+_relay_unavailable_log = RateLimitedLog(logger, settings.LOG_HOT_PATH_RATE)
+
+# Local delivery callback: (channel, encoded frame)
+DeliverHandler = Callable[[str, str], None]
+
+# Relay wire format: 4-byte big-endian length, then b"<channel>\n<frame>"
+_HEADER = struct.Struct("!I")
+_MAX_FRAME_SIZE = 16 * 1024 * 1024
+# A peer whose unsent relay buffer grows past this is disconnected
+_MAX_PEER_BUFFER = 8 * 1024 * 1024
+_RECONNECT_DELAY = 0.5
+
+
+class BroadcastBackend:
+    """
+    Base class for broadcast backends.
+
+    A backend carries encoded frames published in one worker to every
+    worker, where the handler fans them out to local subscribers.
+    """
+
+    # True if every subscriber lives in this process
+    is_local = True
+
+    def __init__(self):
+        self._deliver: Optional[DeliverHandler] = None
+
+    def set_handler(self, deliver: DeliverHandler) -> None:
+        """Set the callback that delivers a frame to local subscribers."""
+        self._deliver = deliver
+
+    async def start(self) -> None:
+        """Start the backend."""
+
+    async def stop(self) -> None:
+        """Stop the backend."""
+
+    async def publish(self, channel: str, frame: str) -> None:
+        """Publish a frame to every worker, including this one."""
+        raise NotImplementedError
+
+    @property
+    def is_leader(self) -> bool:
+        """True in the one worker that runs jobs meant for a single process."""
+        return True
+
+    def stats(self) -> dict:
+        """Get backend counters."""
+        return {"backend": self.name}
+
+    @property
+    def name(self) -> str:
+        return type(self).__name__
+
+    def _deliver_local(self, channel: str, frame: str) -> None:
+        if self._deliver is not None:
+            self._deliver(channel, frame)
+
+
+class InProcessBackend(BroadcastBackend):
+    """Deliver frames to subscribers of this process only."""
+
+    async def publish(self, channel: str, frame: str) -> None:
+        self._deliver_local(channel, frame)
+
+
+class UnixSocketRelayBackend(BroadcastBackend):
+    """
+    Relay frames between workers over a Unix domain socket.
+
+    The first worker to take the election lock becomes the hub and listens
+    on the socket; the others connect to it. Every frame is delivered
+    locally by its publisher and forwarded by the hub to all other workers.
+    If the hub exits, the remaining workers re-run the election.
+    """
+
+    is_local = False
+
+    def __init__(self, socket_path: str):
+        super().__init__()
+        self.socket_path = socket_path
+        self.lock_path = f"{socket_path}.lock"
+        self.is_hub = False
+        self.published = 0
+        self.relayed = 0
+        self.dropped_peers = 0
+        self._lock_fd: Optional[int] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._peers: Set[asyncio.StreamWriter] = set()
+        self._peer_tasks: Set[asyncio.Task] = set()
+        self._hub_writer: Optional[asyncio.StreamWriter] = None
+        self._task: Optional[asyncio.Task] = None
+        self._connected = asyncio.Event()
+        self._stopping = False
+
+    async def start(self) -> None:
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+        # Wait briefly so early publishes reach the other workers
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            logger.warning(f"Broadcast relay not connected yet: {self.socket_path}")
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self._teardown()
+
+    async def publish(self, channel: str, frame: str) -> None:
+        self.published += 1
+        self._deliver_local(channel, frame)
+
+        packet = self._pack(channel, frame)
+        if self.is_hub:
+            self._forward(packet, origin=None)
+        elif self._hub_writer is not None:
+            self._write(self._hub_writer, packet)
+        else:
+            _relay_unavailable_log.warning("Broadcast relay unavailable, %s delivered locally only", channel)
+
+    @property
+    def is_leader(self) -> bool:
+        return self.is_hub
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "role": "hub" if self.is_hub else "client",
+            "connected": self._connected.is_set(),
+            "peers": len(self._peers),
+            "published": self.published,
+            "relayed": self.relayed,
+            "dropped_peers": self.dropped_peers
+        }
+
+    async def _run(self) -> None:
+        """Elect a hub and keep this worker attached to it."""
+        while not self._stopping:
+            try:
+                if self._try_lock():
+                    await self._serve()
+                else:
+                    await self._attach()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Broadcast relay error: {e}")
+
+            await self._teardown()
+            await asyncio.sleep(_RECONNECT_DELAY)
+
+    def _try_lock(self) -> bool:
+        """Try to take the hub election lock without blocking."""
+        fd = os.open(self.lock_path, os.O_CREAT | os.O_RDWR, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    async def _serve(self) -> None:
+        """Run as the hub until cancelled."""
+        if os.path.exists(self.socket_path):
+            # Left behind by a previous hub; we hold the lock so nobody is listening
+            os.unlink(self.socket_path)
+
+        self._server = await asyncio.start_unix_server(self._handle_peer, path=self.socket_path)
+        self.is_hub = True
+        self._connected.set()
+        logger.info(f"Broadcast relay hub listening on {self.socket_path} (pid {os.getpid()})")
+        await asyncio.Event().wait()
+
+    async def _handle_peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Relay frames from one worker to the hub and all other workers."""
+        task = asyncio.current_task()
+        self._peer_tasks.add(task)
+        self._peers.add(writer)
+        try:
+            while True:
+                packet = await self._read_packet(reader)
+                if packet is None:
+                    break
+                self._forward(packet, origin=writer)
+                self._deliver_packet(packet)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._peers.discard(writer)
+            self._peer_tasks.discard(task)
+            writer.close()
+
+    async def _attach(self) -> None:
+        """Run as a client of the hub until the connection is lost."""
+        try:
+            reader, writer = await asyncio.open_unix_connection(self.socket_path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            # Hub elected but not listening yet
+            return
+
+        self._hub_writer = writer
+        self._connected.set()
+        logger.info(f"Broadcast relay connected to hub at {self.socket_path}")
+        try:
+            while True:
+                packet = await self._read_packet(reader)
+                if packet is None:
+                    break
+                self._deliver_packet(packet)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._hub_writer = None
+            writer.close()
+        logger.warning("Broadcast relay hub connection lost, re-electing")
+
+    async def _teardown(self) -> None:
+        """Close sockets and release the election lock."""
+        for writer in list(self._peers):
+            writer.close()
+        self._peers.clear()
+        # Closing the transports ends the peer handlers with EOF
+        if self._peer_tasks:
+            await asyncio.wait(list(self._peer_tasks), timeout=1)
+
+        if self._hub_writer is not None:
+            self._hub_writer.close()
+            self._hub_writer = None
+
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
+
+        if self._lock_fd is not None:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+        self.is_hub = False
+        self._connected.clear()
+
+    def _forward(self, packet: bytes, origin: Optional[asyncio.StreamWriter]) -> None:
+        """Send a packet from the hub to every peer except its origin."""
+        for writer in list(self._peers):
+            if writer is not origin:
+                self._write(writer, packet)
+        self.relayed += 1
+
+    def _write(self, writer: asyncio.StreamWriter, packet: bytes) -> None:
+        """Write without awaiting, dropping peers that stop reading."""
+        if writer.transport.get_write_buffer_size() > _MAX_PEER_BUFFER:
+            logger.warning("Broadcast relay peer is not keeping up, disconnecting it")
+            self.dropped_peers += 1
+            self._peers.discard(writer)
+            writer.close()
+            return
+        writer.write(packet)
+
+    def _deliver_packet(self, packet: bytes) -> None:
+        channel, _, frame = packet[_HEADER.size:].partition(b"\n")
+        self._deliver_local(channel.decode("utf-8"), frame.decode("utf-8"))
+
+    @staticmethod
+    def _pack(channel: str, frame: str) -> bytes:
+        body = channel.encode("utf-8") + b"\n" + frame.encode("utf-8")
+        return _HEADER.pack(len(body)) + body
+
+    @staticmethod
+    async def _read_packet(reader: asyncio.StreamReader) -> Optional[bytes]:
+        """Read one length-prefixed packet, or None at end of stream."""
+        try:
+            header = await reader.readexactly(_HEADER.size)
+        except asyncio.IncompleteReadError as e:
+            if not e.partial:
+                return None
+            raise
+        (length,) = _HEADER.unpack(header)
+        if length > _MAX_FRAME_SIZE:
+            raise ConnectionError(f"Relay frame too large: {length} bytes")
+        return header + await reader.readexactly(length)
+
+
+def create_backend(name: str, socket_path: str) -> BroadcastBackend:
+    """
+    Create a broadcast backend by name.
+
+    Args:
+        name: "memory" for a single process, "unix" to relay between workers
+        socket_path: Unix socket path used by the relay backend
+
+    Returns:
+        BroadcastBackend: Configured backend
+    """
+    if name == "memory":
+        return InProcessBackend()
+    if name == "unix":
+        return UnixSocketRelayBackend(socket_path)
+    raise ValueError(f"Unknown broadcast backend: {name}")
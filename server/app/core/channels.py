@@ -0,0 +1,156 @@
+"""
+Channel pattern matching for WebSocket subscriptions
+"""
+
+from typing import Dict, List, Optional, Set
+
+# Channel names are dotted, e.g. "security.status.changed"
+SEGMENT_SEPARATOR = "."
+WILDCARD = "*"
+
+
+def is_pattern(channel: str) -> bool:
+    """
+    Check whether a channel name is a wildcard pattern.
+
+    A "*" segment matches exactly one segment, except as the final segment
+    where it matches one or more remaining segments: "security.*" matches
+    "security.alarm.triggered" and "*.status.changed" matches
+    "climate.status.changed".
+
+    Args:
+        channel: Channel name or pattern
+
+    Returns:
+        bool: True if the name contains a wildcard segment
+    """
+    return WILDCARD in channel.split(SEGMENT_SEPARATOR)
+
+
+class _TrieNode:
+    """A single segment in the pattern trie."""
+
+    __slots__ = ("children", "wildcard", "subscribers", "tail_subscribers")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        # Child for a non-final "*" segment
+        self.wildcard: Optional["_TrieNode"] = None
+        # Subscribers whose pattern ends exactly at this node
+        self.subscribers: Set[str] = set()
+        # Subscribers whose pattern ends with a trailing "*" after this node
+        self.tail_subscribers: Set[str] = set()
+
+    def is_empty(self) -> bool:
+        return not (self.children or self.wildcard or self.subscribers or self.tail_subscribers)
+
+
+class ChannelTrie:
+    """
+    Segment trie of wildcard subscriptions.
+
+    Matching walks only the literal and "*" branches that agree with the
+    published channel, so publish cost grows with the number of matching
+    patterns rather than with the total number of patterns.
+    """
+
+    def __init__(self):
+        self._root = _TrieNode()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, pattern: str, subscriber: str) -> None:
+        """Register a subscriber for a pattern."""
+        segments = pattern.split(SEGMENT_SEPARATOR)
+        node = self._root
+        for segment in segments[:-1]:
+            if segment == WILDCARD:
+                if node.wildcard is None:
+                    node.wildcard = _TrieNode()
+                node = node.wildcard
+            else:
+                node = node.children.setdefault(segment, _TrieNode())
+
+        last = segments[-1]
+        if last == WILDCARD:
+            target = node.tail_subscribers
+        else:
+            node = node.children.setdefault(last, _TrieNode())
+            target = node.subscribers
+
+        if subscriber not in target:
+            target.add(subscriber)
+            self._size += 1
+
+    def remove(self, pattern: str, subscriber: str) -> None:
+        """Unregister a subscriber from a pattern, pruning empty branches."""
+        segments = pattern.split(SEGMENT_SEPARATOR)
+        path: List[tuple] = []
+        node = self._root
+        for segment in segments[:-1]:
+            child = node.wildcard if segment == WILDCARD else node.children.get(segment)
+            if child is None:
+                return
+            path.append((node, segment))
+            node = child
+
+        last = segments[-1]
+        if last == WILDCARD:
+            target = node.tail_subscribers
+        else:
+            child = node.children.get(last)
+            if child is None:
+                return
+            path.append((node, last))
+            node = child
+            target = node.subscribers
+
+        if subscriber not in target:
+            return
+        target.discard(subscriber)
+        self._size -= 1
+
+        # Prune nodes left without subscribers or children
+        while path and node.is_empty():
+            parent, segment = path.pop()
+            if segment == WILDCARD and parent.wildcard is node:
+                parent.wildcard = None
+            else:
+                parent.children.pop(segment, None)
+            node = parent
+
+    def match(self, channel: str) -> Set[str]:
+        """
+        Find all subscribers whose pattern matches a concrete channel.
+
+        Args:
+            channel: Published channel name
+
+        Returns:
+            Set[str]: Matching subscribers
+        """
+        matched: Set[str] = set()
+        if not self._size:
+            return matched
+
+        segments = channel.split(SEGMENT_SEPARATOR)
+        count = len(segments)
+        stack = [(self._root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if depth == count:
+                matched.update(node.subscribers)
+                continue
+
+            # A trailing "*" here covers every remaining segment
+            matched.update(node.tail_subscribers)
+
+            child = node.children.get(segments[depth])
+            if child is not None:
+                stack.append((child, depth + 1))
+            if node.wildcard is not None:
+                stack.append((node.wildcard, depth + 1))
+
+        return matched
@@ -0,0 +1,168 @@
+"""
+Per-channel coalescing and rate limiting for high-frequency events
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+import asyncio
+
+# Publishes one message on a channel
+Publisher = Callable[[str, Any], Awaitable[None]]
+
+# Coalescing key: (channel, entity or None for the whole channel)
+Key = Tuple[str, Optional[Hashable]]
+
+
+class _Slot:
+    """Throttle state for one channel/entity key."""
+
+    __slots__ = ("pending", "timer")
+
+    def __init__(self):
+        self.pending: Any = None
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class Coalescer:
+    """
+    Last-value-wins throttle in front of a publisher.
+
+    The first event on a quiet key is published immediately. Events arriving
+    within the key's interval replace each other, and only the latest is
+    published once the interval has elapsed. The interval is the larger of
+    the channel's coalescing window and 1 / max_rate.
+
+    A key's slot lives for one interval after each publish; a timer then
+    publishes the value held meanwhile, or removes the slot if there is none,
+    so only keys active within the last interval are kept.
+    """
+
+    def __init__(
+        self,
+        publish: Publisher,
+        default_window_ms: int = 0,
+        channel_windows_ms: Optional[Dict[str, int]] = None,
+        entity_keys: Optional[Dict[str, str]] = None,
+        max_rate: float = 0,
+        bypass_channels: Iterable[str] = ()
+    ):
+        self._publish = publish
+        self.default_window_ms = default_window_ms
+        self.channel_windows_ms = dict(channel_windows_ms or {})
+        self.entity_keys = dict(entity_keys or {})
+        self.max_rate = max_rate
+        self.bypass_channels = set(bypass_channels)
+        self._slots: Dict[Key, _Slot] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.published = 0
+        self.coalesced = 0
+        self.bypassed = 0
+
+    def interval(self, channel: str) -> float:
+        """Get the minimum seconds between publishes for a channel's keys."""
+        if channel in self.bypass_channels:
+            return 0.0
+        window = self.channel_windows_ms.get(channel, self.default_window_ms) / 1000
+        rate_interval = 1 / self.max_rate if self.max_rate > 0 else 0.0
+        return max(window, rate_interval)
+
+    def entity_of(self, channel: str, data: Any) -> Optional[Hashable]:
+        """Extract the per-entity coalescing key from event data, if configured."""
+        field = self.entity_keys.get(channel)
+        if field and isinstance(data, dict):
+            return data.get(field)
+        return None
+
+    async def submit(self, channel: str, message: Any, entity: Optional[Hashable] = None) -> None:
+        """
+        Publish a message now or hold it as the latest value for its key.
+
+        Args:
+            channel: Channel to publish on
+            message: Message to publish
+            entity: Optional entity within the channel, coalesced separately
+        """
+        interval = self.interval(channel)
+        if interval <= 0:
+            self.bypassed += 1
+            await self._emit(channel, message)
+            return
+
+        key = (channel, entity)
+        slot = self._slots.get(key)
+        if slot is None:
+            # Quiet key: publish now and hold the key for one interval
+            slot = self._slots[key] = _Slot()
+            self._arm(key, slot, interval)
+            await self._emit(channel, message)
+            return
+
+        # Within the interval: keep only the latest value
+        if slot.pending is not None:
+            self.coalesced += 1
+        slot.pending = message
+
+    async def flush(self) -> None:
+        """Publish every pending value immediately."""
+        slots = list(self._slots.items())
+        self._slots.clear()
+        for key, slot in slots:
+            if slot.timer is not None:
+                slot.timer.cancel()
+            if slot.pending is not None:
+                await self._emit(key[0], slot.pending)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def discard(self, channels: Iterable[str]) -> None:
+        """
+        Drop the idle keys of channels, such as those nobody listens to any more.
+
+        Keys holding a value are kept until it is published.
+
+        Args:
+            channels: Channels whose idle keys to drop
+        """
+        channels = set(channels)
+        for key, slot in list(self._slots.items()):
+            if key[0] in channels and slot.pending is None:
+                if slot.timer is not None:
+                    slot.timer.cancel()
+                del self._slots[key]
+
+    def channels(self) -> Set[str]:
+        """Get the channels with a key held."""
+        return {channel for channel, _ in self._slots}
+
+    def stats(self) -> Dict[str, Any]:
+        """Get coalescing counters."""
+        return {
+            "published": self.published,
+            "coalesced": self.coalesced,
+            "bypassed": self.bypassed,
+            "keys": len(self._slots),
+            "pending": sum(1 for slot in self._slots.values() if slot.pending is not None)
+        }
+
+    def _arm(self, key: Key, slot: _Slot, interval: float) -> None:
+        """Schedule the end of a key's interval, counted from a publish now."""
+        slot.timer = asyncio.get_running_loop().call_later(interval, self._flush_key, key)
+
+    def _flush_key(self, key: Key) -> None:
+        """Timer callback: publish the latest value held for a key, or drop the idle key."""
+        slot = self._slots.get(key)
+        if slot is None:
+            return
+        slot.timer = None
+        if slot.pending is None:
+            del self._slots[key]
+            return
+
+        message, slot.pending = slot.pending, None
+        self._arm(key, slot, self.interval(key[0]))
+        task = asyncio.get_running_loop().create_task(self._emit(key[0], message))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _emit(self, channel: str, message: Any) -> None:
+        self.published += 1
+        await self._publish(channel, message)
@@ -3,7 +3,7 @@ Application configuration settings
 """
 
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 import os
 
 
@@ -18,6 +18,13 @@ class Settings(BaseSettings):
     ENVIRONMENT: str = "development"
     DEBUG: bool = True
     
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # json (one object per line) or text
+    LOG_QUEUE_SIZE: int = 10000  # records waiting for the writer thread before new ones are dropped
+    LOG_HOT_PATH_RATE: float = 10  # max records per second from each per-connection log site (0 = unlimited)
+    LOG_SQL: bool = False  # log every SQL statement
+    
     # CORS Settings
     ALLOWED_ORIGINS: List[str] = [
         "http://localhost:5173",
@@ -28,6 +35,48 @@ class Settings(BaseSettings):
     
     # Database Settings
     OMNIHOME_DATABASE_URL: str = "sqlite+aiosqlite:///./omnihome.db"
+    # SQLite storage profile, applied to every connection
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_AUTO_VACUUM: str = "INCREMENTAL"  # takes effect on new databases or after a VACUUM
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_READ_POOL_SIZE: int = 4  # read-only connections for GET routes; 0 shares the writer
+    
+    # Write buffer for activity and history rows
+    WRITE_BUFFER_MODE: str = "buffered"  # buffered (group commit) or transaction (insert with the request)
+    WRITE_BUFFER_MAX_ROWS: int = 500
+    WRITE_BUFFER_FLUSH_INTERVAL_MS: int = 200
+    WRITE_BUFFER_MAX_PENDING: int = 10000
+    
+    # In-memory copies of the single-row state tables (security system, climate, water tank, schedule)
+    STATE_CACHE_POLL_INTERVAL_MS: int = 1000  # how often to check for writes from other processes; 0 never checks
+    
+    # Identical concurrent status GETs share one handler call; results are also reused for this long
+    SINGLE_FLIGHT_TTL_MS: int = 0
+    
+    # History rollups
+    ROLLUP_MAX_POINTS: int = 500  # history queries coarsen their resolution to stay under this
+    # Days to keep rollup rows per granularity (0 keeps forever); queries reaching further use a coarser one
+    ROLLUP_RETENTION_DAYS: Dict[str, int] = {"minute": 7, "hour": 365, "day": 0}
+    
+    # Retention: days to keep per table (0 keeps forever); archived tables move to monthly files
+    RETENTION_DAYS: Dict[str, int] = {
+        "activity_logs": 90,
+        "lighting_history": 90,
+        "climate_history": 90,
+        "watering_history": 365,
+        "camera_snapshots": 30,
+        "sessions": 7,
+    }
+    RETENTION_ARCHIVE_TABLES: List[str] = ["activity_logs", "lighting_history", "climate_history", "watering_history"]
+    RETENTION_ARCHIVE_DIR: str = "./archive"
+    RETENTION_INTERVAL_SECONDS: int = 3600  # 0 disables the scheduler
+    RETENTION_BATCH_SIZE: int = 500
+    RETENTION_BATCH_PAUSE_MS: int = 50
+    RETENTION_VACUUM_PAGES: int = 1000
+    RETENTION_FULL_VACUUM_FREE_RATIO: float = 0.0  # >0 lets the periodic run do a full VACUUM, which blocks writers
     
     # Security Settings
     SECRET_KEY: str = "your-secret-key-change-in-production"
@@ -44,6 +93,32 @@ class Settings(BaseSettings):
     
     # WebSocket Settings
     WS_HEARTBEAT_INTERVAL: int = 30
+    WS_HEARTBEAT_MAX_MISSED: int = 2
+    WS_SEND_QUEUE_SIZE: int = 100
+    WS_SLOW_CONSUMER_POLICY: str = "drop_oldest"  # drop_oldest, drop_connection or coalesce
+    WS_BROADCAST_BACKEND: str = "memory"  # memory (single worker) or unix (relay between workers)
+    WS_BROADCAST_SOCKET: str = "/tmp/omnihome-ws.sock"
+    # Coalescing windows in milliseconds (0 disables); events within a window are last-value-wins
+    WS_COALESCE_WINDOW_MS: int = 0
+    WS_COALESCE_CHANNEL_WINDOWS_MS: Dict[str, int] = {
+        "climate.status.changed": 250,
+        "lighting.status.changed": 250,
+    }
+    # Data field used to coalesce each entity separately instead of the whole channel
+    WS_COALESCE_ENTITY_KEYS: Dict[str, str] = {
+        "lighting.status.changed": "lightId",
+        "garden.zone.changed": "zoneId",
+    }
+    # Max events per second per channel/entity (0 = unlimited); bypass channels are never throttled
+    WS_MAX_EVENTS_PER_SECOND: float = 0
+    WS_COALESCE_BYPASS_CHANNELS: List[str] = ["security.alarm.triggered"]
+    # Recent events kept per channel for replay to reconnecting clients
+    WS_REPLAY_BUFFER_SIZE: int = 256
+    # Largest client message, also after inflating a deflated binary frame; matches uvicorn's --ws-max-size default
+    WS_MAX_MESSAGE_BYTES: int = 16 * 1024 * 1024
+    # Binary (omnihome.msgpack) frames at least this large are deflated (0 disables)
+    WS_COMPRESSION_MIN_BYTES: int = 1024
+    WS_COMPRESSION_LEVEL: int = 6
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,280 @@
+"""
+Incrementally maintained dashboard snapshot
+"""
+
+from typing import Any, Dict, List, NamedTuple, Optional, Type
+from sqlalchemy import event, inspect, literal, null, select, type_coerce, union_all
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.metrics import register_collector
+from app.core.state_cache import state_cache
+from app.core.versions import resource_versions
+from app.core.write_buffer import Row, write_buffer
+from app.models import ActivityLog, ClimateSettings, GardenZone, Light, SecuritySystem
+from app.schemas import DashboardData
+
+# Session.info key holding the light and zone rows written in the current transaction
+_PENDING_KEY = "pending_dashboard_rows"
+
+# Columns each tracked model contributes to the aggregates
+_TRACKED = {
+    Light: ("on", "power_usage"),
+    GardenZone: ("soil_moisture",),
+}
+
+RECENT_ACTIVITY = 5
+
+_recent_logs = (
+    select(ActivityLog.id, ActivityLog.timestamp, ActivityLog.event, ActivityLog.log_type)
+    .order_by(ActivityLog.timestamp.desc(), ActivityLog.id.desc())
+    .limit(RECENT_ACTIVITY)
+    .subquery()
+)
+
+# Every light, every zone and the latest activity as one statement; the
+# light branch comes first and types the shared columns
+_ROWS = union_all(
+    select(
+        literal("light").label("kind"), Light.id, Light.on.label("on"), Light.power_usage.label("amount"),
+        type_coerce(null(), ActivityLog.timestamp.type).label("timestamp"),
+        type_coerce(null(), ActivityLog.event.type).label("event"),
+        type_coerce(null(), ActivityLog.log_type.type).label("log_type")
+    ),
+    select(literal("zone"), GardenZone.id, null(), GardenZone.soil_moisture, null(), null(), null()),
+    select(
+        literal("log"), _recent_logs.c.id, null(), null(),
+        _recent_logs.c.timestamp, _recent_logs.c.event, _recent_logs.c.log_type
+    )
+)
+
+
+class DashboardSnapshot(NamedTuple):
+    """A dashboard body and the version it was built at."""
+    version: int
+    data: DashboardData
+
+
+class Dashboard:
+    """
+    The dashboard aggregates, kept current as the rows behind them change.
+
+    Active light count, power usage and the soil moisture total are
+    adjusted by the difference between a row's old and new values when a
+    transaction that wrote lights or zones commits. The security and
+    climate parts come from the state cache, and recent activity from the
+    write buffer's flushes. Every change bumps the version and drops the
+    built body, which the next get() rebuilds from the aggregates without
+    touching the database.
+
+    Writes from another process are noticed through the state cache's
+    watcher; the aggregates are then reloaded on the next get().
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._loaded = False
+        self._lights: Dict[str, tuple] = {}
+        self._active_lights = 0
+        self._power_usage = 0.0
+        self._zones: Dict[str, Optional[int]] = {}
+        self._moisture_total = 0
+        self._recent: List[Dict[str, Any]] = []
+        self._snapshot: Optional[DashboardSnapshot] = None
+        self.builds = 0
+        self.reloads = 0
+
+    async def get(self, db: AsyncSession) -> DashboardSnapshot:
+        """
+        Get the current dashboard.
+
+        Args:
+            db: Session to load the aggregates with if they are not loaded
+
+        Returns:
+            DashboardSnapshot: Body and version
+        """
+        if not self._loaded:
+            await self.load(await db.connection())
+        if self._snapshot is None:
+            version = self.version
+            data = await self._build(db, version)
+            # Keep the body only if nothing changed while it was built
+            if version == self.version and self._loaded:
+                self._snapshot = DashboardSnapshot(version, data)
+            return DashboardSnapshot(version, data)
+        return self._snapshot
+
+    async def load(self, conn: AsyncConnection) -> None:
+        """
+        Read the rows behind the aggregates.
+
+        If a write commits while the rows are read, the aggregates are still
+        replaced but stay marked unloaded, so the next get() reads again.
+        """
+        version = self.version
+        rows = (await conn.execute(_ROWS)).all()
+        self.reloads += 1
+        loaded = version == self.version
+
+        lights = [row for row in rows if row.kind == "light"]
+        zones = [row for row in rows if row.kind == "zone"]
+        logs = [row for row in rows if row.kind == "log"]
+        self._lights = {row.id: (bool(row.on), float(row.amount or 0)) for row in lights}
+        self._active_lights = sum(1 for on, _ in self._lights.values() if on)
+        self._power_usage = sum(power for on, power in self._lights.values() if on)
+        self._zones = {row.id: int(row.amount) if row.amount is not None else None for row in zones}
+        self._moisture_total = sum(moisture or 0 for moisture in self._zones.values())
+        self._recent = [
+            {"id": row.id, "timestamp": row.timestamp, "event": row.event, "log_type": row.log_type}
+            for row in logs
+        ]
+        self._changed()
+        self._loaded = loaded
+
+    async def start(self, engine: AsyncEngine) -> None:
+        """Load the aggregates, so that the first request's ETag is already current."""
+        async with engine.connect() as conn:
+            await self.load(conn)
+
+    def invalidate(self) -> None:
+        """Reload the aggregates on the next get()."""
+        self._loaded = False
+        self._changed()
+
+    def apply(self, model: Type, key: str, values: Optional[Dict[str, Any]]) -> None:
+        """
+        Fold a committed light or zone row into the aggregates.
+
+        Args:
+            model: Light or GardenZone
+            key: Primary key
+            values: Column values, or None for a deleted row
+        """
+        if not self._loaded:
+            self._changed()
+            return
+        if values is not None and any(column not in values for column in _TRACKED[model]):
+            self.invalidate()
+            return
+
+        if model is Light:
+            on, power = self._lights.pop(key, (False, 0.0))
+            if on:
+                self._active_lights -= 1
+                self._power_usage -= power
+            if values is not None:
+                on, power = bool(values["on"]), float(values["power_usage"] or 0)
+                self._lights[key] = (on, power)
+                if on:
+                    self._active_lights += 1
+                    self._power_usage += power
+        else:
+            self._moisture_total -= self._zones.pop(key, None) or 0
+            if values is not None:
+                self._zones[key] = values["soil_moisture"]
+                self._moisture_total += values["soil_moisture"] or 0
+        self._changed()
+
+    async def apply_activity(self, conn: AsyncConnection, rows: List[Row]) -> None:
+        """Flush listener keeping the most recent activity log rows."""
+        logs = [values for table, values in rows if table.name == ActivityLog.__tablename__]
+        if not logs:
+            return
+        if not self._loaded:
+            self._changed()
+            return
+        # Keyed on id, so that rows seen again after a retry are kept once
+        seen = {log["id"] for log in self._recent}
+        recent = self._recent + [
+            {key: values.get(key) for key in ("id", "timestamp", "event", "log_type")}
+            for values in logs
+            if values.get("id") not in seen
+        ]
+        recent.sort(key=lambda log: (log["timestamp"], log["id"]), reverse=True)
+        self._recent = recent[:RECENT_ACTIVITY]
+        self._changed()
+
+    def on_state_changed(self, model: Optional[Type]) -> None:
+        """State cache listener."""
+        if model is None:
+            self.invalidate()
+        elif model in (SecuritySystem, ClimateSettings):
+            self._changed()
+
+    def _changed(self) -> None:
+        self.version = resource_versions.bump("dashboard")
+        self._snapshot = None
+
+    async def _build(self, db: AsyncSession, version: int) -> DashboardData:
+        self.builds += 1
+        security = await state_cache.get(db, SecuritySystem)
+        climate = await state_cache.get(db, ClimateSettings)
+        zones = len(self._zones)
+        return DashboardData(
+            version=version,
+            security={
+                "armed": security.armed if security else False,
+                "status": "Armed" if security and security.armed else "Disarmed"
+            },
+            climate={
+                "temperature": climate.target_temperature if climate else 22,
+                "mode": climate.mode if climate else "cool"
+            },
+            garden={
+                "nextWatering": "18:00",
+                "soilMoisture": int(self._moisture_total / zones) if zones else 65
+            },
+            lighting={
+                "masterOn": self._active_lights > 0,
+                "activeLights": self._active_lights,
+                "powerUsage": round(self._power_usage, 2)
+            },
+            recent_activity=[
+                {
+                    "time": log["timestamp"].strftime("%I:%M %p"),
+                    "event": log["event"],
+                    "type": log["log_type"]
+                }
+                for log in self._recent
+            ]
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Get version and rebuild counters."""
+        return {
+            "version": self.version,
+            "loaded": self._loaded,
+            "builds": self.builds,
+            "reloads": self.reloads
+        }
+
+
+# Global dashboard instance
+dashboard = Dashboard()
+register_collector("dashboard", dashboard.stats)
+state_cache.add_listener(dashboard.on_state_changed)
+write_buffer.add_listener(dashboard.apply_activity)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_after_flush(session: Session, flush_context: Any) -> None:
+    for instance in list(session.new) + list(session.dirty):
+        if type(instance) in _TRACKED:
+            session.info.setdefault(_PENDING_KEY, {})[(type(instance), instance.id)] = dict(inspect(instance).dict)
+    for instance in session.deleted:
+        if type(instance) in _TRACKED:
+            session.info.setdefault(_PENDING_KEY, {})[(type(instance), instance.id)] = None
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_after_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        for (model, key), values in pending.items():
+            dashboard.apply(model, key, values)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -2,20 +2,98 @@
 Database configuration and session management
 """
 
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from typing import Tuple
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
 
-# Create async engine with explicit SQLite configuration
-engine = create_async_engine(
-    settings.OMNIHOME_DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True,
-    connect_args={"check_same_thread": False},
-    pool_pre_ping=True
-)
+# HTTP methods served from the read-only pool
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def _is_file_sqlite(url: str) -> bool:
+    """Check whether a URL points at an on-disk SQLite database."""
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+def _apply_pragmas(engine: AsyncEngine, read_only: bool) -> None:
+    """Apply the storage profile pragmas to every new connection of an engine."""
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if not read_only:
+            # Persistent in the database file, so the writer sets them for everyone
+            cursor.execute(f"PRAGMA auto_vacuum={settings.SQLITE_AUTO_VACUUM}")
+            cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA cache_size={-int(settings.SQLITE_CACHE_SIZE_KB)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+
+def create_engines(url: str) -> Tuple[AsyncEngine, AsyncEngine]:
+    """
+    Create the writer and reader engines for a database URL.
+
+    For an on-disk SQLite database, writes go through a single dedicated
+    connection and reads through a pool of SQLITE_READ_POOL_SIZE read-only
+    connections, all configured with the storage profile pragmas and kept
+    open between requests. In WAL mode readers then never wait for the
+    writer. Any other database gets a
+    single engine used for both.
+
+    Args:
+        url: Database URL
+
+    Returns:
+        Tuple[AsyncEngine, AsyncEngine]: Writer engine and reader engine
+    """
+    if not _is_file_sqlite(url) or settings.SQLITE_READ_POOL_SIZE <= 0:
+        shared = create_async_engine(
+            url,
+            future=True,
+            connect_args={"check_same_thread": False},
+            pool_pre_ping=True
+        )
+        return shared, shared
 
-# Create async session factory
+    writer = create_async_engine(
+        url,
+        future=True,
+        connect_args={"check_same_thread": False},
+        pool_pre_ping=True,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=1,
+        max_overflow=0
+    )
+    reader = create_async_engine(
+        url,
+        future=True,
+        connect_args={"check_same_thread": False},
+        pool_pre_ping=True,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=settings.SQLITE_READ_POOL_SIZE,
+        max_overflow=0
+    )
+    _apply_pragmas(writer, read_only=False)
+    _apply_pragmas(reader, read_only=True)
+    return writer, reader
+
+
+# Writer engine (also used for schema creation) and read-only reader engine
+engine, read_engine = create_engines(settings.OMNIHOME_DATABASE_URL)
+
+# Create async session factories
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -24,19 +102,38 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False
 )
 
+ReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False
+)
+
 # Create base class for models
 Base = declarative_base()
 
 
-async def get_db() -> AsyncSession:
+async def get_db(request: Request) -> AsyncSession:
     """
     Dependency function to get database session.
-    
+
+    GET requests get a session on the read-only pool; all other methods get
+    a session on the writer connection.
+
     Yields:
         AsyncSession: Database session
     """
-    async with AsyncSessionLocal() as session:
+    factory = ReadSessionLocal if request.method in READ_METHODS else AsyncSessionLocal
+    async with factory() as session:
         try:
             yield session
         finally:
             await session.close()
+
+
+async def dispose_engines() -> None:
+    """Close every pooled connection."""
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
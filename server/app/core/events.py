@@ -0,0 +1,113 @@
+"""
+Commit-driven domain event bus
+"""
+
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Set
+import asyncio
+import logging
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+# Session.info key holding the events recorded in the current transaction
+_PENDING_KEY = "pending_domain_events"
+
+
+class DomainEvent(NamedTuple):
+    """A state change, published on the channel of the same name."""
+    channel: str
+    data: Dict[str, Any]
+
+
+# Receives every event of one committed transaction at once
+EventHandler = Callable[[List[DomainEvent]], Awaitable[None]]
+
+
+class EventBus:
+    """Dispatches the events of each committed transaction to the registered handlers."""
+
+    def __init__(self):
+        self._handlers: List[EventHandler] = []
+        self._tasks: Set[asyncio.Task] = set()
+        self.dispatched_batches = 0
+        self.dispatched_events = 0
+
+    def subscribe(self, handler: EventHandler) -> None:
+        """Register a handler for committed event batches."""
+        self._handlers.append(handler)
+
+    def dispatch(self, events: List[DomainEvent]) -> None:
+        """Schedule one dispatch of a committed batch on the running loop."""
+        task = asyncio.get_running_loop().create_task(self._run(events))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def drain(self) -> None:
+        """Wait for in-flight dispatches to finish."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _run(self, events: List[DomainEvent]) -> None:
+        self.dispatched_batches += 1
+        self.dispatched_events += len(events)
+        for handler in self._handlers:
+            try:
+                await handler(events)
+            except Exception as e:
+                logger.error(f"Domain event handler {handler.__qualname__} failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get dispatch counters."""
+        return {
+            "dispatched_batches": self.dispatched_batches,
+            "dispatched_events": self.dispatched_events,
+            "in_flight": len(self._tasks)
+        }
+
+
+# Global event bus instance
+event_bus = EventBus()
+register_collector("events", event_bus.stats)
+
+
+def record_event(db: AsyncSession, channel: str, data: Dict[str, Any]) -> None:
+    """
+    Record a domain event to publish after the session's transaction commits.
+
+    Events are discarded if the transaction rolls back.
+
+    Args:
+        db: Session whose transaction the event belongs to
+        channel: Event channel, e.g. "lighting.status.changed"
+        data: Event payload
+    """
+    db.info.setdefault(_PENDING_KEY, []).append(DomainEvent(channel, data))
+
+
+def record_activity(db: AsyncSession, log: Any) -> None:
+    """Record an activity.log.new event for a new ActivityLog row."""
+    record_event(db, "activity.log.new", {
+        "id": log.id,
+        "timestamp": log.timestamp,
+        "event": log.event,
+        "type": log.log_type,
+        "category": log.category,
+        "details": log.details
+    })
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_after_commit(session: Session) -> None:
+    events = session.info.pop(_PENDING_KEY, None)
+    if events:
+        event_bus.dispatch(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
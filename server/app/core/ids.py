@@ -0,0 +1,92 @@
+"""
+Time-ordered primary key generation
+"""
+
+from typing import Optional
+from datetime import datetime, timezone
+import os
+import threading
+import time
+import uuid
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+# rand_a is 12 bits; a sub-millisecond counter starts in its lower half so it rarely overflows
+_COUNTER_BITS = 12
+_COUNTER_START_MAX = 1 << (_COUNTER_BITS - 1)
+
+
+def _uuid7(unix_ms: int, counter: int) -> str:
+    value = (unix_ms & ((1 << 48) - 1)) << 80
+    value |= 0x7 << 76
+    value |= counter << 64
+    value |= 0b10 << 62
+    value |= int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    return str(uuid.UUID(int=value))
+
+
+def new_id() -> str:
+    """
+    Generate a primary key.
+
+    Keys are UUIDv7 strings: they sort by creation time, so new rows land at
+    the end of the primary key index instead of at random positions. Keys
+    generated by this process are strictly increasing, even within the same
+    millisecond or if the clock steps back.
+
+    Returns:
+        str: Canonical 36 character UUID
+    """
+    global _last_ms, _counter
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            _counter = int.from_bytes(os.urandom(2), "big") % _COUNTER_START_MAX
+        else:
+            _counter += 1
+            if _counter >= 1 << _COUNTER_BITS:
+                # Borrow the next millisecond
+                _last_ms += 1
+                _counter = 0
+        return _uuid7(_last_ms, _counter)
+
+
+def id_for_time(ts: datetime) -> str:
+    """
+    Generate a primary key for a row created at a given time.
+
+    For backfilling existing rows; keys for the same millisecond are
+    ordered randomly.
+
+    Args:
+        ts: Row creation time; naive times are taken as UTC
+
+    Returns:
+        str: Canonical 36 character UUID
+    """
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    unix_ms = int(ts.timestamp() * 1000)
+    return _uuid7(unix_ms, int.from_bytes(os.urandom(2), "big") >> 4)
+
+
+def id_time(key: str) -> Optional[datetime]:
+    """
+    Get the creation time encoded in a key.
+
+    Args:
+        key: Primary key
+
+    Returns:
+        Optional[datetime]: UTC creation time, or None for keys that are not UUIDv7
+    """
+    try:
+        value = uuid.UUID(key)
+    except ValueError:
+        return None
+    if value.version != 7:
+        return None
+    return datetime.fromtimestamp((value.int >> 80) / 1000, tz=timezone.utc)
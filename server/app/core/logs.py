@@ -0,0 +1,197 @@
+"""
+Queue-based logging pipeline with structured output
+"""
+
+from typing import Any, Dict, Optional, TextIO
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+
+from app.core.metrics import register_collector
+
+# LogRecord attributes that are not caller-supplied extra fields
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+# Loggers uvicorn configures with their own synchronous handlers
+_UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, with extra fields as keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the listener thread without ever blocking the caller.
+
+    Records arriving while the queue is full are counted and dropped.
+    Formatting happens on the listener thread; only the message arguments
+    are resolved here so that later mutations do not change the record.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.enqueued = 0
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+
+
+# Every rate-limited site, for the suppressed-records metric
+_sites = []
+
+
+class RateLimitedLog:
+    """
+    A log site that emits at most rate records per second.
+
+    For messages on hot paths, such as per-connection WebSocket events.
+    Suppressed records cost a counter increment; the next record that gets
+    through carries the number suppressed since the previous one.
+    """
+
+    def __init__(self, logger: logging.Logger, rate: float):
+        self.logger = logger
+        self.rate = rate
+        self._tokens = rate
+        self._updated = time.monotonic()
+        self.suppressed = 0
+        self.suppressed_total = 0
+        _sites.append(self)
+
+    def _allow(self) -> bool:
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def _log(self, level: int, msg: str, args: tuple) -> None:
+        if not self.logger.isEnabledFor(level):
+            return
+        if not self._allow():
+            self.suppressed += 1
+            self.suppressed_total += 1
+            return
+        extra = {"suppressed": self.suppressed} if self.suppressed else None
+        self.suppressed = 0
+        # Attribute the record to the caller of info()/warning()
+        self.logger.log(level, msg, *args, extra=extra, stacklevel=3)
+
+    def info(self, msg: str, *args: Any) -> None:
+        self._log(logging.INFO, msg, args)
+
+    def warning(self, msg: str, *args: Any) -> None:
+        self._log(logging.WARNING, msg, args)
+
+
+class _Listener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # Wait for room rather than fail when stopping with a full queue
+        self.queue.put(self._sentinel)
+
+
+_handler: Optional[DroppingQueueHandler] = None
+_listener: Optional[_Listener] = None
+_lock = threading.Lock()
+
+
+def setup_logging(
+    level: str = "INFO",
+    fmt: str = "json",
+    queue_size: int = 10000,
+    sql: bool = False,
+    stream: Optional[TextIO] = None
+) -> None:
+    """
+    Route all logging through a bounded queue to a background writer thread.
+
+    Replaces the handlers of the root logger and of uvicorn's loggers, so
+    that no log call on the event loop does I/O. Safe to call again; the
+    previous pipeline is stopped first. Queued records are written out at
+    interpreter exit, after uvicorn's own shutdown messages.
+
+    Args:
+        level: Root log level
+        fmt: "json" for one JSON object per line, "text" for plain lines
+        queue_size: Records held before new ones are dropped
+        sql: Log every SQL statement (sqlalchemy.engine at INFO)
+        stream: Output stream (default: stdout)
+    """
+    global _handler, _listener
+    with _lock:
+        stop_logging()
+
+        output = logging.StreamHandler(stream or sys.stdout)
+        if fmt == "json":
+            output.setFormatter(JsonFormatter())
+        else:
+            output.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+
+        _handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+        _listener = _Listener(_handler.queue, output)
+        _listener.start()
+
+        root = logging.getLogger()
+        root.handlers[:] = [_handler]
+        root.setLevel(level)
+        for name in _UVICORN_LOGGERS:
+            uvicorn_logger = logging.getLogger(name)
+            uvicorn_logger.handlers[:] = []
+            uvicorn_logger.propagate = True
+        logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO if sql else logging.WARNING)
+
+
+def stop_logging() -> None:
+    """Write out every queued record and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def stats() -> Dict[str, Any]:
+    """Get queue depth and drop counters."""
+    return {
+        "queued": _handler.queue.qsize() if _handler else 0,
+        "enqueued": _handler.enqueued if _handler else 0,
+        "dropped": _handler.dropped if _handler else 0,
+        "suppressed": sum(site.suppressed_total for site in _sites)
+    }
+
+
+register_collector("logging", stats)
+atexit.register(stop_logging)
@@ -0,0 +1,29 @@
+"""
+Lightweight in-process metrics registry
+"""
+
+from typing import Any, Callable, Dict
+
+# Registered collectors: {name: callable returning a dict of values}
+_collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+
+def register_collector(name: str, collector: Callable[[], Dict[str, Any]]) -> None:
+    """
+    Register a metrics collector.
+
+    Args:
+        name: Section name the collector's values are reported under
+        collector: Callable returning the current values
+    """
+    _collectors[name] = collector
+
+
+def collect() -> Dict[str, Dict[str, Any]]:
+    """
+    Collect the current values from all registered collectors.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Metrics grouped by collector name
+    """
+    return {name: collector() for name, collector in _collectors.items()}
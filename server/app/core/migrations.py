@@ -0,0 +1,313 @@
+"""
+Versioned schema migrations
+"""
+
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+from datetime import datetime
+import json
+import logging
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, Text, bindparam, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.core.activity_counts import seed_activity_counts
+from app.core.database import Base
+from app.core.ids import id_for_time, id_time
+from app.models import (
+    ActivityLog, CameraRecording, CameraSnapshot, ClimateHistory, Light, LightingHistory,
+    WateringHistory
+)
+
+logger = logging.getLogger(__name__)
+
+# Migration bookkeeping, kept out of Base so create_all never touches it
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("checkpoint", Text),
+    Column("started_at", DateTime),
+    Column("completed_at", DateTime),
+)
+
+
+class MigrationContext:
+    """
+    What a migration step gets: the engine and its resumable checkpoint.
+
+    A step that works in batches saves its progress with save() inside each
+    batch's transaction, and reads it back from state when it is resumed.
+    """
+
+    def __init__(self, engine: AsyncEngine, version: int, state: Dict[str, Any], batch_size: int):
+        self.engine = engine
+        self.version = version
+        self.state = state
+        self.batch_size = batch_size
+
+    async def save(self, conn: AsyncConnection, **values: Any) -> None:
+        """Update the checkpoint within a step's transaction."""
+        self.state.update(values)
+        await conn.execute(
+            schema_migrations.update()
+            .where(schema_migrations.c.version == self.version)
+            .values(checkpoint=json.dumps(self.state))
+        )
+
+
+# One resumable unit of a migration
+Step = Callable[[MigrationContext], Awaitable[None]]
+
+
+class Migration(NamedTuple):
+    """A schema version and the steps that bring the previous version to it."""
+    version: int
+    name: str
+    steps: List[Step]
+
+
+def create_tables(*tables: Table) -> Step:
+    """Step creating tables that do not exist yet, with their indexes."""
+    async def step(ctx: MigrationContext) -> None:
+        async with ctx.engine.begin() as conn:
+            await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=list(tables)))
+    return step
+
+
+def create_index(table: Table, name: str) -> Step:
+    """
+    Step building a model index.
+
+    In WAL mode readers carry on while the index is built; writers wait
+    for it, so build large ones at a quiet time.
+    """
+    index = next(index for index in table.indexes if index.name == name)
+
+    async def step(ctx: MigrationContext) -> None:
+        async with ctx.engine.begin() as conn:
+            await conn.run_sync(lambda sync_conn: index.create(sync_conn, checkfirst=True))
+    return step
+
+
+def drop_index(name: str) -> Step:
+    """Step dropping an index the models no longer declare."""
+    async def step(ctx: MigrationContext) -> None:
+        async with ctx.engine.begin() as conn:
+            await conn.exec_driver_sql(f'DROP INDEX IF EXISTS "{name}"')
+    return step
+
+
+async def _seed_activity_counts(ctx: MigrationContext) -> None:
+    async with ctx.engine.begin() as conn:
+        await seed_activity_counts(conn)
+
+
+def rewrite_ids(table: Table, created: Column) -> Step:
+    """
+    Step replacing a table's random keys with UUIDv7 keys for each row's creation time.
+
+    Only for tables whose keys the API never exposes; clients would be
+    left holding ids that no longer exist.
+
+    Rows are rewritten batch_size at a time in rowid order; rows that
+    already have a UUIDv7 key are left alone. The table's indexes are
+    rebuilt at the end to compact them.
+    """
+    update = table.update().where(table.c.id == bindparam("old_id")).values(id=bindparam("new_id"))
+
+    async def step(ctx: MigrationContext) -> None:
+        key = f"{table.name}_rowid"
+        fallback = datetime.utcnow()
+        while True:
+            async with ctx.engine.begin() as conn:
+                rows = (await conn.exec_driver_sql(
+                    f'SELECT rowid, id, "{created.name}" FROM "{table.name}" WHERE rowid > ? ORDER BY rowid LIMIT ?',
+                    (ctx.state.get(key, 0), ctx.batch_size)
+                )).all()
+                if not rows:
+                    break
+                values = []
+                for _, old_id, created_at in rows:
+                    if id_time(old_id) is not None:
+                        continue
+                    if isinstance(created_at, str):
+                        created_at = datetime.fromisoformat(created_at)
+                    values.append({"old_id": old_id, "new_id": id_for_time(created_at or fallback)})
+                if values:
+                    await conn.execute(update, values)
+                await ctx.save(conn, **{key: rows[-1][0]})
+
+        async with ctx.engine.begin() as conn:
+            await conn.exec_driver_sql(f'REINDEX "{table.name}"')
+    return step
+
+
+# Every schema version after the create_all era, oldest first
+MIGRATIONS: List[Migration] = [
+    Migration(1, "rollup and counter tables", [
+        create_tables(*(table for table in Base.metadata.sorted_tables)),
+    ]),
+    Migration(2, "activity log counters", [
+        _seed_activity_counts,
+    ]),
+    Migration(3, "query-path composite indexes", [
+        create_index(ActivityLog.__table__, "ix_activity_logs_timestamp_id"),
+        create_index(ActivityLog.__table__, "ix_activity_logs_log_type_timestamp"),
+        create_index(ActivityLog.__table__, "ix_activity_logs_category_timestamp"),
+        create_index(CameraRecording.__table__, "ix_camera_recordings_camera_id_started_at"),
+        create_index(LightingHistory.__table__, "ix_lighting_history_light_id_recorded_at"),
+        drop_index("ix_activity_logs_timestamp"),
+        drop_index("ix_activity_logs_log_type"),
+        drop_index("ix_activity_logs_category"),
+        drop_index("ix_camera_recordings_camera_id"),
+        drop_index("ix_lighting_history_light_id"),
+    ]),
+    Migration(4, "time-ordered keys", [
+        # Only tables whose keys never leave the server: activity log, alert and
+        # session ids are held by clients and tokens, so they keep their old keys
+        rewrite_ids(LightingHistory.__table__, LightingHistory.__table__.c.recorded_at),
+        rewrite_ids(ClimateHistory.__table__, ClimateHistory.__table__.c.recorded_at),
+        rewrite_ids(WateringHistory.__table__, WateringHistory.__table__.c.started_at),
+        rewrite_ids(CameraSnapshot.__table__, CameraSnapshot.__table__.c.captured_at),
+        rewrite_ids(CameraRecording.__table__, CameraRecording.__table__.c.started_at),
+    ]),
+    Migration(5, "room light index", [
+        create_index(Light.__table__, "ix_lights_room_id_id"),
+        drop_index("ix_lights_room_id"),
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+# Oldest schema the code runs against; later migrations only speed it up and may run while it serves
+REQUIRED_VERSION = 2
+
+
+async def get_schema_version(conn: AsyncConnection) -> int:
+    """Get the schema version stored in the database file."""
+    return (await conn.exec_driver_sql("PRAGMA user_version")).scalar()
+
+
+async def _set_schema_version(conn: AsyncConnection, version: int) -> None:
+    await conn.exec_driver_sql(f"PRAGMA user_version = {int(version)}")
+
+
+async def _is_empty(conn: AsyncConnection) -> bool:
+    return (await conn.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE type = 'table' LIMIT 1")).first() is None
+
+
+async def _create_schema(conn: AsyncConnection) -> None:
+    """Create the latest schema in an empty database."""
+    await conn.run_sync(Base.metadata.create_all)
+    await conn.run_sync(_metadata.create_all)
+    await _set_schema_version(conn, LATEST_VERSION)
+
+
+async def check_schema(engine: AsyncEngine) -> int:
+    """
+    Check the schema version at startup.
+
+    An empty database gets the latest schema. Otherwise this is a single
+    version read: a database older than REQUIRED_VERSION must be migrated
+    with scripts/migrate.py first, and one older than LATEST_VERSION only
+    logs a reminder, since the remaining migrations can run while the
+    server is up.
+
+    Args:
+        engine: Writer engine
+
+    Returns:
+        int: Schema version
+
+    Raises:
+        RuntimeError: If the database needs migrating before the server can use it
+    """
+    async with engine.begin() as conn:
+        version = await get_schema_version(conn)
+        if version == 0 and await _is_empty(conn):
+            await _create_schema(conn)
+            logger.info(f"Created database schema version {LATEST_VERSION}")
+            return LATEST_VERSION
+
+    if version > LATEST_VERSION:
+        raise RuntimeError(f"Database schema version {version} is newer than this server ({LATEST_VERSION})")
+    if version < REQUIRED_VERSION:
+        raise RuntimeError(
+            f"Database schema version {version} is older than required ({REQUIRED_VERSION}); "
+            f"run python scripts/migrate.py"
+        )
+    if version < LATEST_VERSION:
+        logger.warning(
+            f"Database schema version {version} is behind {LATEST_VERSION}; "
+            f"run python scripts/migrate.py, which is safe while the server is running"
+        )
+    return version
+
+
+async def migrate(
+    engine: AsyncEngine,
+    target: Optional[int] = None,
+    batch_size: int = 2000,
+    on_step: Optional[Callable[[Migration, int], None]] = None
+) -> int:
+    """
+    Bring the schema up to a version.
+
+    Each migration records its progress in schema_migrations after every
+    step, and batched steps after every batch, so an interrupted run picks
+    up where it stopped. The schema version is bumped in the transaction
+    that marks a migration complete.
+
+    Args:
+        engine: Writer engine
+        target: Version to migrate to (default: latest)
+        batch_size: Rows per transaction for batched steps
+        on_step: Called before each step with the migration and step number
+
+    Returns:
+        int: Schema version reached
+    """
+    target = LATEST_VERSION if target is None else target
+    async with engine.begin() as conn:
+        version = await get_schema_version(conn)
+        if version == 0 and await _is_empty(conn):
+            await _create_schema(conn)
+            return LATEST_VERSION
+        await conn.run_sync(_metadata.create_all)
+
+    for migration in MIGRATIONS:
+        if migration.version <= version or migration.version > target:
+            continue
+
+        async with engine.begin() as conn:
+            row = (await conn.execute(
+                select(schema_migrations.c.checkpoint)
+                .where(schema_migrations.c.version == migration.version)
+            )).first()
+            if row is None:
+                await conn.execute(schema_migrations.insert().values(
+                    version=migration.version, name=migration.name, started_at=datetime.utcnow()
+                ))
+        state = json.loads(row.checkpoint) if row is not None and row.checkpoint else {}
+        ctx = MigrationContext(engine, migration.version, state, batch_size)
+
+        for number in range(state.get("step", 0), len(migration.steps)):
+            if on_step is not None:
+                on_step(migration, number)
+            await migration.steps[number](ctx)
+            async with engine.begin() as conn:
+                await ctx.save(conn, step=number + 1)
+
+        async with engine.begin() as conn:
+            await conn.execute(
+                schema_migrations.update()
+                .where(schema_migrations.c.version == migration.version)
+                .values(completed_at=datetime.utcnow())
+            )
+            await _set_schema_version(conn, migration.version)
+        version = migration.version
+        logger.info(f"Migrated database schema to version {version} ({migration.name})")
+
+    return version
@@ -0,0 +1,46 @@
+"""
+Opaque cursors for keyset pagination
+"""
+
+from typing import Any, List
+import base64
+import json
+
+
+def encode_cursor(*key: Any) -> str:
+    """
+    Encode the sort key of the last row on a page as an opaque cursor.
+
+    Args:
+        key: Sort key values; datetimes are stored as ISO 8601 text
+
+    Returns:
+        str: URL-safe cursor
+    """
+    values = [value.isoformat() if hasattr(value, "isoformat") else value for value in key]
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Decode a cursor back into its sort key values.
+
+    Args:
+        cursor: Cursor from encode_cursor
+        size: Expected number of key values
+
+    Returns:
+        List[Any]: Sort key values, datetimes still as text
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Malformed cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Malformed cursor")
+    return values
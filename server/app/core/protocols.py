@@ -0,0 +1,190 @@
+"""
+WebSocket wire protocols negotiated through Sec-WebSocket-Protocol
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import json
+import zlib
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+from app.core.config import settings
+
+JSON_SUBPROTOCOL = "omnihome.json"
+MSGPACK_SUBPROTOCOL = "omnihome.msgpack"
+
+# Event names sent as small integers in binary frames; ids are stable, append only
+INTERNED_EVENTS = [
+    "security.status.changed",
+    "security.alarm.triggered",
+    "climate.status.changed",
+    "garden.zone.changed",
+    "garden.status.changed",
+    "lighting.status.changed",
+    "activity.log.new",
+    "camera.motion.detected",
+    "camera.status.changed",
+    "subscribed",
+    "unsubscribed",
+    "resync",
+    "ping",
+    "pong",
+    "error",
+]
+EVENT_IDS: Dict[str, int] = {name: index + 1 for index, name in enumerate(INTERNED_EVENTS)}
+EVENT_NAMES: Dict[int, str] = {index: name for name, index in EVENT_IDS.items()}
+
+# First byte of every binary frame
+FLAG_PLAIN = 0x00
+FLAG_DEFLATE = 0x01
+
+
+def available_subprotocols() -> List[str]:
+    """Get the subprotocols this server can speak, in order of preference."""
+    if msgpack is None:
+        return [JSON_SUBPROTOCOL]
+    return [MSGPACK_SUBPROTOCOL, JSON_SUBPROTOCOL]
+
+
+def negotiate(requested: List[str]) -> Optional[str]:
+    """
+    Pick the subprotocol to accept from those offered by the client.
+
+    Args:
+        requested: Subprotocols from the Sec-WebSocket-Protocol header
+
+    Returns:
+        Optional[str]: Subprotocol to accept, or None for plain JSON
+        without a subprotocol header
+    """
+    for subprotocol in requested:
+        if subprotocol in available_subprotocols():
+            return subprotocol
+    return None
+
+
+def is_binary(subprotocol: Optional[str]) -> bool:
+    """Check whether a negotiated subprotocol uses binary frames."""
+    return subprotocol == MSGPACK_SUBPROTOCOL
+
+
+def transport_deflate(headers: Iterable[Tuple[bytes, bytes]]) -> bool:
+    """
+    Check whether a handshake offered the permessage-deflate extension.
+
+    Uvicorn accepts the offer unless it runs with --ws-per-message-deflate
+    false, and browsers always make it, so frames on such a connection are
+    already compressed by the transport.
+
+    Args:
+        headers: Raw handshake headers from the ASGI scope
+    """
+    return any(
+        name.lower() == b"sec-websocket-extensions" and b"permessage-deflate" in value.lower()
+        for name, value in headers
+    )
+
+
+def encode_binary(message: Dict[str, Any], deflate: bool = True) -> bytes:
+    """
+    Encode a message as a binary frame.
+
+    The frame is a flag byte followed by a MessagePack array of
+    [event, body], where event is the interned id when one exists and body
+    is the rest of the message. Frames of at least WS_COMPRESSION_MIN_BYTES
+    are deflated; smaller frames are not worth the CPU.
+
+    Args:
+        message: Message with an "event" key
+        deflate: Deflate large frames; off when the transport compresses them
+
+    Returns:
+        bytes: Binary frame
+    """
+    body = dict(message)
+    event = body.pop("event", None)
+    packed = msgpack.packb([EVENT_IDS.get(event, event), body], use_bin_type=True)
+
+    threshold = settings.WS_COMPRESSION_MIN_BYTES
+    if deflate and threshold > 0 and len(packed) >= threshold:
+        compressed = zlib.compress(packed, settings.WS_COMPRESSION_LEVEL)
+        if len(compressed) < len(packed):
+            return bytes([FLAG_DEFLATE]) + compressed
+    return bytes([FLAG_PLAIN]) + packed
+
+
+def decode_binary(frame: bytes) -> Dict[str, Any]:
+    """
+    Decode a binary frame sent by a client.
+
+    A deflated frame may inflate to no more than WS_MAX_MESSAGE_BYTES, the
+    size a plain frame is already limited to by the transport.
+
+    Args:
+        frame: Binary frame
+
+    Returns:
+        Dict[str, Any]: Message with its event name restored
+
+    Raises:
+        ValueError: If the frame is malformed or inflates past the limit
+    """
+    flag, payload = frame[0], frame[1:]
+    if flag == FLAG_DEFLATE:
+        limit = settings.WS_MAX_MESSAGE_BYTES
+        decompressor = zlib.decompressobj()
+        try:
+            payload = decompressor.decompress(payload, limit)
+        except zlib.error as e:
+            raise ValueError(f"Malformed deflated frame: {e}")
+        if decompressor.unconsumed_tail:
+            raise ValueError(f"Deflated frame inflates past {limit} bytes")
+        if not decompressor.eof:
+            raise ValueError("Truncated deflated frame")
+    elif flag != FLAG_PLAIN:
+        raise ValueError(f"Unknown frame flag: {flag}")
+
+    event, body = msgpack.unpackb(payload, raw=False)
+    message = dict(body or {})
+    message["event"] = EVENT_NAMES.get(event, event)
+    return message
+
+
+def hello_message(deflate: bool = True) -> Dict[str, Any]:
+    """Describe the binary protocol to a newly connected client."""
+    return {
+        "event": "hello",
+        "protocol": MSGPACK_SUBPROTOCOL,
+        "events": EVENT_IDS,
+        "compressionMinBytes": settings.WS_COMPRESSION_MIN_BYTES if deflate else 0
+    }
+
+
+class OutgoingFrame:
+    """
+    An encoded outbound message shared by every connection it is queued for.
+
+    The JSON text is produced once by the publisher; each binary form
+    (deflated or not) is built from it the first time a binary connection
+    sends the frame and then reused for all other binary connections.
+    """
+
+    __slots__ = ("text", "_binary", "_plain")
+
+    def __init__(self, text: str):
+        self.text = text
+        self._binary: Optional[bytes] = None
+        self._plain: Optional[bytes] = None
+
+    def binary(self, deflate: bool = True) -> bytes:
+        """Get the binary encoding of this frame."""
+        if deflate:
+            if self._binary is None:
+                self._binary = encode_binary(json.loads(self.text))
+            return self._binary
+        if self._plain is None:
+            self._plain = encode_binary(json.loads(self.text), deflate=False)
+        return self._plain
@@ -0,0 +1,81 @@
+"""
+Sequenced, replayable event log for reconnecting WebSocket clients
+"""
+
+from typing import Deque, Dict, List, Optional, Tuple
+from collections import deque
+import uuid
+
+
+class EventLog:
+    """
+    Per-channel sequence numbers plus a bounded ring buffer of recent frames.
+
+    Every frame delivered on a channel is stamped with the next sequence
+    number for that channel and the log's epoch. Sequence numbers restart
+    whenever the process restarts, so the epoch tells a reconnecting client
+    whether its last_seq values can be trusted.
+    """
+
+    def __init__(self, buffer_size: int):
+        self.buffer_size = buffer_size
+        self.epoch = uuid.uuid4().hex[:12]
+        self._seqs: Dict[str, int] = {}
+        self._buffers: Dict[str, Deque[Tuple[int, str]]] = {}
+
+    def append(self, channel: str, frame: str) -> Tuple[int, str]:
+        """
+        Stamp a frame with its sequence number and remember it.
+
+        Args:
+            channel: Channel the frame was published on
+            frame: Encoded JSON object frame
+
+        Returns:
+            Tuple[int, str]: Sequence number and the stamped frame
+        """
+        seq = self._seqs.get(channel, 0) + 1
+        self._seqs[channel] = seq
+        stamped = self._stamp(frame, seq)
+
+        buffer = self._buffers.get(channel)
+        if buffer is None:
+            buffer = self._buffers[channel] = deque(maxlen=self.buffer_size)
+        buffer.append((seq, stamped))
+        return seq, stamped
+
+    def current(self, channel: str) -> int:
+        """Get the last sequence number issued on a channel (0 if none)."""
+        return self._seqs.get(channel, 0)
+
+    def since(self, channel: str, last_seq: int) -> Optional[List[str]]:
+        """
+        Get the frames published on a channel after last_seq.
+
+        Args:
+            channel: Channel to replay
+            last_seq: Last sequence number the client received
+
+        Returns:
+            Optional[List[str]]: Missed frames in order, or None if some of
+            them have already fallen out of the buffer
+        """
+        current = self._seqs.get(channel, 0)
+        if last_seq > current:
+            # Client is ahead of us: it saw a different sequence
+            return None
+        if last_seq == current:
+            return []
+
+        buffer = self._buffers.get(channel)
+        if not buffer or buffer[0][0] > last_seq + 1:
+            return None
+        return [frame for seq, frame in buffer if seq > last_seq]
+
+    def _stamp(self, frame: str, seq: int) -> str:
+        """Add seq and epoch fields to an encoded JSON object without re-encoding it."""
+        body = frame.rstrip()
+        if not body.endswith("}"):
+            return frame
+        separator = "," if body[:-1].rstrip() != "{" else ""
+        return f'{body[:-1]}{separator}"seq":{seq},"epoch":"{self.epoch}"}}'
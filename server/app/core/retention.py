@@ -0,0 +1,402 @@
+"""
+Retention, archiving and space reclamation for append-only tables
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from datetime import datetime, timedelta
+import asyncio
+import logging
+import os
+import re
+import time
+
+from sqlalchemy import Column
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.metrics import register_collector
+from app.models import (
+    ActivityLog, CameraSnapshot, ClimateHistory, ClimateRollup, LightingHistory, LightingRollup,
+    Session, WateringHistory, WateringRollup
+)
+
+logger = logging.getLogger(__name__)
+
+# Tables retention can apply to, and the column their age is measured by
+AGE_COLUMNS: Dict[str, Column] = {
+    ActivityLog.__tablename__: ActivityLog.__table__.c.timestamp,
+    LightingHistory.__tablename__: LightingHistory.__table__.c.recorded_at,
+    ClimateHistory.__tablename__: ClimateHistory.__table__.c.recorded_at,
+    WateringHistory.__tablename__: WateringHistory.__table__.c.started_at,
+    CameraSnapshot.__tablename__: CameraSnapshot.__table__.c.captured_at,
+    Session.__tablename__: Session.__table__.c.expires_at,
+}
+
+# Rollup tables; their rows are pruned per granularity and never archived
+ROLLUP_TABLES = [ClimateRollup.__tablename__, LightingRollup.__tablename__, WateringRollup.__tablename__]
+
+# Runs in each batch's transaction before the rows with the given rowids are removed from a table
+PruneListener = Callable[[AsyncConnection, str, List[int]], Awaitable[None]]
+
+# Stored DateTime format; cutoffs compare as text against it
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# SQLite auto_vacuum mode value for INCREMENTAL
+_AUTO_VACUUM_INCREMENTAL = 2
+
+
+def _next_month(month: str) -> str:
+    """Get the first instant of the month after a YYYY-MM month, as stored text."""
+    year, number = int(month[:4]), int(month[5:7])
+    year, number = (year + 1, 1) if number == 12 else (year, number + 1)
+    return f"{year:04d}-{number:02d}-01 00:00:00"
+
+
+class RetentionEngine:
+    """
+    Prunes rows older than each table's retention period, then reclaims space.
+
+    Tables in archive_tables are moved, month by month, into one SQLite file
+    per month under archive_dir (archive/2026-01.db holds every table's rows
+    from January 2026), attached for the copy. Other tables are deleted
+    outright. Rows move in batches of batch_size, one short transaction each,
+    with a pause in between so request writers are never held up for long.
+    Rollup rows are deleted by granularity according to rollup_policies,
+    so that fine buckets can go long before coarse ones.
+
+    Freed pages are returned to the filesystem with incremental_vacuum when
+    the database uses auto_vacuum=INCREMENTAL. Other databases need one full
+    VACUUM, which blocks writers while it runs: vacuum() does it on demand,
+    and the periodic run only does it once the free pages reach
+    full_vacuum_free_ratio of the file, if that is set.
+
+    With several workers on one database only one of them should prune:
+    the periodic run is skipped while the leader check given to start()
+    returns False.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        policies: Dict[str, int],
+        archive_tables: Iterable[str] = (),
+        archive_dir: str = "./archive",
+        batch_size: int = 500,
+        batch_pause_ms: int = 50,
+        interval_seconds: int = 3600,
+        vacuum_pages: int = 1000,
+        full_vacuum_free_ratio: float = 0.0,
+        rollup_policies: Optional[Dict[str, int]] = None
+    ):
+        unknown = set(policies) - set(AGE_COLUMNS)
+        if unknown:
+            raise ValueError(f"No retention support for tables: {', '.join(sorted(unknown))}")
+        self._engine = engine
+        self.policies = dict(policies)
+        self.rollup_policies = dict(rollup_policies or {})
+        self.archive_tables = set(archive_tables)
+        self.archive_dir = archive_dir
+        self.batch_size = batch_size
+        self.batch_pause_ms = batch_pause_ms
+        self.interval_seconds = interval_seconds
+        self.vacuum_pages = vacuum_pages
+        self.full_vacuum_free_ratio = full_vacuum_free_ratio
+        self._listeners: List[PruneListener] = []
+        self._task: Optional[asyncio.Task] = None
+        self._leader: Callable[[], bool] = lambda: True
+        self.runs = 0
+        self.skipped_runs = 0
+        self.archived_rows: Dict[str, int] = {}
+        self.deleted_rows: Dict[str, int] = {}
+        self.reclaimed_bytes = 0
+        self.last_run_at: Optional[datetime] = None
+        self.last_run_ms = 0.0
+        self.database_bytes = 0
+        self.free_bytes = 0
+
+    def add_listener(self, listener: PruneListener) -> None:
+        """Register a listener for rows about to be removed."""
+        self._listeners.append(listener)
+
+    async def _notify(self, conn: AsyncConnection, table: str, rowids: List[int]) -> None:
+        for listener in self._listeners:
+            await listener(conn, table, rowids)
+
+    async def start(self, leader: Optional[Callable[[], bool]] = None) -> None:
+        """
+        Start the periodic retention run.
+
+        Args:
+            leader: Checked before each run; False skips it, for a worker that is
+                not the one pruning (default: always run)
+        """
+        if leader is not None:
+            self._leader = leader
+        if self._task is None and self.interval_seconds > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the periodic retention run."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        # Let startup settle before the first run
+        await asyncio.sleep(min(60, self.interval_seconds))
+        while True:
+            if not self._leader():
+                self.skipped_runs += 1
+            else:
+                try:
+                    await self.run_once()
+                except Exception as e:
+                    logger.error(f"Retention run failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def run_once(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Apply every retention policy, then reclaim the freed space.
+
+        Args:
+            now: Reference time (default: now)
+
+        Returns:
+            Dict[str, int]: Rows removed per table
+        """
+        start = time.perf_counter()
+        now = now or datetime.utcnow()
+        removed = {}
+        for table, days in self.policies.items():
+            if days > 0:
+                # Whole days, so a day is never split between the archive and the live table
+                cutoff = (now - timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
+                removed[table] = await self.prune_table(table, cutoff)
+        for granularity, days in self.rollup_policies.items():
+            if days > 0:
+                cutoff = (now - timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
+                for table in ROLLUP_TABLES:
+                    removed[f"{table}.{granularity}"] = await self.prune_table(table, cutoff, granularity)
+        await self.reclaim()
+
+        self.runs += 1
+        self.last_run_at = now
+        self.last_run_ms = (time.perf_counter() - start) * 1000
+        if any(removed.values()):
+            logger.info(f"Retention removed {removed}")
+        return removed
+
+    async def prune_table(self, table: str, cutoff: datetime, granularity: Optional[str] = None) -> int:
+        """
+        Archive or delete a table's rows older than cutoff, in batches.
+
+        Args:
+            table: Table name
+            cutoff: Rows older than this are removed
+            granularity: For a rollup table, the granularity whose buckets are removed
+
+        Returns:
+            int: Rows removed
+        """
+        cutoff_text = cutoff.strftime(_TIME_FORMAT)
+        if granularity is not None:
+            column = "bucket_start"
+            archive = False
+        else:
+            column = AGE_COLUMNS[table].name
+            archive = table in self.archive_tables
+        if archive:
+            os.makedirs(self.archive_dir, exist_ok=True)
+
+        total = 0
+        while True:
+            if archive:
+                count = await self._archive_batch(table, column, cutoff_text)
+            else:
+                count = await self._delete_batch(table, column, cutoff_text, granularity)
+            total += count
+            if count == 0:
+                break
+            await asyncio.sleep(self.batch_pause_ms / 1000)
+
+        counters = self.archived_rows if archive else self.deleted_rows
+        key = table if granularity is None else f"{table}.{granularity}"
+        counters[key] = counters.get(key, 0) + total
+        return total
+
+    async def _delete_batch(self, table: str, column: str, cutoff: str, granularity: Optional[str] = None) -> int:
+        async with self._engine.connect() as conn:
+            if granularity is not None:
+                rowids = [row[0] for row in (await conn.exec_driver_sql(
+                    f'SELECT rowid FROM "{table}" WHERE granularity = ? AND "{column}" < ? LIMIT ?',
+                    (granularity, cutoff, self.batch_size)
+                )).all()]
+            else:
+                rowids = [row[0] for row in (await conn.exec_driver_sql(
+                    f'SELECT rowid FROM "{table}" WHERE "{column}" < ? LIMIT ?', (cutoff, self.batch_size)
+                )).all()]
+            if rowids:
+                await self._notify(conn, table, rowids)
+                await conn.exec_driver_sql(
+                    f'DELETE FROM "{table}" WHERE rowid IN ({",".join("?" * len(rowids))})', tuple(rowids)
+                )
+            await conn.commit()
+            return len(rowids)
+
+    async def _archive_batch(self, table: str, column: str, cutoff: str) -> int:
+        async with self._engine.connect() as conn:
+            oldest = (await conn.exec_driver_sql(
+                f'SELECT min("{column}") FROM "{table}" WHERE "{column}" < ?', (cutoff,)
+            )).scalar()
+            if oldest is None:
+                return 0
+
+            # Only rows from the oldest row's month go into this batch
+            month = str(oldest)[:7]
+            upper = min(cutoff, _next_month(month))
+            path = os.path.join(self.archive_dir, f"{month}.db")
+
+            await conn.exec_driver_sql("ATTACH DATABASE ? AS archive", (path,))
+            try:
+                columns = await self._ensure_archive_table(conn, table)
+                rowids = [row[0] for row in (await conn.exec_driver_sql(
+                    f'SELECT rowid FROM main."{table}" WHERE "{column}" < ? ORDER BY "{column}" LIMIT ?',
+                    (upper, self.batch_size)
+                )).all()]
+                if rowids:
+                    marks = ",".join("?" * len(rowids))
+                    names = ",".join(f'"{name}"' for name in columns)
+                    # OR IGNORE: main and archive do not commit atomically in WAL mode,
+                    # so a batch may be copied again after a crash
+                    await conn.exec_driver_sql(
+                        f'INSERT OR IGNORE INTO archive."{table}" ({names}) '
+                        f'SELECT {names} FROM main."{table}" WHERE rowid IN ({marks})',
+                        tuple(rowids)
+                    )
+                    await self._notify(conn, table, rowids)
+                    await conn.exec_driver_sql(
+                        f'DELETE FROM main."{table}" WHERE rowid IN ({marks})', tuple(rowids)
+                    )
+                await conn.commit()
+            except Exception:
+                await conn.rollback()
+                raise
+            finally:
+                await conn.exec_driver_sql("DETACH DATABASE archive")
+            return len(rowids)
+
+    async def _ensure_archive_table(self, conn: AsyncConnection, table: str) -> List[str]:
+        """Create a table in the attached archive with the live table's schema, and get its columns."""
+        exists = (await conn.exec_driver_sql(
+            "SELECT 1 FROM archive.sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        )).first()
+        if not exists:
+            sql = (await conn.exec_driver_sql(
+                "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?", (table,)
+            )).scalar()
+            sql = re.sub(r'^CREATE TABLE\s+("?)\w+\1', f'CREATE TABLE archive."{table}"', sql, count=1)
+            await conn.exec_driver_sql(sql)
+        return [row[1] for row in (await conn.exec_driver_sql(f'PRAGMA archive.table_info("{table}")')).all()]
+
+    async def _incremental_vacuum(self, conn: AsyncConnection) -> None:
+        """Free up to vacuum_pages pages."""
+        # The pragma frees one page per step, and the DBAPI cursor only steps
+        # once, so run it on the driver connection and read it to the end
+        raw = await conn.get_raw_connection()
+        cursor = await raw.driver_connection.execute(f"PRAGMA incremental_vacuum({int(self.vacuum_pages)})")
+        await cursor.fetchall()
+        await cursor.close()
+
+    async def _space(self) -> Tuple[int, int, int, int]:
+        """Get the page size, page count, free page count and auto_vacuum mode."""
+        async with self._engine.connect() as conn:
+            values = []
+            for name in ("page_size", "page_count", "freelist_count", "auto_vacuum"):
+                values.append((await conn.exec_driver_sql(f"PRAGMA {name}")).scalar())
+            return tuple(values)
+
+    async def reclaim(self) -> int:
+        """
+        Return free pages to the filesystem.
+
+        Each incremental_vacuum step takes the writer connection on its own
+        and releases it before the pause, so request writes go in between
+        steps. A full VACUUM holds it for the whole rewrite, so it only runs
+        here when full_vacuum_free_ratio is set.
+
+        Returns:
+            int: Bytes reclaimed
+        """
+        page_size, before, free, auto_vacuum = await self._space()
+        if free and auto_vacuum == _AUTO_VACUUM_INCREMENTAL:
+            while free > 0:
+                async with self._engine.connect() as conn:
+                    await self._incremental_vacuum(conn)
+                    await conn.commit()
+                _, _, free, _ = await self._space()
+                if free:
+                    await asyncio.sleep(self.batch_pause_ms / 1000)
+        elif free and self.full_vacuum_free_ratio > 0 and free / before >= self.full_vacuum_free_ratio:
+            return await self.vacuum()
+        return await self._record_space(page_size, before)
+
+    async def vacuum(self) -> int:
+        """
+        Rewrite the database file with a full VACUUM.
+
+        Writers wait for the whole rewrite, so this is a maintenance step
+        (scripts/vacuum.py) rather than part of the periodic run. It also
+        switches the file to the auto_vacuum mode set on connect, after
+        which reclaim() can use incremental_vacuum.
+
+        Returns:
+            int: Bytes reclaimed
+        """
+        page_size, before, free, _ = await self._space()
+        logger.info(f"Running VACUUM to reclaim {free} free pages")
+        async with self._engine.connect() as conn:
+            await conn.exec_driver_sql("VACUUM")
+        return await self._record_space(page_size, before)
+
+    async def _record_space(self, page_size: int, before: int) -> int:
+        _, after, free, _ = await self._space()
+        reclaimed = max(before - after, 0) * page_size
+        self.reclaimed_bytes += reclaimed
+        self.database_bytes = after * page_size
+        self.free_bytes = free * page_size
+        return reclaimed
+
+    def stats(self) -> Dict[str, Any]:
+        """Get retention counters and space usage."""
+        return {
+            "runs": self.runs,
+            "skipped_runs": self.skipped_runs,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_run_ms": round(self.last_run_ms, 1),
+            "archived_rows": dict(self.archived_rows),
+            "deleted_rows": dict(self.deleted_rows),
+            "reclaimed_bytes": self.reclaimed_bytes,
+            "database_bytes": self.database_bytes,
+            "free_bytes": self.free_bytes
+        }
+
+
+# Global retention engine, pruning through the writer connection
+retention = RetentionEngine(
+    engine,
+    policies=settings.RETENTION_DAYS,
+    archive_tables=settings.RETENTION_ARCHIVE_TABLES,
+    archive_dir=settings.RETENTION_ARCHIVE_DIR,
+    batch_size=settings.RETENTION_BATCH_SIZE,
+    batch_pause_ms=settings.RETENTION_BATCH_PAUSE_MS,
+    interval_seconds=settings.RETENTION_INTERVAL_SECONDS,
+    vacuum_pages=settings.RETENTION_VACUUM_PAGES,
+    full_vacuum_free_ratio=settings.RETENTION_FULL_VACUUM_FREE_RATIO,
+    rollup_policies=settings.ROLLUP_RETENTION_DAYS
+)
+register_collector("retention", retention.stats)
@@ -0,0 +1,423 @@
+"""
+Time-bucketed rollups of the climate, lighting and watering history
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+import math
+
+from sqlalchemy import Table, and_, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.core.config import settings
+from app.core.write_buffer import Row, write_buffer
+from app.models import (
+    ClimateHistory, ClimateRollup, LightingHistory, LightingRollup,
+    WateringHistory, WateringRollup
+)
+
+EPOCH = datetime(1970, 1, 1)
+
+# Rollup granularities and their bucket sizes in seconds, finest first
+GRANULARITIES: Dict[str, int] = {"minute": 60, "hour": 3600, "day": 86400}
+
+
+def _naive_utc(ts: datetime) -> datetime:
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def floor_time(ts: datetime, seconds: int) -> datetime:
+    """Round a UTC time down to a multiple of seconds since the epoch."""
+    ts = _naive_utc(ts)
+    return EPOCH + timedelta(seconds=(ts - EPOCH) // timedelta(seconds=seconds) * seconds)
+
+
+def split_interval(start: datetime, end: datetime, seconds: int) -> Iterator[Tuple[datetime, float]]:
+    """Split [start, end) into buckets of the given size, yielding (bucket start, overlap seconds)."""
+    cursor = start
+    while cursor < end:
+        bucket = floor_time(cursor, seconds)
+        bucket_end = min(bucket + timedelta(seconds=seconds), end)
+        yield bucket, (bucket_end - cursor).total_seconds()
+        cursor = bucket_end
+
+
+def _retained(granularity: str, start: datetime) -> bool:
+    """Check whether a granularity's rollup rows still reach back to start."""
+    days = settings.ROLLUP_RETENTION_DAYS.get(granularity, 0)
+    return days <= 0 or start >= datetime.utcnow() - timedelta(days=days)
+
+
+def plan_query(
+    start: Optional[datetime],
+    end: Optional[datetime],
+    resolution: Optional[int]
+) -> Tuple[str, int, datetime, datetime]:
+    """
+    Pick the rollup to answer a history query from.
+
+    The resolution is raised so that the range spans at most
+    ROLLUP_MAX_POINTS points, then served from the coarsest granularity whose
+    buckets are no larger than it, and rounded up to a whole number of
+    those buckets. Points are aligned to the epoch, so a range that starts
+    mid-point touches one more point than it spans; that point is budgeted
+    for. Granularities pruned by ROLLUP_RETENTION_DAYS before the range
+    start are passed over for a coarser one.
+
+    Args:
+        start: Range start (default: 24 hours before end)
+        end: Range end (default: now)
+        resolution: Requested seconds per point
+
+    Returns:
+        Tuple[str, int, datetime, datetime]: Granularity, seconds per point,
+        and the range with its start aligned to the granularity
+    """
+    end = _naive_utc(end) if end else datetime.utcnow()
+    start = _naive_utc(start) if start else end - timedelta(days=1)
+    if end <= start:
+        raise ValueError("end must be after start")
+
+    span = (end - start).total_seconds()
+    points = max(settings.ROLLUP_MAX_POINTS - 1, 1)
+    step = max(resolution or 0, math.ceil(span / points), GRANULARITIES["minute"])
+    candidates = [name for name in GRANULARITIES if _retained(name, start)] or [list(GRANULARITIES)[-1]]
+    granularity = candidates[0]
+    for name in candidates:
+        if GRANULARITIES[name] <= step:
+            granularity = name
+    size = GRANULARITIES[granularity]
+    return granularity, math.ceil(step / size) * size, floor_time(start, size), end
+
+
+async def _upsert(conn: AsyncConnection, table: Table, keys: List[str], sums: List[str], rows: List[Dict[str, Any]], extremes: Tuple[str, ...] = ()) -> None:
+    """Add aggregate rows into a rollup table, merging with existing buckets."""
+    stmt = sqlite_insert(table)
+    update = {column: table.c[column] + stmt.excluded[column] for column in sums}
+    for column in extremes:
+        merge = func.min if column.endswith("_min") else func.max
+        update[column] = merge(func.coalesce(table.c[column], stmt.excluded[column]), stmt.excluded[column])
+    await conn.execute(stmt.on_conflict_do_update(index_elements=keys, set_=update), rows)
+
+
+async def _rollup_climate(conn: AsyncConnection, rows: List[Dict[str, Any]]) -> None:
+    buckets: Dict[Tuple[str, datetime], Dict[str, Any]] = {}
+    for values in rows:
+        temperature = float(values["temperature"])
+        humidity = float(values.get("humidity") or 0)
+        for name, size in GRANULARITIES.items():
+            bucket = floor_time(values["recorded_at"], size)
+            aggregate = buckets.get((name, bucket))
+            if aggregate is None:
+                buckets[(name, bucket)] = {
+                    "granularity": name,
+                    "bucket_start": bucket,
+                    "samples": 1,
+                    "temperature_min": temperature,
+                    "temperature_max": temperature,
+                    "temperature_sum": temperature,
+                    "humidity_sum": humidity
+                }
+            else:
+                aggregate["samples"] += 1
+                aggregate["temperature_min"] = min(aggregate["temperature_min"], temperature)
+                aggregate["temperature_max"] = max(aggregate["temperature_max"], temperature)
+                aggregate["temperature_sum"] += temperature
+                aggregate["humidity_sum"] += humidity
+
+    await _upsert(
+        conn, ClimateRollup.__table__, ["granularity", "bucket_start"],
+        ["samples", "temperature_sum", "humidity_sum"], list(buckets.values()),
+        extremes=("temperature_min", "temperature_max")
+    )
+
+
+async def _rollup_lighting(conn: AsyncConnection, rows: List[Dict[str, Any]]) -> None:
+    buckets: Dict[Tuple[str, datetime, str], Dict[str, Any]] = {}
+
+    def bucket_for(name: str, bucket: datetime, light_id: str) -> Dict[str, Any]:
+        aggregate = buckets.get((name, bucket, light_id))
+        if aggregate is None:
+            aggregate = buckets[(name, bucket, light_id)] = {
+                "granularity": name,
+                "bucket_start": bucket,
+                "light_id": light_id,
+                "on_seconds": 0.0,
+                "energy_wh": 0.0,
+                "toggles": 0
+            }
+        return aggregate
+
+    by_light: Dict[str, List[Dict[str, Any]]] = {}
+    for values in rows:
+        by_light.setdefault(values["light_id"], []).append(values)
+
+    for light_id, changes in by_light.items():
+        changes.sort(key=lambda values: values["recorded_at"])
+
+        # The state before this batch is the light's previous history row
+        result = await conn.execute(
+            select(LightingHistory.on, LightingHistory.power_usage, LightingHistory.recorded_at)
+            .where(LightingHistory.light_id == light_id, LightingHistory.recorded_at < changes[0]["recorded_at"])
+            .order_by(LightingHistory.recorded_at.desc())
+            .limit(1)
+        )
+        previous = result.first()
+        state = (previous.on, float(previous.power_usage or 0), previous.recorded_at) if previous else None
+
+        for change in changes:
+            changed_at = change["recorded_at"]
+            if state is not None and state[0]:
+                # Accrue the on-time and energy of the interval this change closes
+                for name, size in GRANULARITIES.items():
+                    for bucket, seconds in split_interval(state[2], changed_at, size):
+                        aggregate = bucket_for(name, bucket, light_id)
+                        aggregate["on_seconds"] += seconds
+                        aggregate["energy_wh"] += state[1] * seconds / 3600
+            for name, size in GRANULARITIES.items():
+                bucket_for(name, floor_time(changed_at, size), light_id)["toggles"] += 1
+            state = (change["on"], float(change.get("power_usage") or 0), changed_at)
+
+    await _upsert(
+        conn, LightingRollup.__table__, ["granularity", "bucket_start", "light_id"],
+        ["on_seconds", "energy_wh", "toggles"], list(buckets.values())
+    )
+
+
+async def _rollup_watering(conn: AsyncConnection, rows: List[Dict[str, Any]]) -> None:
+    buckets: Dict[Tuple[str, datetime, int], Dict[str, Any]] = {}
+    for values in rows:
+        for name, size in GRANULARITIES.items():
+            bucket = floor_time(values["started_at"], size)
+            aggregate = buckets.get((name, bucket, values["zone_id"]))
+            if aggregate is None:
+                aggregate = buckets[(name, bucket, values["zone_id"])] = {
+                    "granularity": name,
+                    "bucket_start": bucket,
+                    "zone_id": values["zone_id"],
+                    "runs": 0,
+                    "duration": 0,
+                    "water_used": 0
+                }
+            aggregate["runs"] += 1
+            aggregate["duration"] += values.get("duration") or 0
+            aggregate["water_used"] += values.get("water_used") or 0
+
+    await _upsert(
+        conn, WateringRollup.__table__, ["granularity", "bucket_start", "zone_id"],
+        ["runs", "duration", "water_used"], list(buckets.values())
+    )
+
+
+# History table -> rollup maintainer
+_MAINTAINERS = {
+    ClimateHistory.__tablename__: _rollup_climate,
+    LightingHistory.__tablename__: _rollup_lighting,
+    WateringHistory.__tablename__: _rollup_watering,
+}
+
+
+async def apply_rollups(conn: AsyncConnection, rows: List[Row]) -> None:
+    """
+    Fold newly written history rows into the rollup tables.
+
+    Args:
+        conn: Connection in the transaction to update the rollups in
+        rows: History rows, as written
+    """
+    by_table: Dict[str, List[Dict[str, Any]]] = {}
+    for table, values in rows:
+        if table.name in _MAINTAINERS:
+            by_table.setdefault(table.name, []).append(values)
+    for name, values in by_table.items():
+        await _MAINTAINERS[name](conn, values)
+
+
+write_buffer.add_listener(apply_rollups)
+
+
+def _series(granularity: str, step: int, start: datetime, end: datetime, points: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "granularity": granularity,
+        "resolution": step,
+        "start": start,
+        "end": end,
+        "points": sorted(points, key=lambda point: point["bucket_start"])
+    }
+
+
+async def climate_series(
+    db: AsyncSession,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    resolution: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Get temperature and humidity aggregates over a time range.
+
+    Args:
+        db: Database session
+        start: Range start
+        end: Range end
+        resolution: Requested seconds per point
+
+    Returns:
+        Dict[str, Any]: Chosen granularity and resolution, range and points
+    """
+    granularity, step, start, end = plan_query(start, end, resolution)
+    result = await db.execute(
+        select(ClimateRollup)
+        .where(
+            ClimateRollup.granularity == granularity,
+            ClimateRollup.bucket_start >= start,
+            ClimateRollup.bucket_start < end
+        )
+        .order_by(ClimateRollup.bucket_start)
+    )
+
+    points: Dict[datetime, Dict[str, Any]] = {}
+    for rollup in result.scalars():
+        bucket = floor_time(rollup.bucket_start, step)
+        point = points.get(bucket)
+        if point is None:
+            points[bucket] = {
+                "bucket_start": bucket,
+                "samples": rollup.samples,
+                "temperature_min": rollup.temperature_min,
+                "temperature_max": rollup.temperature_max,
+                "temperature_sum": rollup.temperature_sum,
+                "humidity_sum": rollup.humidity_sum
+            }
+        else:
+            point["samples"] += rollup.samples
+            point["temperature_min"] = min(point["temperature_min"], rollup.temperature_min)
+            point["temperature_max"] = max(point["temperature_max"], rollup.temperature_max)
+            point["temperature_sum"] += rollup.temperature_sum
+            point["humidity_sum"] += rollup.humidity_sum
+
+    for point in points.values():
+        point["temperature_avg"] = round(point.pop("temperature_sum") / point["samples"], 2)
+        point["humidity_avg"] = round(point.pop("humidity_sum") / point["samples"], 1)
+    return _series(granularity, step, start, end, list(points.values()))
+
+
+async def lighting_series(
+    db: AsyncSession,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    resolution: Optional[int] = None,
+    light_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Get on-time, energy and toggle aggregates over a time range.
+
+    Rollups cover time up to each light's latest state change; the time a
+    light has been on since then is added from its latest history row.
+
+    Args:
+        db: Database session
+        start: Range start
+        end: Range end
+        resolution: Requested seconds per point
+        light_id: Only this light (default: all lights)
+
+    Returns:
+        Dict[str, Any]: Chosen granularity and resolution, range and points
+    """
+    granularity, step, start, end = plan_query(start, end, resolution)
+    query = select(LightingRollup).where(
+        LightingRollup.granularity == granularity,
+        LightingRollup.bucket_start >= start,
+        LightingRollup.bucket_start < end
+    )
+    if light_id:
+        query = query.where(LightingRollup.light_id == light_id)
+    result = await db.execute(query)
+
+    points: Dict[datetime, Dict[str, Any]] = {}
+
+    def point_for(bucket: datetime) -> Dict[str, Any]:
+        point = points.get(bucket)
+        if point is None:
+            point = points[bucket] = {"bucket_start": bucket, "on_seconds": 0.0, "energy_wh": 0.0, "toggles": 0}
+        return point
+
+    for rollup in result.scalars():
+        point = point_for(floor_time(rollup.bucket_start, step))
+        point["on_seconds"] += rollup.on_seconds
+        point["energy_wh"] += rollup.energy_wh
+        point["toggles"] += rollup.toggles
+
+    # Lights that are still on since their latest change
+    latest = select(
+        LightingHistory.light_id,
+        func.max(LightingHistory.recorded_at).label("recorded_at")
+    ).group_by(LightingHistory.light_id)
+    if light_id:
+        latest = latest.where(LightingHistory.light_id == light_id)
+    latest = latest.subquery()
+    result = await db.execute(
+        select(LightingHistory.on, LightingHistory.power_usage, LightingHistory.recorded_at)
+        .join(latest, and_(
+            LightingHistory.light_id == latest.c.light_id,
+            LightingHistory.recorded_at == latest.c.recorded_at
+        ))
+    )
+    open_until = min(end, datetime.utcnow())
+    for on, power_usage, since in result.all():
+        if not on:
+            continue
+        for bucket, seconds in split_interval(max(since, start), open_until, step):
+            point = point_for(bucket)
+            point["on_seconds"] += seconds
+            point["energy_wh"] += float(power_usage or 0) * seconds / 3600
+
+    for point in points.values():
+        point["on_seconds"] = round(point["on_seconds"], 1)
+        point["energy_wh"] = round(point["energy_wh"], 3)
+    return _series(granularity, step, start, end, list(points.values()))
+
+
+async def watering_series(
+    db: AsyncSession,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    resolution: Optional[int] = None,
+    zone_id: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Get watering run, duration and water usage aggregates over a time range.
+
+    Args:
+        db: Database session
+        start: Range start
+        end: Range end
+        resolution: Requested seconds per point
+        zone_id: Only this zone (default: all zones)
+
+    Returns:
+        Dict[str, Any]: Chosen granularity and resolution, range and points
+    """
+    granularity, step, start, end = plan_query(start, end, resolution)
+    query = select(WateringRollup).where(
+        WateringRollup.granularity == granularity,
+        WateringRollup.bucket_start >= start,
+        WateringRollup.bucket_start < end
+    )
+    if zone_id is not None:
+        query = query.where(WateringRollup.zone_id == zone_id)
+    result = await db.execute(query)
+
+    points: Dict[datetime, Dict[str, Any]] = {}
+    for rollup in result.scalars():
+        bucket = floor_time(rollup.bucket_start, step)
+        point = points.get(bucket)
+        if point is None:
+            point = points[bucket] = {"bucket_start": bucket, "runs": 0, "duration": 0, "water_used": 0}
+        point["runs"] += rollup.runs
+        point["duration"] += rollup.duration
+        point["water_used"] += rollup.water_used
+    return _series(granularity, step, start, end, list(points.values()))
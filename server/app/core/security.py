@@ -4,6 +4,8 @@ Security utilities for authentication and authorization
 
 from datetime import datetime, timedelta
 from typing import Optional
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
@@ -95,6 +97,34 @@ def decode_token(token: str) -> Optional[dict]:
         return None
 
 
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+async def require_access_token(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)
+) -> dict:
+    """
+    Dependency requiring a valid access token in the Authorization header.
+    
+    Args:
+        credentials: Bearer credentials from the request
+        
+    Returns:
+        dict: Decoded token data
+        
+    Raises:
+        HTTPException: 401 if the token is missing, invalid or not an access token
+    """
+    payload = decode_token(credentials.credentials) if credentials else None
+    if not payload or payload.get("type") != "access" or not payload.get("sub"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail={"code": "UNAUTHORIZED", "message": "Invalid or expired token"},
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return payload
+
+
 def hash_token(token: str) -> str:
     """
     Hash a token for storage in database.
@@ -0,0 +1,144 @@
+"""
+Single-flight coalescing of identical concurrent read requests
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+import asyncio
+import functools
+import time
+
+from fastapi import BackgroundTasks, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import register_collector
+from app.core.versions import resource_versions
+
+# Handler arguments that are per-request plumbing rather than part of what is asked for
+_PLUMBING = (AsyncSession, Request, Response, BackgroundTasks)
+
+
+class _LeaderCancelled(Exception):
+    """The request computing a shared result went away; waiters compute their own."""
+
+
+class _RouteStats:
+    __slots__ = ("calls", "executions", "shared", "cached")
+
+    def __init__(self):
+        self.calls = 0
+        self.executions = 0
+        self.shared = 0
+        self.cached = 0
+
+
+class SingleFlight:
+    """
+    Runs one handler call per set of identical concurrent requests.
+
+    The first request for a key runs the handler; requests for the same key
+    that arrive while it runs wait for its result instead of running their
+    own queries. With ttl_ms, the result also answers later requests for
+    that long. Keys include the version of the resource the route reads,
+    so neither a shared nor a cached result is ever older than a write that
+    committed before the request arrived, and the body still matches the
+    ETag the request was given.
+    """
+
+    def __init__(self, ttl_ms: int = 0):
+        self.ttl_ms = ttl_ms
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+        self._results: Dict[Hashable, Tuple[float, Any]] = {}
+        self._stats: Dict[str, _RouteStats] = {}
+
+    def route(self, name: str, resource: Optional[str] = None, ttl_ms: Optional[int] = None) -> Callable:
+        """
+        Decorate an idempotent route handler.
+
+        Args:
+            name: Metrics name of the route
+            resource: Resource in app.core.versions whose version is part of the key
+            ttl_ms: How long a result answers later requests (default: the instance's ttl_ms)
+
+        Returns:
+            Callable: Decorator
+        """
+        ttl = (self.ttl_ms if ttl_ms is None else ttl_ms) / 1000
+        stats = self._stats.setdefault(name, _RouteStats())
+
+        def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+            @functools.wraps(func)
+            async def wrapper(**kwargs: Any) -> Any:
+                key = (
+                    name,
+                    resource_versions.get(resource).version if resource else None,
+                    tuple(sorted(
+                        (arg, repr(value)) for arg, value in kwargs.items()
+                        if not isinstance(value, _PLUMBING)
+                    ))
+                )
+                return await self._call(key, stats, ttl, lambda: func(**kwargs))
+            return wrapper
+        return decorator
+
+    async def _call(self, key: Hashable, stats: _RouteStats, ttl: float, compute: Callable[[], Awaitable[Any]]) -> Any:
+        stats.calls += 1
+        if ttl > 0:
+            cached = self._results.get(key)
+            if cached is not None and cached[0] > time.monotonic():
+                stats.cached += 1
+                return cached[1]
+
+        flight = self._flights.get(key)
+        if flight is not None:
+            stats.shared += 1
+            try:
+                return await asyncio.shield(flight)
+            except _LeaderCancelled:
+                stats.calls -= 1
+                stats.shared -= 1
+                return await self._call(key, stats, ttl, compute)
+
+        flight = self._flights[key] = asyncio.get_running_loop().create_future()
+        stats.executions += 1
+        try:
+            result = await compute()
+        except asyncio.CancelledError:
+            flight.set_exception(_LeaderCancelled())
+            raise
+        except Exception as e:
+            flight.set_exception(e)
+            raise
+        else:
+            flight.set_result(result)
+            if ttl > 0:
+                self._store(key, result, ttl)
+            return result
+        finally:
+            del self._flights[key]
+            # Mark a failure retrieved, so that it is not logged when nobody waited for it
+            flight.exception()
+
+    def _store(self, key: Hashable, result: Any, ttl: float) -> None:
+        now = time.monotonic()
+        for expired in [k for k, (expires, _) in self._results.items() if expires <= now]:
+            del self._results[expired]
+        self._results[key] = (now + ttl, result)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get per-route call, execution and hit counters."""
+        return {
+            name: {
+                "calls": route.calls,
+                "executions": route.executions,
+                "shared": route.shared,
+                "cached": route.cached,
+                "hit_ratio": round((route.shared + route.cached) / route.calls, 3) if route.calls else 0.0
+            }
+            for name, route in self._stats.items()
+        }
+
+
+# Global single-flight instance for the status routes
+single_flight = SingleFlight(ttl_ms=settings.SINGLE_FLIGHT_TTL_MS)
+register_collector("single_flight", single_flight.stats)
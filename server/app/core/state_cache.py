@@ -0,0 +1,231 @@
+"""
+Write-through in-memory cache of single-row device state tables
+"""
+
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Type
+import asyncio
+import logging
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import register_collector
+from app.models import ClimateSettings, SecuritySystem, WaterTank, WateringSchedule
+
+logger = logging.getLogger(__name__)
+
+# Session.info key holding the cached-table rows written in the current transaction
+_PENDING_KEY = "pending_state_rows"
+
+# Marks a model whose row must be read from the database on the next get()
+_UNLOADED = object()
+
+# Called with the model whose snapshot changed, or None when any of them may have changed
+StateListener = Callable[[Optional[Type]], None]
+
+
+def _state_type(model: Type) -> Type[NamedTuple]:
+    """
+    Build the snapshot type of a model: a NamedTuple of its mapped columns.
+
+    Columns the database stamps on every update (updated_at) are left out,
+    since their new value is only known after a round trip.
+    """
+    fields = []
+    for attr in inspect(model).column_attrs:
+        column = attr.columns[0]
+        if column.onupdate is not None or column.server_onupdate is not None:
+            continue
+        try:
+            python_type = column.type.python_type
+        except NotImplementedError:
+            python_type = Any
+        fields.append((attr.key, Optional[python_type]))
+    return NamedTuple(f"{model.__name__}State", fields)
+
+
+class StateCache:
+    """
+    Immutable snapshots of tables that hold a single row, such as the
+    security system or climate settings.
+
+    Rows are loaded at startup and then kept current without reads:
+    instances of a cached model that a session writes are copied into the
+    cache when its transaction commits. Writes made elsewhere (another
+    worker, a script, the sqlite3 shell) are caught by polling SQLite's
+    data_version on the writer connection, which changes only when another
+    connection has committed, and reload every row. A model whose written
+    row is missing values (server defaults after an insert) is reloaded on
+    the next get().
+    """
+
+    def __init__(self, poll_interval_ms: int = 1000):
+        self.poll_interval_ms = poll_interval_ms
+        self._types: Dict[Type, Type[NamedTuple]] = {}
+        self._states: Dict[Type, Any] = {}
+        # Bumped on every change to a model's entry, so a load that raced a write is discarded
+        self._generations: Dict[Type, int] = {}
+        self._listeners: List[StateListener] = []
+        self._engine: Optional[AsyncEngine] = None
+        self._task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.loads = 0
+        self.writes = 0
+        self.reloads = 0
+
+    def register(self, model: Type) -> None:
+        """Cache a single-row model."""
+        self._types[model] = _state_type(model)
+        self._states[model] = _UNLOADED
+        self._generations[model] = 0
+
+    def is_cached(self, model: Type) -> bool:
+        return model in self._types
+
+    def add_listener(self, listener: StateListener) -> None:
+        """Register a listener for snapshot changes."""
+        self._listeners.append(listener)
+
+    async def get(self, db: AsyncSession, model: Type) -> Optional[NamedTuple]:
+        """
+        Get the snapshot of a model's row, reading it through db if it is not loaded.
+
+        Args:
+            db: Session to load the row with on a miss
+            model: Registered model
+
+        Returns:
+            Optional[NamedTuple]: Snapshot with the model's column attributes, or None if the table is empty
+        """
+        state = self._states[model]
+        if state is not _UNLOADED:
+            self.hits += 1
+            return state
+        generation = self._generations[model]
+        row = (await db.execute(select(model.__table__).limit(1))).first()
+        self.loads += 1
+        state = self._snapshot(model, row._mapping) if row is not None else None
+        if self._generations[model] == generation:
+            self._states[model] = state
+        return state
+
+    def set(self, model: Type, values: Optional[Dict[str, Any]]) -> None:
+        """Replace a model's snapshot with committed column values, or None for a deleted row."""
+        state_type = self._types[model]
+        if values is not None and any(field not in values for field in state_type._fields):
+            self.invalidate(model)
+            return
+        self._generations[model] += 1
+        self._states[model] = self._snapshot(model, values) if values is not None else None
+        self.writes += 1
+        self._notify(model)
+
+    def invalidate(self, model: Optional[Type] = None) -> None:
+        """Drop one model's snapshot, or every snapshot, so the next get() reads the database."""
+        for cached in [model] if model is not None else list(self._types):
+            self._generations[cached] += 1
+            self._states[cached] = _UNLOADED
+        self._notify(model)
+
+    async def load(self, conn: AsyncConnection) -> None:
+        """Read every cached row."""
+        for model in self._types:
+            generation = self._generations[model]
+            row = (await conn.execute(select(model.__table__).limit(1))).first()
+            self.loads += 1
+            if self._generations[model] == generation:
+                self._states[model] = self._snapshot(model, row._mapping) if row is not None else None
+
+    async def start(self, engine: AsyncEngine) -> None:
+        """
+        Load every row and start watching the database file for other writers.
+
+        Args:
+            engine: Writer engine
+        """
+        async with engine.connect() as conn:
+            await self.load(conn)
+        # data_version is per connection, so watching needs the single dedicated writer connection
+        if self.poll_interval_ms > 0 and engine.url.get_backend_name() == "sqlite" and engine.pool.size() == 1:
+            self._engine = engine
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        """Stop watching for other writers."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _watch(self) -> None:
+        version = None
+        while True:
+            try:
+                async with self._engine.connect() as conn:
+                    current = (await conn.exec_driver_sql("PRAGMA data_version")).scalar()
+                    if version is not None and current != version:
+                        self.reloads += 1
+                        await self.load(conn)
+                        self._notify(None)
+                    version = current
+            except Exception as e:
+                logger.error(f"State cache watcher failed: {e}")
+                self.invalidate()
+            await asyncio.sleep(self.poll_interval_ms / 1000)
+
+    def _notify(self, model: Optional[Type]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(model)
+            except Exception as e:
+                logger.error(f"State cache listener {listener.__qualname__} failed: {e}")
+
+    def _snapshot(self, model: Type, values: Any) -> NamedTuple:
+        state_type = self._types[model]
+        return state_type(**{field: values[field] for field in state_type._fields})
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit and load counters."""
+        return {
+            "models": len(self._types),
+            "loaded": sum(1 for state in self._states.values() if state is not _UNLOADED),
+            "hits": self.hits,
+            "loads": self.loads,
+            "writes": self.writes,
+            "reloads": self.reloads
+        }
+
+
+# Global state cache instance
+state_cache = StateCache(poll_interval_ms=settings.STATE_CACHE_POLL_INTERVAL_MS)
+for _model in (SecuritySystem, ClimateSettings, WaterTank, WateringSchedule):
+    state_cache.register(_model)
+register_collector("state_cache", state_cache.stats)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_after_flush(session: Session, flush_context: Any) -> None:
+    for instance in list(session.new) + list(session.dirty):
+        if state_cache.is_cached(type(instance)):
+            session.info.setdefault(_PENDING_KEY, {})[type(instance)] = dict(inspect(instance).dict)
+    for instance in session.deleted:
+        if state_cache.is_cached(type(instance)):
+            session.info.setdefault(_PENDING_KEY, {})[type(instance)] = None
+
+
+@event.listens_for(Session, "after_commit")
+def _write_after_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        for model, values in pending.items():
+            state_cache.set(model, values)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,191 @@
+"""
+Per-resource version counters and conditional GET support
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+import uuid
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.metrics import register_collector
+from app.core.state_cache import state_cache
+
+# Session.info key holding the tables written in the current transaction
+_PENDING_KEY = "pending_versioned_tables"
+
+
+class ResourceVersion(NamedTuple):
+    """A resource's version and when it was last bumped."""
+    version: int
+    modified_at: datetime
+
+
+class ResourceVersions:
+    """
+    Version counters for the resources behind the status endpoints.
+
+    A resource is bumped when a transaction that wrote one of its tables
+    commits, or directly with bump(). Versions start from zero in every
+    process, so ETags also carry a per-process epoch: a client that moves
+    to another worker gets a full response rather than a wrong 304.
+    """
+
+    def __init__(self):
+        self.epoch = uuid.uuid4().hex[:8]
+        self._versions: Dict[str, ResourceVersion] = {}
+        self._tables: Dict[str, List[str]] = {}
+        self.conditional_requests = 0
+        self.not_modified = 0
+
+    def register(self, resource: str, tables: Iterable[str] = ()) -> None:
+        """
+        Track a resource.
+
+        Args:
+            resource: Resource name
+            tables: Tables whose committed writes bump the resource
+        """
+        self._versions[resource] = ResourceVersion(0, datetime.now(timezone.utc))
+        for table in tables:
+            self._tables.setdefault(table, []).append(resource)
+
+    def get(self, resource: str) -> ResourceVersion:
+        return self._versions[resource]
+
+    def bump(self, resource: str) -> int:
+        """
+        Mark a resource as changed.
+
+        Returns:
+            int: New version
+        """
+        version = self._versions[resource].version + 1
+        self._versions[resource] = ResourceVersion(version, datetime.now(timezone.utc))
+        return version
+
+    def bump_tables(self, tables: Iterable[str]) -> None:
+        """Bump every resource built from any of the tables."""
+        for resource in {resource for table in tables for resource in self._tables.get(table, ())}:
+            self.bump(resource)
+
+    def bump_all(self) -> None:
+        for resource in list(self._versions):
+            self.bump(resource)
+
+    def etag(self, resource: str, salt: str = "") -> str:
+        """Get the strong ETag of a resource's current version."""
+        return f'"{self.epoch}-{self._versions[resource].version}{salt}"'
+
+    def stats(self) -> Dict[str, Any]:
+        """Get resource versions and conditional request counters."""
+        return {
+            "versions": {resource: version.version for resource, version in self._versions.items()},
+            "conditional_requests": self.conditional_requests,
+            "not_modified": self.not_modified
+        }
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison against an If-None-Match list, as RFC 9110 specifies for GET."""
+    if header.strip() == "*":
+        return True
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def _not_modified_since(header: str, modified_at: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return modified_at.replace(microsecond=0) <= since
+
+
+def conditional(resource: str, salt: Optional[Callable[[], str]] = None) -> Callable:
+    """
+    Build a route dependency answering conditional GETs from a resource's version.
+
+    Put it in the route's dependencies so that it runs before the session
+    dependency and the handler: a request whose If-None-Match (or, without
+    one, If-Modified-Since) matches gets 304 Not Modified without a query.
+    Otherwise the ETag and Last-Modified headers are added to the response.
+    The version is read before the body is built, so the body is never older
+    than its ETag.
+
+    A salted resource changes without a bump, so the version's time says
+    nothing about it: it gets no Last-Modified, and If-Modified-Since is
+    ignored.
+
+    Args:
+        resource: Registered resource name
+        salt: Called for an ETag suffix, for bodies that also change with time
+
+    Returns:
+        Callable: Dependency
+    """
+    async def check(request: Request, response: Response) -> None:
+        current = resource_versions.get(resource)
+        etag = resource_versions.etag(resource, salt() if salt else "")
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if salt is None:
+            headers["Last-Modified"] = format_datetime(current.modified_at, usegmt=True)
+
+        if_none_match = request.headers.get("if-none-match")
+        if_modified_since = request.headers.get("if-modified-since") if salt is None else None
+        if if_none_match is not None or if_modified_since is not None:
+            resource_versions.conditional_requests += 1
+            if if_none_match is not None:
+                unchanged = _etag_matches(if_none_match, etag)
+            else:
+                unchanged = _not_modified_since(if_modified_since, current.modified_at)
+            if unchanged:
+                resource_versions.not_modified += 1
+                raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        response.headers.update(headers)
+    return check
+
+
+# Global resource versions, one per status endpoint
+resource_versions = ResourceVersions()
+resource_versions.register("security", ["security_system", "security_sensors", "doors"])
+resource_versions.register("climate", ["climate_settings"])
+resource_versions.register("garden", ["garden_zones", "water_tank", "watering_schedule"])
+resource_versions.register("lighting", ["rooms", "lights"])
+resource_versions.register("cameras", ["cameras"])
+# Bumped by the dashboard snapshot itself
+resource_versions.register("dashboard")
+register_collector("versions", resource_versions.stats)
+# Another process wrote to the database; any resource may have changed
+state_cache.add_listener(lambda model: resource_versions.bump_all() if model is None else None)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_after_flush(session: Session, flush_context: Any) -> None:
+    instances = list(session.new) + list(session.dirty) + list(session.deleted)
+    if instances:
+        tables = session.info.setdefault(_PENDING_KEY, set())
+        tables.update(instance.__table__.name for instance in instances)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_after_commit(session: Session) -> None:
+    tables = session.info.pop(_PENDING_KEY, None)
+    if tables:
+        resource_versions.bump_tables(tables)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,320 @@
+"""
+Group-commit write buffer for append-only tables
+"""
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from collections import deque
+from datetime import datetime
+import asyncio
+import logging
+import time
+
+from sqlalchemy import DateTime, Executable, Table, event, inspect
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logs import RateLimitedLog
+from app.core.metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+# Logged on every insert while the database is behind
+_buffer_full_log = RateLimitedLog(logger, settings.LOG_HOT_PATH_RATE)
+
+# Durability modes
+MODE_TRANSACTION = "transaction"  # insert inside the request transaction
+MODE_BUFFERED = "buffered"  # insert in batches after the request commits
+
+# Session.info keys holding the rows added in the current transaction:
+# rows still to insert, and rows the session inserts itself
+_PENDING_KEY = "pending_buffered_rows"
+_OBSERVED_KEY = "observed_buffered_rows"
+
+# A row as table plus column values
+Row = Tuple[Table, Dict[str, Any]]
+
+# Runs in a transaction of its own after each flush, with the rows committed since the last one
+FlushListener = Callable[[AsyncConnection, List[Row]], Awaitable[None]]
+
+# Gives statements, with their parameters, to run in the transaction that writes the rows
+RowStatements = Callable[[List[Row]], List[Tuple[Executable, List[Dict[str, Any]]]]]
+
+
+def _row_values(row: Any) -> Row:
+    """
+    Get the table and column values of a new ORM instance.
+
+    Unset timestamp columns with a server default are stamped now on the
+    instance, so that a row keeps its request time rather than its flush
+    time.
+    """
+    mapper = inspect(row).mapper
+    values = {}
+    for attr in mapper.column_attrs:
+        column = attr.columns[0]
+        if attr.key not in row.__dict__ and column.server_default is not None and isinstance(column.type, DateTime):
+            setattr(row, attr.key, datetime.utcnow())
+        if attr.key in row.__dict__:
+            values[column.key] = row.__dict__[attr.key]
+    return mapper.local_table, values
+
+
+class WriteBuffer:
+    """
+    Accumulates rows for append-only tables and inserts them in batches.
+
+    Rows are taken from the request session once its transaction commits,
+    and written with one executemany per table and column set, in a single
+    transaction per flush. A flush runs when max_rows rows are pending or
+    flush_interval_ms after the previous one. Rows pending when the process
+    dies are lost, which is the trade-off of the buffered mode.
+
+    Flush listeners see every committed row in either mode, right after the
+    rows are written, so that derived tables are maintained in batches too.
+    Each listener runs in its own transaction; a failing one is retried alone
+    with the same rows on the next flush, so the inserts are not held up and
+    the listeners that succeeded do not see the rows twice.
+
+    Derived rows that must never drift from the rows they count, such as
+    counters, are written with row statements instead: these run in the
+    transaction that inserts the rows, the flush transaction in buffered
+    mode and the request transaction in transaction mode.
+    """
+
+    def __init__(
+        self,
+        mode: str = MODE_BUFFERED,
+        max_rows: int = 500,
+        flush_interval_ms: int = 200,
+        max_pending: int = 10000
+    ):
+        if mode not in (MODE_TRANSACTION, MODE_BUFFERED):
+            raise ValueError(f"Unknown write buffer mode: {mode}")
+        self.mode = mode
+        self.max_rows = max_rows
+        self.flush_interval_ms = flush_interval_ms
+        self.max_pending = max_pending
+        self._engine: Optional[AsyncEngine] = None
+        self._pending: deque = deque()
+        self._observed: deque = deque()
+        self._retry: deque = deque()
+        self._retry_rows = 0
+        self._listeners: List[FlushListener] = []
+        self._statements: List[RowStatements] = []
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.failed_flushes = 0
+        self.failed_listeners = 0
+        self.dropped_rows = 0
+        self.peak_pending = 0
+        self.last_flush_ms = 0.0
+
+    @property
+    def buffered(self) -> bool:
+        return self.mode == MODE_BUFFERED
+
+    def add_listener(self, listener: FlushListener) -> None:
+        """Register a listener for committed rows."""
+        self._listeners.append(listener)
+
+    def add_statements(self, statements: RowStatements) -> None:
+        """Register statements to run in the same transaction as the rows they derive from."""
+        self._statements.append(statements)
+
+    def row_statements(self, rows: List[Row]) -> List[Tuple[Executable, List[Dict[str, Any]]]]:
+        """Get the registered statements for rows about to be committed."""
+        return [statement for statements in self._statements for statement in statements(rows)]
+
+    def add(self, db: AsyncSession, row: Any) -> None:
+        """
+        Add a row for an append-only table.
+
+        In transaction mode the row is added to the session as usual. In
+        buffered mode it is held until the session commits, then queued for
+        the next flush; it is discarded if the session rolls back.
+
+        Args:
+            db: Request session
+            row: New ORM instance
+        """
+        values = _row_values(row)
+        if self.buffered:
+            db.info.setdefault(_PENDING_KEY, []).append(values)
+            return
+        db.add(row)
+        if self._listeners or self._statements:
+            db.info.setdefault(_OBSERVED_KEY, []).append(values)
+
+    def observe(self, rows: List[Row]) -> None:
+        """Queue rows the session already inserted, for the flush listeners only."""
+        self._observed.extend(rows)
+
+    def extend(self, rows: List[Row]) -> None:
+        """Queue committed rows for the next flush."""
+        self._pending.extend(rows)
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            # The database is not keeping up; shed the oldest rows
+            for _ in range(overflow):
+                self._pending.popleft()
+            self.dropped_rows += overflow
+            _buffer_full_log.warning("Write buffer full, dropped %d rows", overflow)
+        self.peak_pending = max(self.peak_pending, len(self._pending))
+        if len(self._pending) >= self.max_rows and self._wake is not None:
+            self._wake.set()
+
+    async def start(self, engine: AsyncEngine) -> None:
+        """Start the periodic flusher, writing through the given engine."""
+        self._engine = engine
+        if (self.buffered or self._listeners) and self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flusher and write everything still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Write every pending row.
+
+        Returns:
+            int: Number of rows written
+        """
+        async with self._lock:
+            if not (self._pending or self._observed or self._retry) or self._engine is None:
+                return 0
+            rows = list(self._pending)
+            self._pending.clear()
+            observed = list(self._observed)
+            self._observed.clear()
+
+            # One executemany per table and column set, in arrival order
+            batches: Dict[Tuple[Table, Tuple[str, ...]], List[Dict[str, Any]]] = {}
+            for table, values in rows:
+                batches.setdefault((table, tuple(values)), []).append(values)
+
+            start = time.perf_counter()
+            try:
+                if batches:
+                    async with self._engine.begin() as conn:
+                        for (table, _), values in batches.items():
+                            await conn.execute(table.insert(), values)
+                        for statement, params in self.row_statements(rows):
+                            await conn.execute(statement, params)
+            except Exception as e:
+                # Put the rows back for the next attempt
+                self.failed_flushes += 1
+                self._pending.extendleft(reversed(rows))
+                self._observed.extendleft(reversed(observed))
+                logger.error(f"Write buffer flush of {len(rows)} rows failed: {e}")
+                return 0
+
+            self.last_flush_ms = (time.perf_counter() - start) * 1000
+            self.flushes += 1
+            self.flushed_rows += len(rows)
+            await self._retry_listeners()
+            await self._notify(rows + observed)
+            return len(rows)
+
+    async def _notify(self, rows: List[Row]) -> None:
+        """Run the flush listeners over rows that are now in the database."""
+        if not rows:
+            return
+        for listener in self._listeners:
+            await self._apply(listener, rows)
+
+    async def _retry_listeners(self) -> None:
+        """Run the listeners that failed before again, each with its own rows."""
+        retry = list(self._retry)
+        self._retry.clear()
+        self._retry_rows = 0
+        for listener, rows in retry:
+            await self._apply(listener, rows)
+
+    async def _apply(self, listener: FlushListener, rows: List[Row]) -> None:
+        """Run one listener in its own transaction, queueing its rows for a retry if it fails."""
+        try:
+            async with self._engine.begin() as conn:
+                await listener(conn, rows)
+        except Exception as e:
+            self.failed_listeners += 1
+            self._retry.append((listener, rows))
+            self._retry_rows += len(rows)
+            while self._retry_rows > self.max_pending and len(self._retry) > 1:
+                # The listener keeps failing; give up on its oldest rows
+                _, dropped = self._retry.popleft()
+                self._retry_rows -= len(dropped)
+                self.dropped_rows += len(dropped)
+            logger.error(f"Write buffer listener {getattr(listener, '__qualname__', listener)} failed for {len(rows)} rows: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval_ms / 1000)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get queue depth and flush counters."""
+        return {
+            "mode": self.mode,
+            "pending": len(self._pending),
+            "observed": len(self._observed),
+            "retry_rows": self._retry_rows,
+            "peak_pending": self.peak_pending,
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "failed_flushes": self.failed_flushes,
+            "failed_listeners": self.failed_listeners,
+            "dropped_rows": self.dropped_rows,
+            "last_flush_ms": round(self.last_flush_ms, 2)
+        }
+
+
+# Global write buffer instance
+write_buffer = WriteBuffer(
+    mode=settings.WRITE_BUFFER_MODE,
+    max_rows=settings.WRITE_BUFFER_MAX_ROWS,
+    flush_interval_ms=settings.WRITE_BUFFER_FLUSH_INTERVAL_MS,
+    max_pending=settings.WRITE_BUFFER_MAX_PENDING
+)
+register_collector("write_buffer", write_buffer.stats)
+
+
+@event.listens_for(Session, "before_commit")
+def _execute_before_commit(session: Session) -> None:
+    # Transaction mode: derived rows go in the request transaction
+    observed = session.info.get(_OBSERVED_KEY)
+    if observed:
+        for statement, params in write_buffer.row_statements(observed):
+            session.execute(statement, params)
+
+
+@event.listens_for(Session, "after_commit")
+def _queue_after_commit(session: Session) -> None:
+    rows = session.info.pop(_PENDING_KEY, None)
+    if rows:
+        write_buffer.extend(rows)
+    observed = session.info.pop(_OBSERVED_KEY, None)
+    if observed:
+        write_buffer.observe(observed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_OBSERVED_KEY, None)
@@ -9,17 +9,21 @@ from app.models.door import Door
 from app.models.security_alert import SecurityAlert
 from app.models.climate_settings import ClimateSettings
 from app.models.climate_history import ClimateHistory
+from app.models.climate_rollup import ClimateRollup
 from app.models.garden_zone import GardenZone
 from app.models.water_tank import WaterTank
 from app.models.watering_schedule import WateringSchedule
 from app.models.watering_history import WateringHistory
+from app.models.watering_rollup import WateringRollup
 from app.models.room import Room
 from app.models.light import Light
 from app.models.lighting_history import LightingHistory
+from app.models.lighting_rollup import LightingRollup
 from app.models.camera import Camera
 from app.models.camera_recording import CameraRecording
 from app.models.camera_snapshot import CameraSnapshot
 from app.models.activity_log import ActivityLog
+from app.models.activity_log_count import ActivityLogCount
 from app.models.system_setting import SystemSetting
 
 __all__ = [
@@ -32,16 +36,20 @@ __all__ = [
     "SecurityAlert",
     "ClimateSettings",
     "ClimateHistory",
+    "ClimateRollup",
     "GardenZone",
     "WaterTank",
     "WateringSchedule",
     "WateringHistory",
+    "WateringRollup",
     "Room",
     "Light",
     "LightingHistory",
+    "LightingRollup",
     "Camera",
     "CameraRecording",
     "CameraSnapshot",
     "ActivityLog",
+    "ActivityLogCount",
     "SystemSetting",
 ]
@@ -2,7 +2,7 @@
 Activity Log Model
 """
 
-from sqlalchemy import Column, String, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, String, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -11,11 +11,17 @@ class ActivityLog(Base):
     """ActivityLog model for storing system activity logs."""
     
     __tablename__ = "activity_logs"
+    __table_args__ = (
+        # Newest-first listings, optionally filtered by type or category
+        Index("ix_activity_logs_timestamp_id", "timestamp", "id"),
+        Index("ix_activity_logs_log_type_timestamp", "log_type", "timestamp", "id"),
+        Index("ix_activity_logs_category_timestamp", "category", "timestamp", "id"),
+    )
     
     id = Column(String(36), primary_key=True)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    timestamp = Column(DateTime(timezone=True), server_default=func.now())
     event = Column(String(255), nullable=False)
-    log_type = Column(String(50), nullable=False, index=True)
-    category = Column(String(50), nullable=False, index=True)
+    log_type = Column(String(50), nullable=False)
+    category = Column(String(50), nullable=False)
     details = Column(JSON)
     user_id = Column(String(36), ForeignKey("users.id", ondelete="SET NULL"), index=True)
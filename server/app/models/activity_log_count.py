@@ -0,0 +1,15 @@
+"""
+Activity Log Count Model
+"""
+
+from sqlalchemy import Column, Integer, String
+from app.core.database import Base
+
+
+class ActivityLogCount(Base):
+    """ActivityLogCount model for the number of activity log rows per log type."""
+    
+    __tablename__ = "activity_log_counts"
+    
+    log_type = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -2,7 +2,7 @@
 Camera Recording Model
 """
 
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, BigInteger, JSON
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, BigInteger, JSON, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -11,9 +11,13 @@ class CameraRecording(Base):
     """CameraRecording model for storing camera recording information."""
     
     __tablename__ = "camera_recordings"
+    __table_args__ = (
+        # Latest recording of a camera
+        Index("ix_camera_recordings_camera_id_started_at", "camera_id", "started_at"),
+    )
     
     id = Column(String(36), primary_key=True)
-    camera_id = Column(String(50), ForeignKey("cameras.camera_id"), nullable=False, index=True)
+    camera_id = Column(String(50), ForeignKey("cameras.camera_id"), nullable=False)
     recording_id = Column(String(50), unique=True, nullable=False)
     video_url = Column(String, nullable=False)
     duration = Column(Integer, nullable=False)
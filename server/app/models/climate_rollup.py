@@ -0,0 +1,24 @@
+"""
+Climate Rollup Model
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, Float, UniqueConstraint
+from app.core.database import Base
+
+
+class ClimateRollup(Base):
+    """ClimateRollup model for minute, hour and day aggregates of climate history."""
+    
+    __tablename__ = "climate_rollups"
+    __table_args__ = (
+        UniqueConstraint("granularity", "bucket_start", name="uq_climate_rollups_bucket"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    granularity = Column(String(10), nullable=False)
+    bucket_start = Column(DateTime, nullable=False)
+    samples = Column(Integer, nullable=False, default=0)
+    temperature_min = Column(Float)
+    temperature_max = Column(Float)
+    temperature_sum = Column(Float, nullable=False, default=0)
+    humidity_sum = Column(Float, nullable=False, default=0)
@@ -2,7 +2,7 @@
 Light Model
 """
 
-from sqlalchemy import Column, String, Boolean, Integer, DateTime, ForeignKey, Numeric
+from sqlalchemy import Column, String, Boolean, Integer, DateTime, ForeignKey, Numeric, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -11,11 +11,15 @@ class Light(Base):
     """Light model for storing light information."""
     
     __tablename__ = "lights"
+    __table_args__ = (
+        # A room's lights, paged in id order
+        Index("ix_lights_room_id_id", "room_id", "id"),
+    )
     
     id = Column(String(36), primary_key=True)
     light_id = Column(String(50), unique=True, nullable=False, index=True)
     name = Column(String(255), nullable=False)
-    room_id = Column(String(36), ForeignKey("rooms.id", ondelete="SET NULL"), index=True)
+    room_id = Column(String(36), ForeignKey("rooms.id", ondelete="SET NULL"))
     on = Column(Boolean, default=False, index=True)
     brightness = Column(Integer)
     color = Column(String(7))
@@ -2,7 +2,7 @@
 Lighting History Model
 """
 
-from sqlalchemy import Column, String, Boolean, Integer, DateTime, Numeric
+from sqlalchemy import Column, String, Boolean, Integer, DateTime, Numeric, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -11,9 +11,13 @@ class LightingHistory(Base):
     """LightingHistory model for storing historical lighting data."""
     
     __tablename__ = "lighting_history"
+    __table_args__ = (
+        # Latest state of a light, before or at a given time
+        Index("ix_lighting_history_light_id_recorded_at", "light_id", "recorded_at"),
+    )
     
     id = Column(String(36), primary_key=True)
-    light_id = Column(String(50), nullable=False, index=True)
+    light_id = Column(String(50), nullable=False)
     on = Column(Boolean, nullable=False)
     brightness = Column(Integer)
     power_usage = Column(Numeric(10, 2))
@@ -0,0 +1,23 @@
+"""
+Lighting Rollup Model
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, Float, UniqueConstraint
+from app.core.database import Base
+
+
+class LightingRollup(Base):
+    """LightingRollup model for minute, hour and day aggregates of lighting history per light."""
+    
+    __tablename__ = "lighting_rollups"
+    __table_args__ = (
+        UniqueConstraint("granularity", "bucket_start", "light_id", name="uq_lighting_rollups_bucket"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    granularity = Column(String(10), nullable=False)
+    bucket_start = Column(DateTime, nullable=False)
+    light_id = Column(String(50), nullable=False)
+    on_seconds = Column(Float, nullable=False, default=0)
+    energy_wh = Column(Float, nullable=False, default=0)
+    toggles = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,23 @@
+"""
+Watering Rollup Model
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint
+from app.core.database import Base
+
+
+class WateringRollup(Base):
+    """WateringRollup model for minute, hour and day aggregates of watering history per zone."""
+    
+    __tablename__ = "watering_rollups"
+    __table_args__ = (
+        UniqueConstraint("granularity", "bucket_start", "zone_id", name="uq_watering_rollups_bucket"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    granularity = Column(String(10), nullable=False)
+    bucket_start = Column(DateTime, nullable=False)
+    zone_id = Column(Integer, nullable=False)
+    runs = Column(Integer, nullable=False, default=0)
+    duration = Column(Integer, nullable=False, default=0)
+    water_used = Column(Integer, nullable=False, default=0)
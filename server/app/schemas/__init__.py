@@ -11,14 +11,16 @@ from app.schemas.security import (
 )
 from app.schemas.climate import (
     ClimateStatus, TemperatureRequest, FanSpeedRequest, ModeRequest,
-    ClimateApplyRequest
+    ClimateApplyRequest, ClimateHistoryPoint, ClimateHistorySeries
 )
 from app.schemas.garden import (
     GardenStatus, ZoneToggleRequest, AllZonesRequest, WateringScheduleRequest,
-    WaterTankStatus, WaterTankRefillResponse
+    WaterTankStatus, WaterTankRefillResponse, WateringHistoryPoint,
+    WateringHistorySeries
 )
 from app.schemas.lighting import (
-    LightingStatus, MasterLightRequest, LightControlRequest, LightResponse
+    LightingStatus, RoomLights, MasterLightRequest, LightControlRequest, LightResponse,
+    LightingHistoryPoint, LightingHistorySeries
 )
 from app.schemas.camera import (
     CameraList, CameraStream, CameraSnapshot, CameraRecordingStart,
@@ -57,6 +59,8 @@ __all__ = [
     "FanSpeedRequest",
     "ModeRequest",
     "ClimateApplyRequest",
+    "ClimateHistoryPoint",
+    "ClimateHistorySeries",
     # Garden schemas
     "GardenStatus",
     "ZoneToggleRequest",
@@ -64,11 +68,16 @@ __all__ = [
     "WateringScheduleRequest",
     "WaterTankStatus",
     "WaterTankRefillResponse",
+    "WateringHistoryPoint",
+    "WateringHistorySeries",
     # Lighting schemas
     "LightingStatus",
+    "RoomLights",
     "MasterLightRequest",
     "LightControlRequest",
     "LightResponse",
+    "LightingHistoryPoint",
+    "LightingHistorySeries",
     # Camera schemas
     "CameraList",
     "CameraStream",
@@ -21,6 +21,7 @@ class ActivityLogFilters(BaseModel):
     """Activity log filters."""
     limit: Optional[int] = 50
     offset: Optional[int] = 0
+    cursor: Optional[str] = None
     type: Optional[str] = None
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
@@ -3,7 +3,7 @@ Climate Schemas
 """
 
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 
 
@@ -39,3 +39,22 @@ class ClimateApplyRequest(BaseModel):
     temperature: int = Field(..., ge=16, le=30)
     fan_speed: str
     mode: str
+
+
+class ClimateHistoryPoint(BaseModel):
+    """Climate history aggregate for one time bucket."""
+    bucket_start: datetime
+    samples: int
+    temperature_min: float
+    temperature_max: float
+    temperature_avg: float
+    humidity_avg: float
+
+
+class ClimateHistorySeries(BaseModel):
+    """Climate history response."""
+    granularity: str
+    resolution: int
+    start: datetime
+    end: datetime
+    points: List[ClimateHistoryPoint]
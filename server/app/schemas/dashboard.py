@@ -8,6 +8,7 @@ from typing import List
 
 class DashboardData(BaseModel):
     """Dashboard data response."""
+    version: int
     security: dict
     climate: dict
     garden: dict
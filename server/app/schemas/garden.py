@@ -47,3 +47,20 @@ class WaterTankRefillResponse(BaseModel):
     refill_started: bool
     estimated_completion: Optional[datetime] = None
     started_at: datetime
+
+
+class WateringHistoryPoint(BaseModel):
+    """Watering history aggregate for one time bucket."""
+    bucket_start: datetime
+    runs: int
+    duration: int
+    water_used: int
+
+
+class WateringHistorySeries(BaseModel):
+    """Watering history response."""
+    granularity: str
+    resolution: int
+    start: datetime
+    end: datetime
+    points: List[WateringHistoryPoint]
@@ -16,6 +16,17 @@ class LightingStatus(BaseModel):
     rooms: List[dict]
 
 
+class RoomLights(BaseModel):
+    """Lights of one room response."""
+    id: str
+    name: str
+    active_lights: int
+    total_lights: int
+    power_usage: Optional[float] = None
+    lights: List[dict]
+    pagination: dict
+
+
 class MasterLightRequest(BaseModel):
     """Master light control request."""
     on: bool
@@ -35,3 +46,20 @@ class LightResponse(BaseModel):
     brightness: Optional[int] = None
     color: Optional[str] = None
     updated_at: datetime
+
+
+class LightingHistoryPoint(BaseModel):
+    """Lighting history aggregate for one time bucket."""
+    bucket_start: datetime
+    on_seconds: float
+    energy_wh: float
+    toggles: int
+
+
+class LightingHistorySeries(BaseModel):
+    """Lighting history response."""
+    granularity: str
+    resolution: int
+    start: datetime
+    end: datetime
+    points: List[LightingHistoryPoint]
@@ -3,19 +3,31 @@ OmniHome Smart Home Backend Server
 FastAPI application for managing smart home devices and services
 """
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
 
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.logs import setup_logging
+from app.core.database import engine, dispose_engines
+from app.core.events import event_bus
+from app.core.write_buffer import write_buffer
+from app.core.retention import retention
+from app.core.state_cache import state_cache
+from app.core.dashboard import dashboard
+from app.core.migrations import check_schema
+from app.core.metrics import collect as collect_metrics
+from app.core.security import require_access_token
 from app.api.v1 import api_router
+from app.api.v1.websocket import manager as ws_manager
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+# Configure logging; records are written by a background thread, never on the event loop
+setup_logging(
+    level=settings.LOG_LEVEL,
+    fmt=settings.LOG_FORMAT,
+    queue_size=settings.LOG_QUEUE_SIZE,
+    sql=settings.LOG_SQL
 )
 logger = logging.getLogger(__name__)
 
@@ -28,15 +40,33 @@ async def lifespan(app: FastAPI):
     logger.info(f"Database URL: {settings.OMNIHOME_DATABASE_URL}")
     logger.info(f"Environment: {settings.ENVIRONMENT}")
     
-    # Create database tables
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    logger.info("Database tables created successfully")
+    # Check the schema version, creating the schema in a new database
+    version = await check_schema(engine)
+    logger.info(f"Database schema version {version}")
+    
+    # Load the single-row device state and the dashboard snapshot into memory
+    await state_cache.start(engine)
+    await dashboard.start(engine)
+    
+    # Start the group-commit writer for activity and history rows
+    await write_buffer.start(engine)
+    
+    # Start the retention scheduler; with several workers only the broadcast hub prunes
+    await retention.start(leader=lambda: ws_manager.backend.is_leader)
+    
+    # Start WebSocket broadcast backend
+    await ws_manager.start()
     
     yield
     
     # Shutdown
     logger.info("Shutting down OmniHome API Server...")
+    await retention.stop()
+    await state_cache.stop()
+    await event_bus.drain()
+    await ws_manager.stop()
+    await write_buffer.stop()
+    await dispose_engines()
 
 
 # Create FastAPI application
@@ -83,6 +113,12 @@ async def health_check():
     }
 
 
+@app.get("/metrics", dependencies=[Depends(require_access_token)])
+async def metrics():
+    """Runtime metrics endpoint; requires an access token."""
+    return collect_metrics()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -0,0 +1,98 @@
+"""
+Primary Key Insert Benchmark
+Compares activity log insert throughput with random uuid4 keys and
+time-ordered UUIDv7 keys
+
+Each scheme gets a fresh database with the storage profile, prefilled with
+--existing rows, then --rows more rows are inserted in write-buffer sized
+batches (one executemany per transaction). Random keys land all over the
+primary key index; time-ordered keys append to it. The gap widens as the
+index outgrows the page cache, which --cache-kb lets you shrink.
+
+Usage:
+    python scripts/bench_ids.py --existing 200000 --rows 50000 --cache-kb 2000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable
+
+# Add parent directory to path for imports
+SERVER_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, SERVER_DIR)
+os.environ["DEBUG"] = "false"
+
+from app.core.config import settings
+from app.core.database import create_engines
+from app.core.ids import new_id
+from app.models import ActivityLog
+
+SCHEMES = {
+    "uuid4": lambda: str(uuid.uuid4()),
+    "uuid7": new_id,
+}
+
+
+def rows(make_id: Callable[[], str], count: int, start: datetime):
+    return [
+        {
+            "id": make_id(),
+            "timestamp": start + timedelta(milliseconds=n),
+            "event": "Front Door Unlocked",
+            "log_type": "info",
+            "category": "security",
+            "details": {"doorId": "front"}
+        }
+        for n in range(count)
+    ]
+
+
+async def run(label: str, make_id: Callable[[], str], path: str, args: argparse.Namespace) -> None:
+    engine, _ = create_engines(f"sqlite+aiosqlite:///{path}")
+    table = ActivityLog.__table__
+    async with engine.begin() as conn:
+        await conn.run_sync(table.create)
+
+    start = datetime.utcnow()
+    for offset in range(0, args.existing, 10000):
+        async with engine.begin() as conn:
+            await conn.execute(table.insert(), rows(make_id, min(10000, args.existing - offset), start))
+
+    batches = [rows(make_id, args.batch, start) for _ in range(args.rows // args.batch)]
+    began = time.perf_counter()
+    for batch in batches:
+        async with engine.begin() as conn:
+            await conn.execute(table.insert(), batch)
+    elapsed = time.perf_counter() - began
+
+    async with engine.connect() as conn:
+        page_size = (await conn.exec_driver_sql("PRAGMA page_size")).scalar()
+        pages = (await conn.exec_driver_sql("PRAGMA page_count")).scalar()
+    await engine.dispose()
+
+    inserted = len(batches) * args.batch
+    print(f"{label:<8} {inserted / elapsed:>12,.0f} {elapsed / len(batches) * 1000:>12.2f} {pages * page_size / 2**20:>10.1f}")
+
+
+async def main(args: argparse.Namespace) -> None:
+    settings.SQLITE_CACHE_SIZE_KB = args.cache_kb
+    print(f"{args.existing:,} existing rows, {args.rows:,} inserted in batches of {args.batch}, {args.cache_kb} KB cache")
+    print(f"{'keys':<8} {'rows/s':>12} {'ms/batch':>12} {'file MB':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, make_id in SCHEMES.items():
+            await run(label, make_id, os.path.join(tmp, f"{label}.db"), args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--existing", type=int, default=200000)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--batch", type=int, default=settings.WRITE_BUFFER_MAX_ROWS)
+    parser.add_argument("--cache-kb", type=int, default=settings.SQLITE_CACHE_SIZE_KB)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,131 @@
+"""
+Logging Event-Loop Latency Benchmark
+Measures how much a logging storm delays the event loop with a synchronous
+handler and with the queue pipeline from app.core.logs
+
+A ticker task sleeps 1 ms in a loop and records how late it wakes up while
+--tasks tasks each log --records records, as a burst of WebSocket connects
+would. Output goes to a file sink; --sink-delay-ms adds a sleep to every
+write, standing in for a blocked terminal or a slow log collector.
+
+Usage:
+    python scripts/bench_logging.py --tasks 50 --records 200 --sink-delay-ms 1
+"""
+
+import argparse
+import asyncio
+import io
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Add parent directory to path for imports
+SERVER_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, SERVER_DIR)
+
+from app.core.logs import RateLimitedLog, setup_logging, stats, stop_logging
+
+logger = logging.getLogger("bench")
+
+
+class SlowFile(io.TextIOWrapper):
+    """A file whose every write takes at least delay seconds."""
+
+    def __init__(self, path: str, delay: float):
+        super().__init__(open(path, "wb"), encoding="utf-8", line_buffering=True)
+        self.delay = delay
+
+    def write(self, text: str) -> int:
+        if self.delay:
+            time.sleep(self.delay)
+        return super().write(text)
+
+
+def setup_sync(stream) -> None:
+    """The previous logging.basicConfig setup: a StreamHandler on the root logger."""
+    root = logging.getLogger()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    root.handlers[:] = [handler]
+    root.setLevel(logging.INFO)
+
+
+async def storm(args: argparse.Namespace, log) -> None:
+    async def client(number: int) -> None:
+        for n in range(args.records):
+            log("WebSocket connection established: %s for user %s (%s)", f"{number}-{n}", "user", "json")
+            if n % 10 == 0:
+                await asyncio.sleep(0)
+
+    await asyncio.gather(*(client(number) for number in range(args.tasks)))
+
+
+async def measure(args: argparse.Namespace, log) -> list:
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker() -> None:
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append((time.perf_counter() - start - 0.001) * 1000)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    await storm(args, log)
+    done.set()
+    await task
+    return lags
+
+
+def report(label: str, lags: list, elapsed: float) -> None:
+    lags = sorted(lags)
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+    print(f"{label:<12} {elapsed:>10.2f} {statistics.median(lags):>10.2f} {p99:>10.2f} {lags[-1]:>10.2f}")
+
+
+def run(label: str, args: argparse.Namespace, log) -> None:
+    began = time.perf_counter()
+    lags = asyncio.run(measure(args, log))
+    report(label, lags, time.perf_counter() - began)
+
+
+def main(args: argparse.Namespace) -> None:
+    delay = args.sink_delay_ms / 1000
+    total = args.tasks * args.records
+    print(f"{total:,} records from {args.tasks} tasks, sink delay {args.sink_delay_ms} ms per record")
+    print(f"{'handler':<12} {'storm s':>10} {'p50 ms':>10} {'p99 ms':>10} {'max ms':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        sink = SlowFile(os.path.join(tmp, "sync.log"), delay)
+        setup_sync(sink)
+        run("sync", args, logger.info)
+        sink.close()
+
+        sink = SlowFile(os.path.join(tmp, "queue.log"), delay)
+        setup_logging(fmt="json", queue_size=args.queue_size, stream=sink)
+        run("queue", args, logger.info)
+        dropped = stats()["dropped"]
+        stop_logging()
+        sink.close()
+        print(f"{'':<12} queue dropped {dropped:,} records")
+
+        sink = SlowFile(os.path.join(tmp, "limited.log"), delay)
+        setup_logging(fmt="json", queue_size=args.queue_size, stream=sink)
+        site = RateLimitedLog(logger, args.rate)
+        run("queue+rate", args, site.info)
+        stop_logging()
+        sink.close()
+        print(f"{'':<12} rate limit suppressed {site.suppressed_total:,} records")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=50)
+    parser.add_argument("--records", type=int, default=200)
+    parser.add_argument("--sink-delay-ms", type=float, default=1.0)
+    parser.add_argument("--queue-size", type=int, default=10000)
+    parser.add_argument("--rate", type=float, default=10)
+    main(parser.parse_args())
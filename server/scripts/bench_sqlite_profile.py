@@ -0,0 +1,143 @@
+"""
+SQLite Storage Profile Benchmark
+Compares mixed read/write throughput of the previous single-engine setup
+with the WAL storage profile and split reader/writer pools
+
+Readers run the queries behind the status GETs while writers run the
+update + activity log insert of a control POST, concurrently, for a fixed
+duration against a copy of a freshly initialized database.
+
+Usage:
+    python scripts/bench_sqlite_profile.py --readers 8 --writers 2 --duration 10
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from typing import List
+
+# Add parent directory to path for imports
+SERVER_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, SERVER_DIR)
+os.environ["DEBUG"] = "false"
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+
+from app.core.database import create_engines
+from app.models import ActivityLog, Door, Light
+
+
+class Results:
+    def __init__(self):
+        self.read_latencies: List[float] = []
+        self.write_latencies: List[float] = []
+        self.errors = 0
+
+
+def p99(values: List[float]) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(int(len(values) * 0.99), len(values) - 1)]
+
+
+async def reader(factory, deadline: float, results: Results) -> None:
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            async with factory() as session:
+                await session.execute(select(Light))
+                await session.execute(select(Door))
+                await session.execute(select(ActivityLog).order_by(ActivityLog.timestamp.desc()).limit(20))
+            results.read_latencies.append(time.perf_counter() - start)
+        except Exception:
+            results.errors += 1
+
+
+async def writer(factory, index: int, deadline: float, results: Results) -> None:
+    door_id = ("front", "back")[index % 2]
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            async with factory() as session:
+                door = (await session.execute(select(Door).where(Door.door_id == door_id))).scalar_one()
+                door.locked = not door.locked
+                door.last_activity_at = datetime.utcnow()
+                session.add(ActivityLog(
+                    id=str(uuid.uuid4()),
+                    timestamp=datetime.utcnow(),
+                    event=f"{door.name} {'Locked' if door.locked else 'Unlocked'}",
+                    log_type="info",
+                    category="security",
+                    details={"doorId": door_id}
+                ))
+                await session.commit()
+            results.write_latencies.append(time.perf_counter() - start)
+        except Exception:
+            results.errors += 1
+
+
+async def run(label: str, write_engine, read_engine, args: argparse.Namespace) -> None:
+    write_factory = async_sessionmaker(write_engine, class_=AsyncSession, expire_on_commit=False)
+    read_factory = async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+    results = Results()
+
+    deadline = time.perf_counter() + args.duration
+    await asyncio.gather(
+        *(reader(read_factory, deadline, results) for _ in range(args.readers)),
+        *(writer(write_factory, i, deadline, results) for i in range(args.writers))
+    )
+    await write_engine.dispose()
+    if read_engine is not write_engine:
+        await read_engine.dispose()
+
+    print(
+        f"{label:<10} {len(results.read_latencies) / args.duration:>9,.0f} "
+        f"{p99(results.read_latencies) * 1000:>9.1f} "
+        f"{len(results.write_latencies) / args.duration:>9,.0f} "
+        f"{p99(results.write_latencies) * 1000:>9.1f} {results.errors:>7}"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        seed = os.path.join(tmp, "seed.db")
+        env = dict(os.environ, OMNIHOME_DATABASE_URL=f"sqlite+aiosqlite:///{seed}")
+        subprocess.run(
+            [sys.executable, "scripts/init_db.py"],
+            cwd=SERVER_DIR, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+
+        print(f"{args.readers} readers, {args.writers} writers, {args.duration}s per run")
+        print(f"{'profile':<10} {'reads/s':>9} {'p99 ms':>9} {'writes/s':>9} {'p99 ms':>9} {'errors':>7}")
+
+        before = os.path.join(tmp, "before.db")
+        shutil.copy(seed, before)
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{before}",
+            future=True,
+            connect_args={"check_same_thread": False},
+            pool_pre_ping=True
+        )
+        await run("before", engine, engine, args)
+
+        after = os.path.join(tmp, "after.db")
+        shutil.copy(seed, after)
+        write_engine, read_engine = create_engines(f"sqlite+aiosqlite:///{after}")
+        await run("after", write_engine, read_engine, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=10)
+    asyncio.run(main(parser.parse_args()))
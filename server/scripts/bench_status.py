@@ -0,0 +1,206 @@
+"""
+Status Endpoint Latency Benchmark
+Compares end-to-end latency of the security status and dashboard with
+their former one-query-per-input versions
+
+Seeds a temporary database with a large home (--rooms rooms with
+--lights-per-room lights each, --sensors motion sensors, --zones garden
+zones, --logs activity log rows) and serves each variant from a bare
+FastAPI app over ASGI, so both pay the same request handling. Requests are
+sent --concurrency at a time.
+
+- security: the former three queries against the state cache plus one
+  UNION ALL statement for doors and sensors
+- dashboard cold: the former six sequential queries against a rebuild of
+  the maintained snapshot from one statement (what a reload costs)
+- dashboard warm: the maintained snapshot as served between changes
+
+Usage:
+    python scripts/bench_status.py --requests 500 --concurrency 1
+    python scripts/bench_status.py --requests 500 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+# Add parent directory to path for imports, pointing the app at a scratch database
+SERVER_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, SERVER_DIR)
+WORK_DIR = tempfile.mkdtemp(prefix="omnihome-status-")
+os.environ["OMNIHOME_DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(WORK_DIR, 'status.db')}"
+os.environ["DEBUG"] = "false"
+os.environ["STATE_CACHE_POLL_INTERVAL_MS"] = "0"
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.dashboard import dashboard
+from app.core.database import engine, get_db
+from app.core.ids import new_id
+from app.core.migrations import migrate
+from app.core.state_cache import state_cache
+from app.api.v1 import security
+from app.models import (
+    ActivityLog, ClimateSettings, Door, GardenZone, Light, Room, SecuritySensor, SecuritySystem, WaterTank
+)
+
+
+async def seed(args: argparse.Namespace) -> None:
+    await migrate(engine)
+    now = datetime.utcnow()
+    async with engine.begin() as conn:
+        rooms = [{"id": new_id(), "name": f"Room {n}"} for n in range(args.rooms)]
+        await conn.execute(Room.__table__.insert(), rooms)
+        await conn.execute(Light.__table__.insert(), [
+            {
+                "id": new_id(), "light_id": f"light-{n}-{m}", "name": f"Light {m}", "room_id": room["id"],
+                "on": m % 3 == 0, "brightness": 80, "color": "#ffffff", "power_usage": 9.5
+            }
+            for n, room in enumerate(rooms) for m in range(args.lights_per_room)
+        ])
+        await conn.execute(SecuritySensor.__table__.insert(), [
+            {"id": new_id(), "name": f"Sensor {n}", "sensor_type": "motion", "location": f"Area {n}", "status": "active"}
+            for n in range(args.sensors)
+        ])
+        await conn.execute(Door.__table__.insert(), [
+            {"id": new_id(), "name": name, "door_id": name.lower(), "locked": True, "last_activity_at": now}
+            for name in ("Front", "Back", "Garage", "Patio")
+        ])
+        await conn.execute(GardenZone.__table__.insert(), [
+            {"id": new_id(), "zone_id": n, "name": f"Zone {n}", "soil_moisture": 40 + n}
+            for n in range(args.zones)
+        ])
+        await conn.execute(SecuritySystem.__table__.insert(), [{"id": new_id(), "armed": True, "mode": "home"}])
+        await conn.execute(ClimateSettings.__table__.insert(), [
+            {"id": new_id(), "target_temperature": 22, "current_temperature": 21, "humidity": 45, "mode": "cool"}
+        ])
+        await conn.execute(WaterTank.__table__.insert(), [{"id": new_id(), "level": 75, "capacity": 1000, "available": 750}])
+        for offset in range(0, args.logs, 10000):
+            await conn.execute(ActivityLog.__table__.insert(), [
+                {
+                    "id": new_id(), "timestamp": now - timedelta(seconds=30 * n), "event": "Event",
+                    "log_type": "info", "category": "security"
+                }
+                for n in range(offset, min(offset + 10000, args.logs))
+            ])
+
+
+async def security_sequential(db: AsyncSession = Depends(get_db)):
+    """The security status inputs as separate queries."""
+    security_system = (await db.execute(select(SecuritySystem).limit(1))).scalar_one_or_none()
+    sensors = (await db.execute(select(SecuritySensor))).scalars().all()
+    doors = (await db.execute(select(Door))).scalars().all()
+    return {"armed": security_system.armed, "doors": len(doors), "sensors": len(sensors)}
+
+
+async def dashboard_sequential(db: AsyncSession = Depends(get_db)):
+    """The dashboard inputs as six sequential queries, aggregated per request."""
+    security_system = (await db.execute(select(SecuritySystem).limit(1))).scalar_one_or_none()
+    climate = (await db.execute(select(ClimateSettings).limit(1))).scalar_one_or_none()
+    zones = (await db.execute(select(GardenZone))).scalars().all()
+    tank = (await db.execute(select(WaterTank).limit(1))).scalar_one_or_none()
+    lights = (await db.execute(select(Light))).scalars().all()
+    logs = (await db.execute(select(ActivityLog).order_by(ActivityLog.timestamp.desc()).limit(5))).scalars().all()
+    return {
+        "armed": security_system.armed,
+        "temperature": climate.target_temperature,
+        "soilMoisture": int(sum(z.soil_moisture or 0 for z in zones) / len(zones)) if zones else 65,
+        "activeLights": len([l for l in lights if l.on]),
+        "powerUsage": sum(l.power_usage or 0 for l in lights if l.on),
+        "recent": [log.event for log in logs]
+    }
+
+
+async def dashboard_cold(db: AsyncSession = Depends(get_db)):
+    dashboard.invalidate()
+    return (await dashboard.get(db)).data
+
+
+async def dashboard_warm(db: AsyncSession = Depends(get_db)):
+    return (await dashboard.get(db)).data
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.get("/security/sequential")(security_sequential)
+    # Undecorated handler: no single-flight sharing between the concurrent requests
+    app.get("/security/single")(security.get_security_status.__wrapped__)
+    app.get("/dashboard/sequential")(dashboard_sequential)
+    app.get("/dashboard/cold")(dashboard_cold)
+    app.get("/dashboard/warm")(dashboard_warm)
+    return app
+
+
+async def measure(client: httpx.AsyncClient, path: str, args: argparse.Namespace) -> Tuple[List[float], float]:
+    """Get per-request latencies in ms and the wall time of the whole run in seconds."""
+    latencies: List[float] = []
+    remaining = args.requests
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+
+    for _ in range(20):
+        await client.get(path)
+    began = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return latencies, time.perf_counter() - began
+
+
+def report(label: str, latencies: List[float], elapsed: float) -> None:
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{label:<22} {statistics.median(latencies):>9.2f} {p99:>9.2f} {len(latencies) / elapsed:>9,.0f}")
+
+
+async def main(args: argparse.Namespace) -> None:
+    await seed(args)
+    await state_cache.start(engine)
+    await dashboard.start(engine)
+    lights = args.rooms * args.lights_per_room
+    print(f"{lights} lights in {args.rooms} rooms, {args.sensors} sensors, {args.zones} zones, {args.logs:,} log rows")
+    print(f"{args.requests} requests per variant, {args.concurrency} in flight")
+    print(f"{'variant':<22} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>9}")
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for label, path in (
+            ("security sequential", "/security/sequential"),
+            ("security one query", "/security/single"),
+            ("dashboard sequential", "/dashboard/sequential"),
+            ("dashboard cold", "/dashboard/cold"),
+            ("dashboard warm", "/dashboard/warm"),
+        ):
+            report(label, *await measure(client, path, args))
+    await state_cache.stop()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, default=30)
+    parser.add_argument("--lights-per-room", type=int, default=8)
+    parser.add_argument("--sensors", type=int, default=40)
+    parser.add_argument("--zones", type=int, default=12)
+    parser.add_argument("--logs", type=int, default=100000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=1)
+    try:
+        asyncio.run(main(parser.parse_args()))
+    finally:
+        # The seeded database is only for this run
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
@@ -0,0 +1,114 @@
+"""
+WebSocket Broadcast Micro-benchmark
+Compares per-subscriber JSON encoding with the encode-once broadcast path
+"""
+
+import asyncio
+import json
+import logging
+import sys
+import os
+import time
+from datetime import datetime
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.api.v1.websocket import ConnectionManager, encode_event
+
+SUBSCRIBER_COUNTS = [10, 100, 1000]
+EVENTS = 200
+CHANNEL = "lighting.status.changed"
+
+
+class NullWebSocket:
+    """WebSocket stand-in that encodes like Starlette but discards the frame."""
+
+    # No handshake headers, as read by ConnectionManager.connect
+    scope = {}
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_json(self, data):
+        await self.send_text(json.dumps(data, separators=(",", ":"), ensure_ascii=False))
+
+    async def send_text(self, data):
+        pass
+
+    async def close(self, code=1000, reason=None):
+        pass
+
+
+def sample_event(index: int) -> dict:
+    """Build a lighting event shaped like the real payload."""
+    return {
+        "event": CHANNEL,
+        "data": {
+            "masterOn": True,
+            "activeLights": index % 12,
+            "powerUsage": 115.5,
+            "rooms": [
+                {
+                    "id": f"room_{room}",
+                    "name": f"Room {room}",
+                    "lights": [
+                        {"id": f"light_{room}_{light}", "on": True, "brightness": 80, "color": "#FFFFFF"}
+                        for light in range(3)
+                    ]
+                }
+                for room in range(5)
+            ],
+            "updatedAt": datetime.utcnow().isoformat()
+        }
+    }
+
+
+async def bench_per_subscriber(subscribers: int) -> float:
+    """Baseline: encode the message once per subscriber, sending sequentially."""
+    sockets = [NullWebSocket() for _ in range(subscribers)]
+    start = time.perf_counter()
+    for index in range(EVENTS):
+        message = sample_event(index)
+        for websocket in sockets:
+            await websocket.send_json(message)
+    return time.perf_counter() - start
+
+
+async def bench_encode_once(subscribers: int) -> float:
+    """Encode each event once and fan the same frame out through the manager."""
+    manager = ConnectionManager(queue_size=EVENTS + 1)
+    # Measure raw fan-out: every event must reach every subscriber
+    manager.coalescer.channel_windows_ms.clear()
+    for index in range(subscribers):
+        await manager.connect(NullWebSocket(), f"conn_{index}", "bench")
+        manager.subscribe(f"conn_{index}", [CHANNEL])
+
+    start = time.perf_counter()
+    for index in range(EVENTS):
+        event = sample_event(index)
+        await manager.broadcast(CHANNEL, encode_event(CHANNEL, event["data"]))
+    # Let the writer tasks drain their queues
+    while any(len(c["outbox"]) for c in manager.active_connections.values()):
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+
+    for connection_id in list(manager.active_connections):
+        manager.disconnect(connection_id)
+    return elapsed
+
+
+async def main():
+    """Run both paths at each subscriber count."""
+    logging.disable(logging.INFO)
+
+    print(f"{EVENTS} events per run")
+    print(f"{'subscribers':>12} {'per-subscriber':>16} {'encode-once':>14} {'speedup':>9}")
+    for subscribers in SUBSCRIBER_COUNTS:
+        baseline = await bench_per_subscriber(subscribers)
+        encoded = await bench_encode_once(subscribers)
+        print(f"{subscribers:>12} {baseline * 1000:>14.1f}ms {encoded * 1000:>12.1f}ms {baseline / encoded:>8.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
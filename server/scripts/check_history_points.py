@@ -0,0 +1,82 @@
+"""
+History Point Count Check
+Fails if a history query can return more than ROLLUP_MAX_POINTS points
+
+Plans the default range and a sweep of spans, resolutions and unaligned
+start times with plan_query, and counts the epoch-aligned points each
+range touches at the chosen resolution. Exits with status 1 on any
+failure, so it can gate CI.
+
+Usage:
+    python scripts/check_history_points.py [--verbose]
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.config import settings
+from app.core.rollups import GRANULARITIES, floor_time, plan_query
+
+END = datetime(2026, 2, 2, 19, 25, 37)
+
+SPANS = [
+    timedelta(minutes=1), timedelta(minutes=90), timedelta(hours=6), timedelta(days=1),
+    timedelta(days=1, seconds=1), timedelta(days=7), timedelta(days=30), timedelta(days=365),
+    timedelta(days=3 * 365),
+]
+RESOLUTIONS = [None, 60, 173, 3600, 86400]
+# Start offsets that break the alignment to each granularity
+OFFSETS = [timedelta(0), timedelta(seconds=59), timedelta(minutes=59, seconds=30), timedelta(hours=23)]
+
+
+def touched_points(start: datetime, end: datetime, step: int) -> int:
+    """Count the epoch-aligned points of step seconds that [start, end) overlaps."""
+    last = floor_time(end - timedelta(microseconds=1), step)
+    return int((last - floor_time(start, step)).total_seconds() // step) + 1
+
+
+def check(label: str, start, end, resolution, verbose: bool) -> bool:
+    granularity, step, aligned, end = plan_query(start, end, resolution)
+    points = touched_points(aligned, end, step)
+    span = (end - aligned).total_seconds()
+    ok = (
+        points <= settings.ROLLUP_MAX_POINTS
+        and step % GRANULARITIES[granularity] == 0
+        and step >= (resolution or 0)
+    )
+    if verbose or not ok:
+        print(f"{'ok  ' if ok else 'FAIL'} {label}: {granularity}, {step}s per point, "
+              f"{points} points, span/resolution {span / step:.1f}")
+    return ok
+
+
+def main(verbose: bool) -> int:
+    failures = 0
+    checked = 0
+
+    # The default range: the last 24 hours
+    checked += 1
+    failures += not check("default range", None, None, None, verbose)
+
+    for span in SPANS:
+        for resolution in RESOLUTIONS:
+            for offset in OFFSETS:
+                end = END + offset
+                checked += 1
+                failures += not check(
+                    f"{span} ending {end:%Y-%m-%d %H:%M:%S} at {resolution or 'default'} resolution", end - span, end, resolution, verbose
+                )
+
+    print(f"{checked} ranges checked, {failures} over {settings.ROLLUP_MAX_POINTS} points")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--verbose", action="store_true", help="Print every range, not only failures")
+    sys.exit(main(parser.parse_args().verbose))
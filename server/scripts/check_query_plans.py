@@ -0,0 +1,270 @@
+"""
+Query Plan Check
+Fails if a hot query stops using an index
+
+Seeds a temporary database, runs the router handlers and background jobs
+that read the large append-only tables, records every statement they
+execute and runs EXPLAIN QUERY PLAN on it. A statement fails the check if
+its plan scans a hot table without an index or sorts its rows in a
+temporary B-tree. Exits with status 1 on any failure, so it can gate CI.
+
+Usage:
+    python scripts/check_query_plans.py [--verbose]
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, List, Tuple
+
+# Add parent directory to path for imports, pointing the app at a scratch database
+SERVER_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, SERVER_DIR)
+WORK_DIR = tempfile.mkdtemp(prefix="omnihome-plans-")
+DB_PATH = os.path.join(WORK_DIR, "plans.db")
+os.environ["OMNIHOME_DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+os.environ["DEBUG"] = "false"
+
+from sqlalchemy import event
+
+from app.core.database import AsyncSessionLocal, ReadSessionLocal, engine, read_engine
+from app.core.activity_counts import seed_activity_counts
+from app.core.migrations import migrate
+from app.core.retention import retention
+from app.core.rollups import apply_rollups
+from app.api.v1 import activity, camera, climate, dashboard, garden, lighting
+from app.models import (
+    ActivityLog, Camera, CameraRecording, CameraSnapshot, ClimateHistory, LightingHistory,
+    Session, WateringHistory
+)
+
+# Tables that grow without bound; small configuration tables may be scanned
+HOT_TABLES = {
+    "activity_logs", "lighting_history", "climate_history", "watering_history",
+    "camera_recordings", "camera_snapshots", "sessions",
+    "climate_rollups", "lighting_rollups", "watering_rollups",
+}
+
+ROWS = 5000
+LIGHTS = [f"light-{n}" for n in range(20)]
+CAMERAS = [f"cam-{n}" for n in range(4)]
+NOW = datetime.utcnow().replace(microsecond=0)
+
+# Statements recorded for the running case: (case, sql, parameters)
+recorded: List[Tuple[str, str, Tuple[Any, ...]]] = []
+current_case = ""
+
+
+def _record(conn, cursor, statement, parameters, context, executemany):
+    if not current_case or executemany or not re.match(r"\s*(SELECT|DELETE|UPDATE|INSERT)", statement, re.I):
+        return
+    if any(re.search(rf'\b{table}\b', statement) for table in HOT_TABLES):
+        recorded.append((current_case, statement, tuple(parameters or ())))
+
+
+for _engine in {engine, read_engine}:
+    event.listen(_engine.sync_engine, "before_cursor_execute", _record)
+
+
+async def seed() -> None:
+    """Create the schema and fill the hot tables."""
+    await migrate(engine)
+    async with engine.begin() as conn:
+        def at(n: int) -> datetime:
+            return NOW - timedelta(minutes=7 * n)
+
+        await conn.execute(Camera.__table__.insert(), [
+            {"id": str(uuid.uuid4()), "camera_id": camera_id, "name": camera_id, "location": "Test"}
+            for camera_id in CAMERAS
+        ])
+        await conn.execute(ActivityLog.__table__.insert(), [
+            {
+                "id": str(uuid.uuid4()), "timestamp": at(n), "event": "Event",
+                "log_type": ("info", "warning", "success", "error")[n % 4],
+                "category": ("security", "climate", "lighting", "garden", "system")[n % 5]
+            }
+            for n in range(ROWS)
+        ])
+        await conn.execute(LightingHistory.__table__.insert(), [
+            {
+                "id": str(uuid.uuid4()), "light_id": LIGHTS[n % len(LIGHTS)], "on": n % 2 == 0,
+                "brightness": 80, "power_usage": 9.5, "recorded_at": at(n)
+            }
+            for n in range(ROWS)
+        ])
+        await conn.execute(ClimateHistory.__table__.insert(), [
+            {
+                "id": str(uuid.uuid4()), "temperature": 21.5, "humidity": 45, "mode": "cool",
+                "fan_speed": "auto", "power_usage": 1.2, "recorded_at": at(n)
+            }
+            for n in range(ROWS)
+        ])
+        await conn.execute(WateringHistory.__table__.insert(), [
+            {"id": str(uuid.uuid4()), "zone_id": n % 6, "duration": 600, "water_used": 40, "started_at": at(n)}
+            for n in range(ROWS)
+        ])
+        await conn.execute(CameraRecording.__table__.insert(), [
+            {
+                "id": str(uuid.uuid4()), "camera_id": CAMERAS[n % len(CAMERAS)], "recording_id": f"rec-{n}",
+                "video_url": "/video", "duration": 60, "started_at": at(n)
+            }
+            for n in range(ROWS)
+        ])
+        await conn.execute(CameraSnapshot.__table__.insert(), [
+            {
+                "id": str(uuid.uuid4()), "camera_id": CAMERAS[n % len(CAMERAS)], "snapshot_id": f"snap-{n}",
+                "image_url": "/image", "captured_at": at(n)
+            }
+            for n in range(ROWS)
+        ])
+        await conn.execute(Session.__table__.insert(), [
+            {
+                "id": str(uuid.uuid4()), "user_id": "user", "token_hash": f"token-{n}",
+                "refresh_token_hash": f"refresh-{n}", "expires_at": at(n)
+            }
+            for n in range(ROWS)
+        ])
+        await seed_activity_counts(conn)
+
+        # Rollups from the seeded history
+        for model in (ClimateHistory, LightingHistory, WateringHistory):
+            rows = (await conn.execute(model.__table__.select())).all()
+            await apply_rollups(conn, [(model.__table__, dict(row._mapping)) for row in rows])
+
+
+async def in_read_session(handler: Callable[..., Awaitable[Any]], **kwargs) -> Any:
+    async with ReadSessionLocal() as db:
+        return await handler(db=db, **kwargs)
+
+
+async def in_write_session(handler: Callable[..., Awaitable[Any]], **kwargs) -> Any:
+    async with AsyncSessionLocal() as db:
+        return await handler(db=db, **kwargs)
+
+
+def activity_logs(**kwargs) -> Callable[[], Awaitable[Any]]:
+    params = dict(limit=50, offset=0, cursor=None, log_type=None, start_date=None, end_date=None, count="auto")
+    params.update(kwargs)
+    return lambda: in_read_session(activity.get_activity_logs, **params)
+
+
+async def activity_logs_second_page(**kwargs) -> None:
+    page = await activity_logs(**kwargs)()
+    await activity_logs(cursor=page.pagination["nextCursor"], **kwargs)()
+
+
+async def lighting_rollup_listener() -> None:
+    async with engine.begin() as conn:
+        await apply_rollups(conn, [(LightingHistory.__table__, {
+            "id": str(uuid.uuid4()), "light_id": LIGHTS[0], "on": True, "brightness": 80,
+            "power_usage": 9.5, "recorded_at": NOW + timedelta(seconds=1)
+        })])
+        await conn.rollback()
+
+
+async def retention_run() -> None:
+    saved = retention.policies, retention.archive_tables, retention.batch_pause_ms
+    retention.policies = {table: 10 for table in saved[0]}
+    retention.archive_tables = set()
+    retention.batch_pause_ms = 0
+    try:
+        await retention.run_once(NOW)
+    finally:
+        retention.policies, retention.archive_tables, retention.batch_pause_ms = saved
+
+
+# (case, coroutine factory); retention runs last since it deletes rows
+CASES: List[Tuple[str, Callable[[], Awaitable[Any]]]] = [
+    ("activity logs", activity_logs()),
+    ("activity logs by type", activity_logs(log_type="warning")),
+    ("activity logs by date", activity_logs(start_date=NOW - timedelta(days=3), end_date=NOW - timedelta(days=1))),
+    ("activity logs by type and date", activity_logs(log_type="info", start_date=NOW - timedelta(days=3))),
+    ("activity logs estimated total", activity_logs(start_date=NOW - timedelta(days=3), count="estimate")),
+    ("activity logs exact total", activity_logs(log_type="info", start_date=NOW - timedelta(days=3), count="exact")),
+    ("activity logs offset page", activity_logs(offset=200)),
+    ("activity logs cursor page", lambda: activity_logs_second_page()),
+    ("activity logs cursor page by type", lambda: activity_logs_second_page(log_type="error")),
+    ("dashboard", lambda: in_read_session(dashboard.get_dashboard_data)),
+    ("lighting status", lambda: in_read_session(lighting.get_lighting_status)),
+    ("lighting history", lambda: in_read_session(
+        lighting.get_lighting_history, start=None, end=None, resolution=None, light_id=None)),
+    ("lighting history of one light", lambda: in_read_session(
+        lighting.get_lighting_history, start=NOW - timedelta(days=7), end=None, resolution=None, light_id=LIGHTS[3])),
+    ("climate history", lambda: in_read_session(
+        climate.get_climate_history, start=NOW - timedelta(days=7), end=None, resolution=None)),
+    ("watering history", lambda: in_read_session(
+        garden.get_watering_history, start=None, end=None, resolution=None, zone_id=2)),
+    ("camera list", lambda: in_read_session(camera.get_cameras)),
+    ("stop recording", lambda: in_write_session(camera.stop_recording, camera_id=CAMERAS[1])),
+    ("lighting rollup listener", lighting_rollup_listener),
+    ("retention", retention_run),
+]
+
+
+def _explain_value(value: Any) -> Any:
+    if value is None or isinstance(value, (int, float, str, bytes)):
+        return value
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def problems(plan: List[Tuple[int, int, int, str]]) -> List[str]:
+    """Get the plan steps that read a hot table without an index, or sort in a temp B-tree."""
+    found = []
+    for _, _, _, detail in plan:
+        match = re.match(r"SCAN (\w+)", detail)
+        if match and match.group(1) in HOT_TABLES and "INDEX" not in detail:
+            found.append(detail)
+        elif "USE TEMP B-TREE" in detail:
+            found.append(detail)
+    return found
+
+
+async def run(verbose: bool) -> int:
+    global current_case
+    try:
+        await seed()
+        for case, factory in CASES:
+            current_case = case
+            await factory()
+
+        explain = sqlite3.connect(DB_PATH)
+        failures = 0
+        seen = set()
+        for case, sql, parameters in recorded:
+            if (case, sql) in seen:
+                continue
+            seen.add((case, sql))
+            plan = explain.execute(f"EXPLAIN QUERY PLAN {sql}", tuple(_explain_value(p) for p in parameters)).fetchall()
+            bad = problems(plan)
+            failures += bool(bad)
+            if bad or verbose:
+                print(f"[{'FAIL' if bad else 'ok'}] {case}")
+                print("    " + " ".join(sql.split()))
+                for _, _, _, detail in plan:
+                    print(f"      {'!' if detail in bad else ' '} {detail}")
+        explain.close()
+    finally:
+        await engine.dispose()
+        if read_engine is not engine:
+            await read_engine.dispose()
+        # The seeded database is only for this run
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+    print(f"{len(seen)} statements checked across {len(CASES)} cases, {failures} without a usable index")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that hot queries use indexes")
+    parser.add_argument("--verbose", action="store_true", help="Print every plan, not just failures")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.verbose)))
@@ -0,0 +1,314 @@
+"""
+WebSocket Load Test
+Measures delivery latency, memory per connection and CPU per message of /ws
+under thousands of simulated clients
+
+Every client authenticates with a token from create_access_token and
+subscribes to one of a mix of exact and wildcard channel sets. A driver
+calls the control endpoints at a fixed rate, and each event a client
+receives is matched to the call that produced it by its per-channel seq.
+
+The server must be otherwise idle and run a single worker, with coalescing
+disabled for the driven channels (the default), so that every seq belongs
+to exactly one driver call. --spawn starts a throwaway server on a
+temporary database; to test a running server instead, pass its --url and
+--server-pid, and run with the same SECRET_KEY so its tokens verify.
+
+Usage:
+    python scripts/loadtest_ws.py --spawn --clients 2000 --events 200
+    python scripts/loadtest_ws.py --url http://127.0.0.1:8000 --server-pid 4242 --binary-fraction 0.5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Dict, List, Optional, Tuple
+
+# Add parent directory to path for imports
+SERVER_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, SERVER_DIR)
+
+import websockets
+
+from app.core.channels import ChannelTrie
+from app.core.config import settings
+from app.core.protocols import MSGPACK_SUBPROTOCOL, decode_binary, encode_binary
+from app.core.security import create_access_token
+
+# Channels emitted by the driver's control calls
+DRIVEN_CHANNELS = ["security.status.changed", "garden.zone.changed", "activity.log.new"]
+
+# Channel sets the clients subscribe to, picked at random per client
+SUBSCRIPTION_SETS = [
+    ["security.*"],
+    ["garden.zone.changed"],
+    ["activity.log.new"],
+    ["*.status.changed", "garden.*"],
+    ["security.status.changed", "activity.log.new"],
+    ["security.*", "garden.*", "activity.*"],
+]
+
+
+def control_call(index: int) -> Tuple[str, dict, List[str]]:
+    """Get the path, body and emitted channels of the driver's index-th call."""
+    step = index // 2
+    if index % 2 == 0:
+        door = ("front", "back")[step % 2]
+        action = "lock" if step % 4 < 2 else "unlock"
+        return f"/security/doors/{door}/control", {"action": action}, ["activity.log.new", "security.status.changed"]
+    zone = 1 + step % 3
+    return f"/garden/zones/{zone}/toggle", {"active": step % 2 == 0}, ["garden.zone.changed"]
+
+
+def read_process(pid: int) -> Tuple[int, float]:
+    """Get a process's resident memory in bytes and its CPU time in seconds."""
+    rss = 0
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                rss = int(line.split()[1]) * 1024
+                break
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    # utime and stime are fields 14 and 15 of stat, i.e. 11 and 12 after the command name
+    cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    return rss, cpu
+
+
+def post(url: str, body: dict) -> None:
+    """POST a JSON body and wait for the response."""
+    request = urllib.request.Request(
+        url, data=json.dumps(body).encode(), headers={"Content-Type": "application/json"}, method="POST"
+    )
+    with urllib.request.urlopen(request, timeout=30) as response:
+        response.read()
+
+
+def fetch_json(url: str) -> dict:
+    token = create_access_token({"sub": "loadtest"})
+    request = urllib.request.Request(url, headers={"Authorization": f"Bearer {token}"})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.loads(response.read())
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return float("nan")
+    index = min(int(len(values) * fraction), len(values) - 1)
+    return values[index]
+
+
+class Client:
+    """One simulated WebSocket client recording when each sequenced event arrives."""
+
+    def __init__(self, index: int, channels: List[str], binary: bool):
+        self.index = index
+        self.channels = channels
+        self.binary = binary
+        self.received: List[Tuple[str, int, float]] = []
+        self.seq: Dict[str, int] = {}
+        self.subscribed = asyncio.Event()
+        self.websocket = None
+        self.reader: Optional[asyncio.Task] = None
+
+    async def connect(self, ws_url: str) -> None:
+        """Connect, subscribe and wait for the server's acknowledgement."""
+        token = create_access_token({"sub": f"loadtest-{self.index}"})
+        subprotocols = [MSGPACK_SUBPROTOCOL] if self.binary else None
+        self.websocket = await websockets.connect(
+            f"{ws_url}?token={token}",
+            subprotocols=subprotocols,
+            ping_interval=None,
+            max_size=None,
+            open_timeout=60
+        )
+        self.reader = asyncio.create_task(self._read())
+        await self._send({"event": "subscribe", "channels": self.channels})
+        await asyncio.wait_for(self.subscribed.wait(), timeout=60)
+
+    async def close(self) -> None:
+        if self.websocket is not None:
+            await self.websocket.close()
+        if self.reader is not None:
+            self.reader.cancel()
+
+    async def _send(self, message: dict) -> None:
+        if self.binary:
+            await self.websocket.send(encode_binary(message))
+        else:
+            await self.websocket.send(json.dumps(message))
+
+    async def _read(self) -> None:
+        try:
+            async for raw in self.websocket:
+                now = time.perf_counter()
+                message = decode_binary(raw) if isinstance(raw, bytes) else json.loads(raw)
+                event = message.get("event")
+                if "seq" in message and event != "subscribed":
+                    self.received.append((event, message["seq"], now))
+                elif event == "ping":
+                    await self._send({"event": "pong"})
+                elif event == "subscribed":
+                    self.seq = message.get("seq", {})
+                    self.subscribed.set()
+        except websockets.ConnectionClosed:
+            pass
+
+
+def spawn_server(tmp: str) -> Tuple[subprocess.Popen, str]:
+    """Start a single-worker server on a fresh database and wait until it is healthy."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    env = dict(os.environ)
+    env["OMNIHOME_DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(tmp, 'loadtest.db')}"
+    env["DEBUG"] = "false"
+    subprocess.run(
+        [sys.executable, "scripts/init_db.py"],
+        cwd=SERVER_DIR, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=SERVER_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while True:
+        try:
+            fetch_json(f"{url}/health")
+            return server, url
+        except OSError:
+            if time.time() > deadline or server.poll() is not None:
+                server.terminate()
+                raise RuntimeError("Server did not start")
+            time.sleep(0.2)
+
+
+async def run(url: str, pid: int, args: argparse.Namespace) -> None:
+    loop = asyncio.get_running_loop()
+    api_url = f"{url}{settings.API_V1_STR}"
+    ws_url = api_url.replace("http", "ws", 1) + "/ws"
+    rng = random.Random(args.seed)
+
+    idle_rss, _ = read_process(pid)
+
+    # A probe subscribed to every driven channel gives the starting seqs
+    probe = Client(-1, DRIVEN_CHANNELS, binary=False)
+    await probe.connect(ws_url)
+    base_seq = {channel: probe.seq.get(channel, 0) for channel in DRIVEN_CHANNELS}
+
+    clients = [
+        Client(i, rng.choice(SUBSCRIPTION_SETS), rng.random() < args.binary_fraction)
+        for i in range(args.clients)
+    ]
+    trie = ChannelTrie()
+    for client in clients:
+        for channel in client.channels:
+            trie.add(channel, str(client.index))
+
+    start = time.perf_counter()
+    for offset in range(0, len(clients), args.ramp):
+        await asyncio.gather(*(client.connect(ws_url) for client in clients[offset:offset + args.ramp]))
+    connect_time = time.perf_counter() - start
+
+    await asyncio.sleep(1)
+    connected_rss, cpu_before = read_process(pid)
+
+    # Drive the control endpoints at a fixed rate
+    sent: Dict[str, Dict[int, float]] = {channel: {} for channel in DRIVEN_CHANNELS}
+    seq = dict(base_seq)
+    expected = 0
+    start = time.perf_counter()
+    for n in range(args.events):
+        path, body, channels = control_call(n)
+        delay = start + n / args.rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        issued = time.perf_counter()
+        for channel in channels:
+            seq[channel] += 1
+            sent[channel][seq[channel]] = issued
+            expected += len(trie.match(channel))
+        await loop.run_in_executor(None, post, f"{api_url}{path}", body)
+    drive_time = time.perf_counter() - start
+
+    # Wait for the deliveries to drain
+    deadline = time.perf_counter() + args.drain_timeout
+    while time.perf_counter() < deadline:
+        if sum(len(client.received) for client in clients) >= expected:
+            break
+        await asyncio.sleep(0.1)
+    _, cpu_after = read_process(pid)
+
+    latencies = sorted(
+        received_at - sent[channel][seq_no]
+        for client in clients
+        for channel, seq_no, received_at in client.received
+        if seq_no in sent.get(channel, {})
+    )
+    delivered = len(latencies)
+    server_metrics = fetch_json(f"{url}/metrics").get("websocket", {})
+
+    for offset in range(0, len(clients), args.ramp):
+        await asyncio.gather(*(client.close() for client in clients[offset:offset + args.ramp]))
+    await probe.close()
+
+    binary_clients = sum(1 for client in clients if client.binary)
+    print(f"clients:                {args.clients} ({binary_clients} msgpack), connected in {connect_time:.1f}s")
+    print(f"control calls:          {args.events} in {drive_time:.1f}s")
+    print(f"deliveries:             {delivered:,} of {expected:,} expected ({expected - delivered:,} lost)")
+    print(f"latency p50:            {percentile(latencies, 0.50) * 1000:.1f} ms")
+    print(f"latency p99:            {percentile(latencies, 0.99) * 1000:.1f} ms")
+    print(f"latency max:            {(latencies[-1] if latencies else float('nan')) * 1000:.1f} ms")
+    print(f"server RSS per conn:    {(connected_rss - idle_rss) / max(args.clients, 1) / 1024:.1f} KiB")
+    print(f"server CPU per message: {(cpu_after - cpu_before) / max(delivered, 1) * 1e6:.1f} us (includes the control calls)")
+    print(f"server dropped:         {sum(server_metrics.get('dropped_messages', {}).values())} messages, "
+          f"{server_metrics.get('dropped_connections', 0)} connections")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--spawn", action="store_true", help="Start a throwaway server on a temporary database")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of a running server")
+    parser.add_argument("--server-pid", type=int, help="PID of the running server, for memory and CPU readings")
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--events", type=int, default=200, help="Control calls to make")
+    parser.add_argument("--rate", type=float, default=20, help="Control calls per second")
+    parser.add_argument("--ramp", type=int, default=100, help="Clients connecting concurrently")
+    parser.add_argument("--binary-fraction", type=float, default=0.0, help="Share of clients using msgpack")
+    parser.add_argument("--drain-timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    # Each client holds a socket in this process and in the server
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    print(f"{os.cpu_count()} CPUs (clients and server share them)")
+    if args.spawn:
+        with tempfile.TemporaryDirectory() as tmp:
+            server, url = spawn_server(tmp)
+            try:
+                asyncio.run(run(url, server.pid, args))
+            finally:
+                server.terminate()
+                server.wait()
+    else:
+        if args.server_pid is None:
+            parser.error("--server-pid is required without --spawn")
+        asyncio.run(run(args.url, args.server_pid, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+WebSocket Multi-worker Broadcast Load Test
+Measures fan-out throughput of the Unix socket relay as the worker count grows
+
+Every worker holds an equal share of the subscribers and publishes an equal
+share of the events, the way uvicorn spreads connections and requests across
+workers. Each event must reach every subscriber in every worker.
+
+Usage:
+    python scripts/loadtest_ws_workers.py --workers 1 2 4 --subscribers 2000 --events 500
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import tempfile
+import time
+import traceback
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+CHANNEL = "lighting.status.changed"
+
+
+class FramingWebSocket:
+    """WebSocket stand-in that does the framing work of a real send."""
+
+    # No handshake headers, as read by ConnectionManager.connect
+    scope = {}
+
+    def __init__(self, expected: int, done: asyncio.Event):
+        self.received = 0
+        self.expected = expected
+        self.done = done
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, data: str):
+        from websockets.frames import Frame, Opcode
+        Frame(Opcode.TEXT, data.encode("utf-8")).serialize(mask=False, extensions=[])
+        self.received += 1
+        if self.received == self.expected:
+            self.done.set()
+
+    async def close(self, code=1000, reason=None):
+        pass
+
+
+async def run_worker(index: int, workers: int, socket_path: str, subscribers: int, events: int, barrier, results):
+    """Run one worker: attach to the relay, subscribe, publish its share and wait for delivery."""
+    from app.api.v1.websocket import ConnectionManager, encode_event
+    from app.core.broadcast import UnixSocketRelayBackend
+
+    logging.disable(logging.WARNING)
+    manager = ConnectionManager(queue_size=events + 10, backend=UnixSocketRelayBackend(socket_path))
+    # Measure raw fan-out: every event must reach every subscriber
+    manager.coalescer.channel_windows_ms.clear()
+    await manager.start()
+
+    local_subscribers = subscribers // workers
+    pending = set()
+    for n in range(local_subscribers):
+        done = asyncio.Event()
+        pending.add(done)
+        await manager.connect(FramingWebSocket(events, done), f"w{index}_{n}", "loadtest")
+        manager.subscribe(f"w{index}_{n}", [CHANNEL])
+
+    # Wait for every worker, then give the hub a moment to register its peers
+    await asyncio.get_running_loop().run_in_executor(None, barrier.wait)
+    await asyncio.sleep(0.5)
+
+    start = time.time()
+    for n in range(index, events, workers):
+        await manager.broadcast(CHANNEL, encode_event(CHANNEL, {"seq": n, "activeLights": n % 12, "powerUsage": 115.5}))
+        if n % 50 == 0:
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*(done.wait() for done in pending))
+    end = time.time()
+    results.put((index, (start, end)))
+
+    # Keep the hub alive until every worker has finished
+    await asyncio.get_running_loop().run_in_executor(None, barrier.wait)
+    for connection_id in list(manager.active_connections):
+        manager.disconnect(connection_id)
+    await manager.stop()
+
+
+def worker_main(index: int, *args):
+    results = args[-1]
+    try:
+        asyncio.run(run_worker(index, *args))
+    except BaseException:
+        # Hand the failure to the parent rather than leaving it waiting
+        results.put((index, traceback.format_exc()))
+        raise
+
+
+def _collect(processes, results, timeout: float = 300) -> list:
+    """Wait for one timing per worker, failing as soon as a worker fails or dies."""
+    timings = []
+    deadline = time.monotonic() + timeout
+    while len(timings) < len(processes):
+        try:
+            index, result = results.get(timeout=0.5)
+        except queue.Empty:
+            dead = [i for i, process in enumerate(processes) if process.exitcode not in (None, 0)]
+            if dead:
+                raise RuntimeError(f"Worker {dead[0]} exited with code {processes[dead[0]].exitcode}")
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Timed out after {timeout:.0f}s waiting for workers")
+            continue
+        if isinstance(result, str):
+            raise RuntimeError(f"Worker {index} failed:\n{result}")
+        timings.append(result)
+    return timings
+
+
+def run(workers: int, subscribers: int, events: int) -> float:
+    """Run one configuration and return deliveries per second."""
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = os.path.join(tmp, "relay.sock")
+        processes = [
+            ctx.Process(target=worker_main, args=(i, workers, socket_path, subscribers, events, barrier, results))
+            for i in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            timings = _collect(processes, results)
+        except RuntimeError:
+            for process in processes:
+                process.terminate()
+            raise
+        finally:
+            for process in processes:
+                process.join()
+
+    elapsed = max(end for _, end in timings) - min(start for start, _ in timings)
+    delivered = events * (subscribers // workers) * workers
+    return delivered / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--subscribers", type=int, default=2000, help="Total subscribers across all workers")
+    parser.add_argument("--events", type=int, default=500, help="Total events published")
+    args = parser.parse_args()
+
+    print(f"{args.subscribers} subscribers, {args.events} events, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'deliveries/s':>14} {'scaling':>8}")
+    baseline = None
+    for workers in args.workers:
+        throughput = run(workers, args.subscribers, args.events)
+        baseline = baseline or throughput
+        print(f"{workers:>8} {throughput:>14,.0f} {throughput / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Schema Migration Script
+Brings the database schema up to the version this code expects
+
+Migrations run as separate steps, and batched steps commit every
+--batch-size rows, recording their progress; an interrupted run resumes
+where it stopped. Once the database is at the version the server requires,
+the remaining migrations are safe to run while it is serving.
+
+Usage:
+    python scripts/migrate.py [--target VERSION] [--batch-size 2000]
+    python scripts/migrate.py --status
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.database import engine
+from app.core.migrations import LATEST_VERSION, MIGRATIONS, REQUIRED_VERSION, get_schema_version, migrate
+
+
+async def status():
+    """Print the current and expected schema versions."""
+    async with engine.connect() as conn:
+        version = await get_schema_version(conn)
+    print(f"Schema version {version}; server requires {REQUIRED_VERSION}, latest is {LATEST_VERSION}")
+    for migration in MIGRATIONS:
+        print(f"  {'done   ' if migration.version <= version else 'pending'} {migration.version}: {migration.name}")
+    await engine.dispose()
+
+
+async def run(target: int, batch_size: int):
+    """Run the pending migrations."""
+    started = time.perf_counter()
+
+    def on_step(migration, number):
+        print(f"Version {migration.version} ({migration.name}): step {number + 1}/{len(migration.steps)}")
+
+    version = await migrate(engine, target=target, batch_size=batch_size, on_step=on_step)
+    print(f"Schema at version {version} after {time.perf_counter() - started:.1f}s")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate the database schema")
+    parser.add_argument("--target", type=int, default=LATEST_VERSION, help="Version to migrate to")
+    parser.add_argument("--batch-size", type=int, default=2000, help="Rows per transaction in batched steps")
+    parser.add_argument("--status", action="store_true", help="Only show the schema version")
+    args = parser.parse_args()
+    asyncio.run(status() if args.status else run(args.target, args.batch_size))
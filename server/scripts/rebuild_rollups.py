@@ -0,0 +1,69 @@
+"""
+Rollup Rebuild Script
+Recomputes the history rollup tables from the raw history rows
+
+Rollups are maintained as new history rows are written; run this once to
+backfill history recorded before rollups existed, or to repair them.
+Stop the server first.
+
+Usage:
+    python scripts/rebuild_rollups.py
+"""
+
+import asyncio
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import delete, select
+
+from app.core.database import engine
+from app.core.migrations import check_schema
+from app.core.rollups import apply_rollups
+from app.models import (
+    ClimateHistory, ClimateRollup, LightingHistory, LightingRollup,
+    WateringHistory, WateringRollup
+)
+
+BATCH_SIZE = 5000
+
+# History model, its timestamp column and its rollup model
+SOURCES = [
+    (ClimateHistory, ClimateHistory.recorded_at, ClimateRollup),
+    (LightingHistory, LightingHistory.recorded_at, LightingRollup),
+    (WateringHistory, WateringHistory.started_at, WateringRollup),
+]
+
+
+async def rebuild():
+    """Rebuild every rollup table."""
+    await check_schema(engine)
+
+    for model, timestamp, rollup in SOURCES:
+        table = model.__table__
+        async with engine.begin() as conn:
+            await conn.execute(delete(rollup))
+
+        total = 0
+        offset = 0
+        while True:
+            async with engine.begin() as conn:
+                result = await conn.execute(
+                    select(table).order_by(timestamp, table.c.id).offset(offset).limit(BATCH_SIZE)
+                )
+                rows = [(table, dict(row._mapping)) for row in result]
+                if not rows:
+                    break
+                await apply_rollups(conn, rows)
+            offset += len(rows)
+            total += len(rows)
+
+        print(f"{table.name}: {total} rows rolled up")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(rebuild())
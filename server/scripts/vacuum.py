@@ -0,0 +1,37 @@
+"""
+Database Vacuum Script
+Rewrites the database file with a full VACUUM
+
+Databases created before SQLITE_AUTO_VACUUM=INCREMENTAL keep the pages
+retention frees until a full VACUUM rewrites the file, which also switches
+it to incremental vacuuming, so the periodic retention run can return freed
+pages from then on. Writes wait for the whole rewrite: run this in a
+maintenance window. The file needs about its own size again in free disk
+space while it runs.
+
+Usage:
+    python scripts/vacuum.py
+"""
+
+import asyncio
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.database import engine
+from app.core.migrations import check_schema
+from app.core.retention import retention
+
+
+async def vacuum():
+    """Run a full VACUUM."""
+    await check_schema(engine)
+    reclaimed = await retention.vacuum()
+    print(f"Reclaimed {reclaimed / 1024 / 1024:.1f} MiB; database is {retention.database_bytes / 1024 / 1024:.1f} MiB")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(vacuum())